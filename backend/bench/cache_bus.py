@@ -0,0 +1,209 @@
+"""
+Multi-worker stale-read check for the cache invalidation bus (cache_bus.py).
+
+Spawns --workers separate uvicorn processes (one worker each, on their own
+ports, so requests can be aimed at a specific worker) against the Postgres
+at DATABASE_URL, with the offline FakeProvider. Each round it:
+
+1. warms /api/jobs/resume-matrix on every worker,
+2. mutates through a random worker — renames the resume, clips a job or
+   deletes one,
+3. reads the matrix back from the writing worker, which must be fresh at once,
+4. polls every other worker until it is fresh; taking longer than
+   --deadline-ms counts as a stale read.
+
+With --kill-listeners, every few rounds the workers' LISTEN connections are
+terminated server-side right before the mutation; no worker may serve the
+old matrix from cache while its listener reconnects.
+
+Run from backend/:
+    python -m bench.cache_bus --workers 4 --rounds 200
+    python -m bench.cache_bus --kill-listeners
+
+Exits non-zero on any stale read.
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+
+os.environ["AI_PROVIDER"] = "fake"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("QUESTION_GEN_WORKERS", "0")
+
+import asyncpg
+import httpx
+from sqlalchemy import delete
+
+from bench.loadtest import _free_port, _wait_ready
+from cache_bus import APPLICATION_NAME
+from database import AsyncSessionLocal, DATABASE_URL
+from models import InterviewSession, Job, Resume, User
+
+MATRIX = "/api/jobs/resume-matrix"
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Cluster:
+    def __init__(self, workers: int):
+        self.ports = [_free_port() for _ in range(workers)]
+        self.servers: list[subprocess.Popen] = []
+        self.clients: list[httpx.AsyncClient] = []
+
+    async def start(self) -> None:
+        for port in self.ports:
+            self.servers.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+                env=dict(os.environ),
+            ))
+        for port in self.ports:
+            await _wait_ready(f"http://127.0.0.1:{port}")
+            self.clients.append(httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30))
+
+    async def stop(self) -> None:
+        for client in self.clients:
+            await client.aclose()
+        for server in self.servers:
+            server.terminate()
+        for server in self.servers:
+            server.wait()
+
+
+class Round:
+    """One mutation and the predicate a fresh matrix satisfies afterwards."""
+
+    def __init__(self, label: str, fresh):
+        self.label = label
+        self.fresh = fresh
+
+
+async def mutate(client: httpx.AsyncClient, state: dict) -> Round:
+    choice = random.choice(["rename", "clip", "delete"] if state["job_ids"] else ["rename", "clip"])
+    if choice == "rename":
+        name = f"resume-{uuid.uuid4().hex[:8]}"
+        r = await client.patch(f"/api/resumes/{state['resume_id']}", json={"name": name})
+        r.raise_for_status()
+        return Round("rename", lambda m: m["resumes"][0]["name"] == name)
+    if choice == "clip":
+        marker = uuid.uuid4().hex[:8]
+        r = await client.post("/api/clip", json={
+            "url": f"https://bench.test/cache-bus/{marker}",
+            "raw_text": f"Python developer {marker}. Django, PostgreSQL, Docker. Remote, B2B.",
+        })
+        r.raise_for_status()
+        job_id = r.json()["id"]
+        state["job_ids"].append(job_id)
+        return Round("clip", lambda m: any(j["id"] == job_id for j in m["jobs"]))
+    job_id = state["job_ids"].pop(random.randrange(len(state["job_ids"])))
+    r = await client.delete(f"/api/jobs/{job_id}")
+    r.raise_for_status()
+    return Round("delete", lambda m: all(j["id"] != job_id for j in m["jobs"]))
+
+
+async def kill_listeners(dsn: str) -> int:
+    conn = await asyncpg.connect(dsn)
+    try:
+        return len(await conn.fetch(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE application_name = $1",
+            APPLICATION_NAME,
+        ))
+    finally:
+        await conn.close()
+
+
+async def run(args) -> int:
+    cluster = Cluster(args.workers)
+    user_id = None
+    stale: list[str] = []
+    propagation_ms: list[float] = []
+    try:
+        await cluster.start()
+        first = cluster.clients[0]
+        r = await first.post("/api/auth/register", json={
+            "email": f"bench-cache-{uuid.uuid4().hex[:8]}@example.com", "password": "bench-password",
+        })
+        r.raise_for_status()
+        user_id = r.json()["id"]
+        token = r.cookies["access_token"]
+        for client in cluster.clients:
+            client.headers["Authorization"] = f"Bearer {token}"
+        r = await first.post("/api/resumes/manual", json={"name": "bench", "entries": [
+            {"company": "A", "role": "Developer", "period": "2019-2024", "description": "Python Django PostgreSQL"},
+        ]})
+        r.raise_for_status()
+        state = {"resume_id": r.json()["id"], "job_ids": []}
+
+        for n in range(args.rounds):
+            for client in cluster.clients:
+                (await client.get(MATRIX)).raise_for_status()
+
+            killed = 0
+            if args.kill_listeners and n % args.kill_every == 0:
+                killed = await kill_listeners(DATABASE_URL.replace("+asyncpg", ""))
+
+            writer = random.randrange(len(cluster.clients))
+            step = await mutate(cluster.clients[writer], state)
+            written_at = time.perf_counter()
+
+            if not step.fresh((await cluster.clients[writer].get(MATRIX)).json()):
+                stale.append(f"round {n}: {step.label} — writer worker {writer} served its own stale matrix")
+
+            for i, client in enumerate(cluster.clients):
+                if i == writer:
+                    continue
+                # After a kill, a worker must bypass its cache: the first read has to be fresh.
+                deadline = written_at + (0 if killed else args.deadline_ms / 1000)
+                while True:
+                    if step.fresh((await client.get(MATRIX)).json()):
+                        propagation_ms.append((time.perf_counter() - written_at) * 1000)
+                        break
+                    if time.perf_counter() >= deadline:
+                        stale.append(f"round {n}: {step.label} via worker {writer} — worker {i} still stale"
+                                     + (f" after killing {killed} listeners" if killed else ""))
+                        break
+                    await asyncio.sleep(0.005)
+    finally:
+        await cluster.stop()
+        if user_id:
+            async with AsyncSessionLocal() as session:
+                for model in (InterviewSession, Job, Resume):
+                    await session.exec(delete(model).where(model.user_id == user_id))
+                await session.exec(delete(User).where(User.id == user_id))
+                await session.commit()
+
+    print(f"{args.rounds} rounds across {args.workers} workers")
+    print(f"  propagation  p50 {_percentile(propagation_ms, 0.5):.1f} ms  "
+          f"p95 {_percentile(propagation_ms, 0.95):.1f} ms  max {max(propagation_ms, default=0):.1f} ms")
+    print(f"  stale reads  {len(stale)}")
+    for line in stale[:20]:
+        print(f"    {line}")
+    return 1 if stale else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cache invalidation bus stale-read check")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--deadline-ms", type=float, default=500,
+                        help="how long another worker may keep serving the old matrix")
+    parser.add_argument("--kill-listeners", action="store_true",
+                        help="terminate the workers' LISTEN connections before some mutations")
+    parser.add_argument("--kill-every", type=int, default=5, help="rounds between kills (with --kill-listeners)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    random.seed(args.seed)
+    return args
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(parse_args())))
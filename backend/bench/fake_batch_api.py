@@ -0,0 +1,182 @@
+"""
+Local stand-in for the OpenAI Files, Batch and Chat Completions endpoints.
+
+Answers with FakeProvider output, so bulk_reparse.py (batch and direct paths)
+and OpenAIProvider can be exercised end to end without an API key:
+
+    python -m bench.fake_batch_api --port 8100 --batch-seconds 5 --error-rate 0.05
+    OPENAI_BASE_URL=http://localhost:8100/v1 OPENAI_API_KEY=x AI_PROVIDER=openai \\
+        python bulk_reparse.py --all --poll-seconds 2
+
+A batch sits in_progress for --batch-seconds, then completes with one output
+line per request. --error-rate fails that fraction of requests (error file);
+--truncate-rate cuts that fraction of replies mid-JSON to exercise repair.
+State is in memory: restarting the server forgets its batches.
+
+Run from backend/.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import PlainTextResponse
+
+from providers.base import PROMPTS
+from providers.fake import FakeProvider
+
+app = FastAPI(title="Fake OpenAI batch API")
+fake = FakeProvider(latency_ms=0)
+OPERATION_BY_PROMPT = {prompt: operation for operation, prompt in PROMPTS.items()}
+
+settings = {"batch_seconds": 5.0, "error_rate": 0.0, "truncate_rate": 0.0}
+files: dict[str, dict] = {}
+batches: dict[str, dict] = {}
+
+
+def _new_id(prefix: str) -> str:
+    return f"{prefix}-{uuid.uuid4().hex[:24]}"
+
+
+def _file_object(file_id: str) -> dict:
+    f = files[file_id]
+    return {
+        "id": file_id, "object": "file", "bytes": len(f["content"]), "created_at": f["created_at"],
+        "filename": f["filename"], "purpose": f["purpose"], "status": "processed",
+    }
+
+
+def _store_file(content: bytes, filename: str, purpose: str) -> str:
+    file_id = _new_id("file")
+    files[file_id] = {"content": content, "filename": filename, "purpose": purpose, "created_at": int(time.time())}
+    return file_id
+
+
+async def _answer(body: dict) -> dict:
+    """Chat completion for a request body built by OpenAIProvider._body."""
+    messages = body.get("messages") or []
+    system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+    user = next((m["content"] for m in messages if m.get("role") == "user"), "")
+    operation = OPERATION_BY_PROMPT.get(system)
+    if operation == "parse_job":
+        result = await fake.parse_job(user)
+    elif operation in ("parse_cv", "parse_work_history"):
+        result = await fake.parse_cv(user)
+    elif operation == "refine_profile":
+        result = await fake.refine_profile(user, "")
+    elif operation == "generate_questions":
+        result = await fake.generate_questions("Python", "easy", 3)
+    else:
+        raise HTTPException(status_code=400, detail="unknown system prompt")
+
+    content = json.dumps(result)
+    if random.random() < settings["truncate_rate"]:
+        content = content[: max(1, int(len(content) * random.uniform(0.5, 0.9)))]
+    prompt_tokens = (len(system) + len(user)) // 4
+    return {
+        "id": _new_id("chatcmpl"), "object": "chat.completion", "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{
+            "index": 0, "finish_reason": "stop",
+            "message": {"role": "assistant", "content": content},
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+            "total_tokens": prompt_tokens + len(content) // 4,
+            "prompt_tokens_details": {"cached_tokens": len(system) // 4},
+        },
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    return await _answer(await request.json())
+
+
+@app.post("/v1/files")
+async def create_file(file: UploadFile = File(...), purpose: str = Form(...)):
+    return _file_object(_store_file(await file.read(), file.filename or "upload.jsonl", purpose))
+
+
+@app.get("/v1/files/{file_id}")
+async def get_file(file_id: str):
+    if file_id not in files:
+        raise HTTPException(status_code=404, detail="No such file")
+    return _file_object(file_id)
+
+
+@app.get("/v1/files/{file_id}/content")
+async def get_file_content(file_id: str):
+    if file_id not in files:
+        raise HTTPException(status_code=404, detail="No such file")
+    return PlainTextResponse(files[file_id]["content"].decode("utf-8"))
+
+
+async def _process(batch_id: str) -> None:
+    batch = batches[batch_id]
+    await asyncio.sleep(settings["batch_seconds"])
+    output, errors = [], []
+    for line in files[batch["input_file_id"]]["content"].decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        if random.random() < settings["error_rate"]:
+            errors.append({
+                "id": _new_id("batch_req"), "custom_id": item["custom_id"],
+                "response": {"status_code": 500, "body": {"error": {"message": "simulated failure"}}},
+                "error": None,
+            })
+            continue
+        output.append({
+            "id": _new_id("batch_req"), "custom_id": item["custom_id"],
+            "response": {"status_code": 200, "body": await _answer(item["body"])},
+            "error": None,
+        })
+    batch["request_counts"] = {"total": len(output) + len(errors), "completed": len(output), "failed": len(errors)}
+    if output:
+        jsonl = "".join(json.dumps(o) + "\n" for o in output).encode("utf-8")
+        batch["output_file_id"] = _store_file(jsonl, "output.jsonl", "batch_output")
+    if errors:
+        jsonl = "".join(json.dumps(e) + "\n" for e in errors).encode("utf-8")
+        batch["error_file_id"] = _store_file(jsonl, "errors.jsonl", "batch_output")
+    batch["status"] = "completed"
+    batch["completed_at"] = int(time.time())
+
+
+@app.post("/v1/batches")
+async def create_batch(request: Request):
+    body = await request.json()
+    if body.get("input_file_id") not in files:
+        raise HTTPException(status_code=400, detail="Unknown input_file_id")
+    batch_id = _new_id("batch")
+    batches[batch_id] = {
+        "id": batch_id, "object": "batch", "endpoint": body["endpoint"],
+        "input_file_id": body["input_file_id"], "completion_window": body["completion_window"],
+        "status": "in_progress", "created_at": int(time.time()),
+        "output_file_id": None, "error_file_id": None,
+        "request_counts": {"total": 0, "completed": 0, "failed": 0},
+    }
+    batches[batch_id]["task"] = asyncio.create_task(_process(batch_id))
+    return {k: v for k, v in batches[batch_id].items() if k != "task"}
+
+
+@app.get("/v1/batches/{batch_id}")
+async def get_batch(batch_id: str):
+    if batch_id not in batches:
+        raise HTTPException(status_code=404, detail="No such batch")
+    return {k: v for k, v in batches[batch_id].items() if k != "task"}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--batch-seconds", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    settings.update(batch_seconds=args.batch_seconds, error_rate=args.error_rate, truncate_rate=args.truncate_rate)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,413 @@
+"""
+End-to-end load test for the HireTree API.
+
+Drives a weighted mix of clip, job listing, kanban PATCH, CV upload and
+interview requests and reports throughput and p50/p95/p99 per endpoint. By default the
+provider is the offline FakeProvider, so no API keys or network are
+needed — only a Postgres at DATABASE_URL (`docker compose up postgres`).
+Set AI_PROVIDER=replay to use a recorded cassette with realistic provider
+latencies instead (see providers/recording.py).
+
+Run from backend/:
+    python -m bench.loadtest                        # in-process (ASGI transport)
+    python -m bench.loadtest --uvicorn --workers 2  # spawn uvicorn on a free port
+    python -m bench.loadtest --url http://localhost:8000   # already running server
+    python -m bench.loadtest --save-baseline        # record bench/baseline.json
+
+Results are compared with bench/baseline.json; the run exits non-zero when an
+endpoint's p95 or throughput regresses by more than --tolerance. Commit the
+baseline together with changes that intentionally move it, and record it on
+the same machine you compare on.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Never hit a paid API from a benchmark: only the offline providers are allowed.
+if os.environ.get("AI_PROVIDER", "").lower() not in ("fake", "replay"):
+    os.environ["AI_PROVIDER"] = "fake"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("QUESTION_GEN_WORKERS", "0")  # keep background DB writes out of the numbers
+
+import httpx
+from sqlalchemy import delete, insert
+
+from auth import create_access_token
+from database import AsyncSessionLocal
+from models import User, Job, Resume, InterviewSession
+from providers.fake import TECHNOLOGIES
+
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+LIST_SIZES = (10, 100, 1000, 5000)
+STATUSES = ["saved", "applied", "need_prep", "interview", "offer", "rejected"]
+
+# Operation weights per scenario.
+SCENARIOS: dict[str, dict[str, int]] = {
+    "mixed":   {"clip": 2, "list": 4, "patch": 5, "cv": 1, "interview": 2},
+    "listing": {"list": 1},
+    "kanban":  {"patch": 1},
+    "clip":    {"clip": 1},
+}
+
+
+# ---------------------------------------------------------------------------
+# Fixture data
+# ---------------------------------------------------------------------------
+
+def _job_text(i: int) -> str:
+    stack = random.sample(TECHNOLOGIES, k=random.randint(3, 8))
+    return "\n".join([
+        "Home", "Jobs", "Companies", "We use cookies. Accept all", "",
+        f"{random.choice(['Senior', 'Mid', 'Junior'])} Backend Developer #{i}",
+        f"Company {i % 97}",
+        "Warsaw · Hybrid · B2B", "",
+        "Requirements:",
+        *(f"Experience with {t}" for t in stack),
+        "Responsibilities: design, build and run backend services with the team.",
+        "We offer: remote days, private healthcare, training budget.", "",
+        "Similar offers", "Java Developer", "React Developer",
+    ])
+
+
+def _job_row(user_id: str, i: int) -> dict:
+    return {
+        "user_id": user_id,
+        "url": f"https://example.com/bench/{user_id}/{i}",
+        "apply_url": "",
+        "raw_text": _job_text(i),
+        "status": random.choice(STATUSES),
+        "clipped_at": datetime.now(timezone.utc),
+        "title": f"Backend Developer #{i}",
+        "company": f"Company {i % 97}",
+        "location": "Warsaw",
+        "salary": "20 000 - 25 000 PLN",
+        "mode": random.choice(["remote", "hybrid", "onsite"]),
+        "seniority": random.choice(["junior", "mid", "senior"]),
+        "contract": random.choice(["B2B", "Permanent"]),
+        "stack": random.sample(TECHNOLOGIES, k=random.randint(3, 8)),
+        "description": "Build and run backend services. " * 4,
+    }
+
+
+def _resume_row(user_id: str) -> dict:
+    skills = [
+        {
+            "name": name, "years": random.randint(1, 8), "last_used_year": None,
+            "recency": "current", "ai_confidence": random.randint(1, 5),
+            "user_rating": None, "note": "",
+        }
+        for name in random.sample(TECHNOLOGIES, k=12)
+    ]
+    return {
+        "user_id": user_id, "name": "Bench CV", "is_active": True, "source": "cv",
+        "refined": False, "hash": uuid.uuid4().hex, "years_experience": 5,
+        "current_role": "Backend Developer", "summary": "", "skills": skills,
+        "uploaded_at": datetime.now(timezone.utc),
+    }
+
+
+def _docx_bytes(i: int) -> bytes:
+    import docx
+
+    document = docx.Document()
+    document.add_paragraph(f"Candidate {i}")
+    document.add_paragraph("Experience")
+    for tech in random.sample(TECHNOLOGIES, k=10):
+        document.add_paragraph(f"2019-2024 Backend Developer — {tech}, {random.randint(1, 6)} years")
+    buf = io.BytesIO()
+    document.save(buf)
+    return buf.getvalue()
+
+
+class Fixtures:
+    def __init__(self):
+        self.user_ids: list[str] = []
+        self.list_users: dict[int, tuple[str, list[int]]] = {}  # size -> (token, job ids)
+        self.writer_token = ""
+        self.cv_files: list[bytes] = []
+
+    async def _create_user(self, session, n_jobs: int) -> tuple[str, list[int]]:
+        user_id = str(uuid.uuid4())
+        await session.exec(insert(User.__table__).values(
+            id=user_id, email=f"bench-{user_id}@example.com", password_hash="!",
+            created_at=datetime.now(timezone.utc),
+        ))
+        await session.exec(insert(Resume.__table__).values(_resume_row(user_id)))
+        job_ids: list[int] = []
+        for start in range(0, n_jobs, 1000):
+            rows = [_job_row(user_id, i) for i in range(start, min(n_jobs, start + 1000))]
+            result = await session.exec(insert(Job.__table__).returning(Job.__table__.c.id), params=rows)
+            job_ids.extend(result.scalars().all())
+        self.user_ids.append(user_id)
+        return create_access_token(user_id), job_ids
+
+    async def create(self) -> None:
+        async with AsyncSessionLocal() as session:
+            for size in LIST_SIZES:
+                self.list_users[size] = await self._create_user(session, size)
+            self.writer_token, _ = await self._create_user(session, 0)
+            await session.commit()
+        self.cv_files = [_docx_bytes(i) for i in range(20)]
+
+    async def drop(self) -> None:
+        async with AsyncSessionLocal() as session:
+            for model in (InterviewSession, Job, Resume):
+                await session.exec(delete(model).where(model.user_id.in_(self.user_ids)))
+            await session.exec(delete(User).where(User.id.in_(self.user_ids)))
+            await session.commit()
+
+
+# ---------------------------------------------------------------------------
+# Operations — each returns the endpoint label used in the report
+# ---------------------------------------------------------------------------
+
+def _auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def op_clip(client: httpx.AsyncClient, fx: Fixtures) -> tuple[str, httpx.Response]:
+    i = random.randrange(1_000_000_000)
+    resp = await client.post("/api/clip", headers=_auth(fx.writer_token), json={
+        "url": f"https://example.com/bench/clip/{uuid.uuid4().hex}", "raw_text": _job_text(i),
+    })
+    return "POST /api/clip", resp
+
+
+async def op_list(client: httpx.AsyncClient, fx: Fixtures) -> tuple[str, httpx.Response]:
+    size = random.choice(LIST_SIZES)
+    token, _ = fx.list_users[size]
+    resp = await client.get("/api/jobs", headers=_auth(token))
+    return f"GET /api/jobs [n={size}]", resp
+
+
+async def op_patch(client: httpx.AsyncClient, fx: Fixtures) -> tuple[str, httpx.Response]:
+    token, job_ids = fx.list_users[1000]
+    resp = await client.patch(
+        f"/api/jobs/{random.choice(job_ids)}", headers=_auth(token),
+        json={"status": random.choice(STATUSES)},
+    )
+    return "PATCH /api/jobs/{id}", resp
+
+
+async def op_cv(client: httpx.AsyncClient, fx: Fixtures) -> tuple[str, httpx.Response]:
+    i = random.randrange(len(fx.cv_files))  # repeats exercise the fingerprint cache
+    files = {"file": (f"cv-{i}.docx", fx.cv_files[i], "application/octet-stream")}
+    resp = await client.post("/api/resumes", headers=_auth(fx.writer_token),
+                             files=files, data={"name": f"CV {i}"})
+    return "POST /api/resumes", resp
+
+
+async def op_interview(client: httpx.AsyncClient, fx: Fixtures) -> tuple[str, httpx.Response]:
+    token, job_ids = fx.list_users[100]
+    resp = await client.get(f"/api/jobs/{random.choice(job_ids)}/interview", headers=_auth(token))
+    return "GET /api/jobs/{id}/interview", resp
+
+
+OPERATIONS = {
+    "clip": op_clip, "list": op_list, "patch": op_patch, "cv": op_cv, "interview": op_interview,
+}
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[k]
+
+
+async def run_scenario(client, fx: Fixtures, weights: dict[str, int],
+                       duration: float, concurrency: int) -> dict:
+    ops = [OPERATIONS[name] for name in weights]
+    op_weights = list(weights.values())
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            op = random.choices(ops, op_weights)[0]
+            start = time.perf_counter()
+            try:
+                label, resp = await op(client, fx)
+                ok = resp.status_code < 400
+            except httpx.HTTPError:
+                label, ok = op.__name__, False
+            elapsed = time.perf_counter() - start
+            latencies.setdefault(label, []).append(elapsed)
+            if not ok:
+                errors[label] = errors.get(label, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    report = {}
+    for label, values in sorted(latencies.items()):
+        values.sort()
+        report[label] = {
+            "count": len(values),
+            "errors": errors.get(label, 0),
+            "rps": round(len(values) / wall, 2),
+            "p50_ms": round(_percentile(values, 50) * 1000, 2),
+            "p95_ms": round(_percentile(values, 95) * 1000, 2),
+            "p99_ms": round(_percentile(values, 99) * 1000, 2),
+        }
+    return report
+
+
+def _print_report(name: str, report: dict) -> None:
+    print(f"\n── {name} " + "─" * max(0, 86 - len(name)))
+    print(f"{'endpoint':<36}{'count':>8}{'err':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for label, r in report.items():
+        print(f"{label:<36}{r['count']:>8}{r['errors']:>6}{r['rps']:>10.1f}"
+              f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}")
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for scenario, report in results.items():
+        for label, r in report.items():
+            base = baseline.get("scenarios", {}).get(scenario, {}).get(label)
+            if not base:
+                continue
+            if r["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{scenario} / {label}: p95 {base['p95_ms']} → {r['p95_ms']} ms")
+            if r["rps"] < base["rps"] * (1 - tolerance):
+                regressions.append(f"{scenario} / {label}: rps {base['rps']} → {r['rps']}")
+    return regressions
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_ready(url: str, timeout: float = 60) -> None:
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=url) as client:
+        while time.perf_counter() < deadline:
+            try:
+                await client.get("/metrics")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not start within {timeout}s")
+
+
+async def main(args) -> int:
+    random.seed(args.seed)
+    server = None
+    lifespan_cm = None
+
+    if args.uvicorn:
+        port = _free_port()
+        args.url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+             "--workers", str(args.workers), "--log-level", "warning"],
+            env=dict(os.environ),
+        )
+        await _wait_ready(args.url)
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60,
+                                   limits=httpx.Limits(max_connections=args.concurrency))
+    else:
+        from main import app, lifespan
+
+        lifespan_cm = lifespan(app)
+        await lifespan_cm.__aenter__()  # create tables + seed questions
+        # A 500 must count as an error like it would over HTTP, not abort the run.
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+                                   base_url="http://bench", timeout=60)
+
+    fx = Fixtures()
+    try:
+        await fx.create()
+        names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+        results = {}
+        for name in names:
+            await run_scenario(client, fx, SCENARIOS[name], args.warmup, args.concurrency)
+            results[name] = await run_scenario(client, fx, SCENARIOS[name], args.duration, args.concurrency)
+            _print_report(name, results[name])
+    finally:
+        await client.aclose()
+        if not args.keep_data:
+            await fx.drop()
+        if lifespan_cm:
+            await lifespan_cm.__aexit__(None, None, None)
+        if server:
+            server.terminate()
+            server.wait()
+
+    run = {
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "mode": "uvicorn" if args.uvicorn else ("url" if args.url else "in-process"),
+        "provider": os.environ["AI_PROVIDER"],
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "environment": args.environment,
+        "scenarios": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(run, indent=2) + "\n")
+
+    if args.save_baseline:
+        BASELINE_FILE.write_text(json.dumps(run, indent=2) + "\n")
+        print(f"\nBaseline written to {BASELINE_FILE}")
+        return 0
+
+    if not BASELINE_FILE.exists():
+        print("\nNo baseline yet — run with --save-baseline to record one.")
+        return 0
+
+    regressions = compare(results, json.loads(BASELINE_FILE.read_text()), args.tolerance)
+    if regressions:
+        print(f"\nRegressions vs baseline (tolerance {args.tolerance:.0%}):")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("\nNo regressions vs baseline.")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="HireTree API load test")
+    parser.add_argument("--scenario", default="all", choices=["all", *SCENARIOS])
+    parser.add_argument("--duration", type=float, default=20, help="seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=3, help="warm-up seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--url", help="target an already running server")
+    parser.add_argument("--uvicorn", action="store_true", help="spawn uvicorn instead of running in-process")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (with --uvicorn)")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="also write this run's results as JSON")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--environment", default="",
+                        help="where this run was recorded (host, Postgres setup), stored with the results")
+    parser.add_argument("--keep-data", action="store_true", help="keep bench users and jobs")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
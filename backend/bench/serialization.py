@@ -0,0 +1,72 @@
+"""
+Serialization micro-benchmark for the job listing payload.
+
+Renders a GET /api/jobs body for N jobs (default 1,000, built with the load
+test fixtures and the real _job_to_dict) two ways and reports the median time
+per render and the bytes on the wire:
+
+    before  jsonable_encoder + json.dumps  (FastAPI's default JSONResponse)
+    after   orjson via FastJSONResponse    (returned directly, no encoder pass)
+
+followed by the identity / gzip / brotli sizes and compression times that
+CompressionMiddleware produces. No database or network is needed.
+
+Run from backend/:
+    python -m bench.serialization
+    python -m bench.serialization --jobs 5000 --repeat 20
+"""
+import argparse
+import statistics
+import time
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from bench.loadtest import _job_row, _resume_row
+from main import _job_to_dict
+from models import Job
+from responses import FastJSONResponse, _Compressor
+
+
+def _listing(n: int) -> list[dict]:
+    user_id = str(uuid.uuid4())
+    resume_skills = _resume_row(user_id)["skills"]
+    jobs = [Job(id=i + 1, **_job_row(user_id, i)) for i in range(n)]
+    return [_job_to_dict(job, resume_skills) for job in jobs]
+
+
+def _median_ms(fn, repeat: int) -> tuple[float, bytes]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    payload = _listing(args.jobs)
+    before_ms, before = _median_ms(lambda: JSONResponse(jsonable_encoder(payload)).body, args.repeat)
+    after_ms, after = _median_ms(lambda: FastJSONResponse(payload).body, args.repeat)
+
+    print(f"{args.jobs} jobs, median of {args.repeat} renders")
+    print(f"  {'':<30}{'ms':>10}{'bytes':>12}")
+    print(f"  {'before: encoder + json.dumps':<30}{before_ms:>10.2f}{len(before):>12,}")
+    print(f"  {'after: orjson':<30}{after_ms:>10.2f}{len(after):>12,}")
+    print(f"  speed-up: {before_ms / after_ms:.1f}x")
+    print()
+    print(f"  {'on the wire':<30}{'ms':>10}{'bytes':>12}{'ratio':>8}")
+    print(f"  {'identity':<30}{0:>10.2f}{len(after):>12,}{1:>8.1f}")
+    for encoding in ("gzip", "br"):
+        ms, body = _median_ms(lambda: _Compressor(encoding).compress(after, final=True), max(args.repeat // 5, 3))
+        print(f"  {encoding:<30}{ms:>10.2f}{len(body):>12,}{len(after) / len(body):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
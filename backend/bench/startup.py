@@ -0,0 +1,153 @@
+"""
+Cold-start benchmark: how long a new API process takes before it serves traffic.
+
+For each run it measures, in fresh processes:
+- import: wall time of `import main` (module imports plus provider construction),
+  with the slowest imported packages from `python -X importtime`;
+- first request: from spawning uvicorn to the first 200 from /metrics, which
+  covers the interpreter, imports and the lifespan (schema check, listeners);
+- first DB request: latency of the first request that needs a database
+  connection (a failed login) once the server is up.
+
+Provider SDK keys are replaced with dummies, so nothing is ever sent to a paid
+API; --providers compares import time across AI_PROVIDER settings. Needs the
+Postgres at DATABASE_URL, already migrated (`python database.py`).
+
+Run from backend/:
+    python -m bench.startup
+    python -m bench.startup --runs 10 --providers fake,claude,openai,gemini,groq
+    python -m bench.startup --max-first-request 3 --output startup.json
+
+Exits non-zero when the median time to first request exceeds --max-first-request.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from bench.loadtest import _free_port
+
+DUMMY_KEYS = {
+    name: "bench-not-a-key"
+    for name in ("ANTHROPIC_API_KEY", "OPENAI_API_KEY", "GEMINI_API_KEY", "GROQ_API_KEY")
+}
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def _env(provider: str) -> dict:
+    env = {**os.environ, **DUMMY_KEYS, "AI_PROVIDER": provider}
+    env.setdefault("LOG_LEVEL", "WARNING")
+    env["QUESTION_GEN_WORKERS"] = "0"  # would call the provider in the background
+    return env
+
+
+def measure_import(provider: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], env=_env(provider), capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(provider: str, top: int) -> list[tuple[str, float]]:
+    """Top-level packages imported by main, by cumulative import time (seconds)."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        env=_env(provider), capture_output=True, text=True, check=True,
+    )
+    totals: dict[str, float] = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2  # two spaces per nesting level
+        if depth == 1:  # imported directly by main
+            totals[name.strip()] = int(cumulative) / 1e6
+    return sorted(totals.items(), key=lambda kv: -kv[1])[:top]
+
+
+async def measure_first_request(provider: str, timeout: float = 60) -> tuple[float, float]:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=_env(provider),
+    )
+    try:
+        async with httpx.AsyncClient(base_url=url, timeout=10) as client:
+            while True:
+                try:
+                    if (await client.get("/metrics")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.perf_counter() - start > timeout or server.poll() is not None:
+                    raise RuntimeError(f"server did not become ready within {timeout}s")
+                await asyncio.sleep(0.01)
+            first_request = time.perf_counter() - start
+            db_start = time.perf_counter()
+            await client.post("/api/auth/login", json={"email": "bench-startup@example.com", "password": "x" * 8})
+            return first_request, time.perf_counter() - db_start
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _summary(values: list[float]) -> dict:
+    return {"median": statistics.median(values), "min": min(values), "max": max(values)}
+
+
+async def main(args) -> int:
+    results: dict = {"runs": args.runs, "imports": {}}
+    for provider in args.providers:
+        samples = [measure_import(provider) for _ in range(args.runs)]
+        results["imports"][provider] = _summary(samples)
+        print(f"import main (AI_PROVIDER={provider}): median {_summary(samples)['median']:.2f}s "
+              f"[{min(samples):.2f}–{max(samples):.2f}]")
+
+    slowest = slowest_imports(args.providers[0], args.top)
+    results["slowest_imports"] = dict(slowest)
+    print(f"\nslowest imports (AI_PROVIDER={args.providers[0]}):")
+    for name, seconds in slowest:
+        print(f"  {seconds:6.3f}s  {name}")
+
+    first, first_db = [], []
+    for _ in range(args.runs):
+        ready, db = await measure_first_request(args.providers[0])
+        first.append(ready)
+        first_db.append(db)
+    results["first_request"] = _summary(first)
+    results["first_db_request"] = _summary(first_db)
+    print(f"\nspawn → first request: median {statistics.median(first):.2f}s [{min(first):.2f}–{max(first):.2f}]")
+    print(f"first DB request:      median {statistics.median(first_db) * 1000:.0f} ms")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+    if args.max_first_request and statistics.median(first) > args.max_first_request:
+        print(f"\nmedian time to first request exceeds {args.max_first_request}s")
+        return 1
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="API cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--providers", default="fake",
+                        type=lambda value: [p.strip() for p in value.split(",") if p.strip()],
+                        help="comma-separated AI_PROVIDER values to compare import time for; "
+                             "the first one is also used for the first-request runs")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--max-first-request", type=float, help="fail above this median (seconds)")
+    parser.add_argument("--output", help="also write the results as JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,492 @@
+"""
+Offline bulk re-parse of stored jobs, for prompt changes and model switches.
+
+Selects jobs by parse provenance (Job.parse_*) or date, then re-parses their
+stored raw text with the configured AI_PROVIDER:
+
+    batch    providers with a batch API (Claude Message Batches, OpenAI Batch):
+             jobs are submitted in chunks of --batch-size, polled every
+             --poll-seconds and applied as each batch ends. Roughly half price,
+             with no interactive rate limits; a batch can take up to 24 h.
+    direct   everything else, or --no-batch: --concurrency parallel calls,
+             at most --rate per second.
+
+Results are applied per chunk in one UPDATE over unnest() arrays, together
+with the similarity reindex and the item status changes, in one transaction.
+Progress lives in reparse_runs / reparse_items, so an interrupted run picks
+up where it stopped with --resume: submitted batches are polled again, not
+resubmitted. Each user with updated jobs gets a "resync" event.
+
+Run from backend/ (same .env as the API):
+    python bulk_reparse.py --stale-prompt --dry-run
+    python bulk_reparse.py --stale-prompt
+    python bulk_reparse.py --model gpt-4o-mini --parsed-before 2026-01-01
+    python bulk_reparse.py --never-parsed --no-batch --concurrency 8 --rate 5
+    python bulk_reparse.py --status
+    python bulk_reparse.py --resume 3 [--retry-failed]
+
+Offline testing: python -m bench.fake_batch_api, then
+    OPENAI_BASE_URL=http://localhost:8100/v1 OPENAI_API_KEY=x AI_PROVIDER=openai python bulk_reparse.py ...
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import date
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy import text
+
+from cache_bus import invalidate
+from database import AsyncSessionLocal, engine, ensure_schema
+from events import publish
+from job_text import prepare_job_text
+from log import get_logger, setup_logging, shutdown_logging
+from providers import transport
+from providers.base import BaseProvider, ProviderCall, measure_call, prompt_hash
+from providers.loader import create_provider
+from similarity import reindex_jobs
+
+DIRECT_CHUNK = 100  # jobs per apply transaction on the direct path
+
+log = get_logger("reparse")
+
+
+# ---------------------------------------------------------------------------
+# Selection
+# ---------------------------------------------------------------------------
+
+def _conditions(args, provider: BaseProvider) -> tuple[list[str], dict]:
+    conditions = ["raw_text <> ''"]
+    params: dict = {}
+    if args.stale_prompt:
+        conditions.append("parse_prompt_hash IS DISTINCT FROM :current_prompt")
+        params["current_prompt"] = prompt_hash("parse_job")
+    if args.stale_model:
+        conditions.append("(parse_provider, parse_model) IS DISTINCT FROM (:current_provider, :current_model)")
+        params["current_provider"], params["current_model"] = provider.name, provider.model
+    if args.never_parsed:
+        conditions.append("parsed_at IS NULL")
+    if args.prompt_hash:
+        conditions.append("parse_prompt_hash = :prompt_hash")
+        params["prompt_hash"] = args.prompt_hash
+    if args.provider:
+        conditions.append("parse_provider = :provider")
+        params["provider"] = args.provider
+    if args.model:
+        conditions.append("parse_model = :model")
+        params["model"] = args.model
+    if args.parsed_before:
+        conditions.append("(parsed_at IS NULL OR parsed_at < :parsed_before)")
+        params["parsed_before"] = args.parsed_before
+    if args.clipped_after:
+        conditions.append("clipped_at >= :clipped_after")
+        params["clipped_after"] = args.clipped_after
+    if args.clipped_before:
+        conditions.append("clipped_at < :clipped_before")
+        params["clipped_before"] = args.clipped_before
+    if args.user:
+        conditions.append("user_id = :user_id")
+        params["user_id"] = args.user
+    return conditions, params
+
+
+def _filters(args) -> dict:
+    keys = ("stale_prompt", "stale_model", "never_parsed", "prompt_hash", "provider", "model",
+            "parsed_before", "clipped_after", "clipped_before", "user", "limit")
+    return {k: str(v) if isinstance(v, date) else v for k in keys if (v := getattr(args, k))}
+
+
+async def count_matching(args, provider: BaseProvider) -> int:
+    conditions, params = _conditions(args, provider)
+    async with AsyncSessionLocal() as session:
+        result = await session.exec(text(f"SELECT count(*) FROM jobs WHERE {' AND '.join(conditions)}"), params=params)
+        count = result.scalar_one()
+    return min(count, args.limit) if args.limit else count
+
+
+async def create_run(args, provider: BaseProvider) -> tuple[int, int]:
+    conditions, params = _conditions(args, provider)
+    async with AsyncSessionLocal() as session:
+        result = await session.exec(text("""
+            INSERT INTO reparse_runs (provider, model, prompt_hash, filters)
+            VALUES (:provider_name, :model_name, :run_prompt, CAST(:filters AS jsonb))
+            RETURNING id
+        """), params={
+            "provider_name": provider.name, "model_name": provider.model,
+            "run_prompt": prompt_hash("parse_job"), "filters": json.dumps(_filters(args)),
+        })
+        run_id = result.scalar_one()
+        result = await session.exec(text(f"""
+            INSERT INTO reparse_items (run_id, job_id)
+            SELECT :run_id, id FROM jobs WHERE {' AND '.join(conditions)}
+            ORDER BY id LIMIT :limit
+        """), params={**params, "run_id": run_id, "limit": args.limit})
+        await session.commit()
+    return run_id, result.rowcount
+
+
+# ---------------------------------------------------------------------------
+# Progress
+# ---------------------------------------------------------------------------
+
+async def _take_pending(run_id: int, limit: int) -> list[tuple[int, str]]:
+    """Up to `limit` pending (job_id, raw_text); items whose job is gone are failed on the way."""
+    async with AsyncSessionLocal() as session:
+        await session.exec(text("""
+            UPDATE reparse_items i SET status = 'failed', error = 'job deleted'
+            WHERE i.run_id = :run_id AND i.status = 'pending'
+              AND NOT EXISTS (SELECT 1 FROM jobs j WHERE j.id = i.job_id)
+        """), params={"run_id": run_id})
+        result = await session.exec(text("""
+            SELECT i.job_id, j.raw_text FROM reparse_items i JOIN jobs j ON j.id = i.job_id
+            WHERE i.run_id = :run_id AND i.status = 'pending'
+            ORDER BY i.job_id LIMIT :limit
+        """), params={"run_id": run_id, "limit": limit})
+        rows = [(job_id, raw_text) for job_id, raw_text in result.all()]
+        await session.commit()
+    return rows
+
+
+async def _mark_submitted(run_id: int, job_ids: list[int], batch_id: str) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.exec(text("""
+            UPDATE reparse_items SET status = 'submitted', batch_id = :batch_id
+            WHERE run_id = :run_id AND job_id = ANY(CAST(:job_ids AS integer[]))
+        """), params={"run_id": run_id, "job_ids": job_ids, "batch_id": batch_id})
+        await session.commit()
+
+
+async def _submitted(run_id: int) -> dict[str, list[int]]:
+    """Outstanding batches of a run: batch_id -> job ids still waiting for it."""
+    async with AsyncSessionLocal() as session:
+        result = await session.exec(text("""
+            SELECT batch_id, array_agg(job_id ORDER BY job_id) FROM reparse_items
+            WHERE run_id = :run_id AND status = 'submitted'
+            GROUP BY batch_id
+        """), params={"run_id": run_id})
+        return {batch_id: list(job_ids) for batch_id, job_ids in result.all()}
+
+
+# A field the reparse came back empty for keeps its current value: a model that
+# skips a field must not blank it across thousands of jobs.
+_APPLY_SQL = text("""
+    UPDATE jobs SET
+        title = COALESCE(NULLIF(v.title, ''), jobs.title),
+        company = COALESCE(NULLIF(v.company, ''), jobs.company),
+        location = COALESCE(NULLIF(v.location, ''), jobs.location),
+        salary = COALESCE(NULLIF(v.salary, ''), jobs.salary),
+        mode = COALESCE(NULLIF(v.mode, ''), jobs.mode),
+        seniority = COALESCE(NULLIF(v.seniority, ''), jobs.seniority),
+        contract = COALESCE(NULLIF(v.contract, ''), jobs.contract),
+        stack = CASE WHEN v.stack = '[]' THEN jobs.stack ELSE CAST(v.stack AS jsonb) END,
+        description = COALESCE(NULLIF(v.description, ''), jobs.description),
+        parse_provider = :provider_name, parse_model = :model_name,
+        parse_prompt_hash = :run_prompt, parsed_at = now(), parse_latency_ms = v.latency_ms,
+        parse_input_tokens = v.input_tokens, parse_output_tokens = v.output_tokens
+    FROM unnest(
+        CAST(:ids AS integer[]), CAST(:titles AS text[]), CAST(:companies AS text[]),
+        CAST(:locations AS text[]), CAST(:salaries AS text[]), CAST(:modes AS text[]),
+        CAST(:seniorities AS text[]), CAST(:contracts AS text[]), CAST(:stacks AS text[]),
+        CAST(:descriptions AS text[]), CAST(:latencies AS integer[]),
+        CAST(:input_tokens AS integer[]), CAST(:output_tokens AS integer[])
+    ) AS v(id, title, company, location, salary, mode, seniority, contract, stack, description,
+           latency_ms, input_tokens, output_tokens)
+    WHERE jobs.id = v.id
+    RETURNING jobs.id, jobs.user_id, jobs.title, jobs.description, jobs.stack
+""")
+
+_MARK_SQL = text("""
+    UPDATE reparse_items i SET status = v.status, error = v.error
+    FROM unnest(CAST(:job_ids AS integer[]), CAST(:statuses AS text[]), CAST(:errors AS text[]))
+        AS v(job_id, status, error)
+    WHERE i.run_id = :run_id AND i.job_id = v.job_id
+""")
+
+
+async def apply_results(
+    run: dict,
+    job_ids: list[int],
+    results: dict[str, dict | Exception],
+    calls: dict[str, ProviderCall] | None = None,
+) -> tuple[int, int]:
+    """Write parsed fields and item statuses for one chunk in a single transaction.
+
+    Results that say the page is not a job offer, or come back without a title,
+    are marked failed and leave the job untouched; they were clipped as offers.
+    calls (direct path only) fills parse_latency_ms and token counts; batch
+    results leave them NULL, since a batch's wall time says nothing about the call.
+    """
+    calls = calls or {}
+    parsed: dict[int, dict] = {}
+    errors: dict[int, str] = {}
+    for job_id in job_ids:
+        result = results.get(f"job-{job_id}")
+        if not isinstance(result, dict):
+            errors[job_id] = str(result) if result is not None else "no result"
+        elif result.get("is_job_offer") is False:
+            errors[job_id] = "reparse says not a job offer"
+        elif not str(result.get("title") or "").strip():
+            errors[job_id] = "reparse returned no title"
+        else:
+            parsed[job_id] = result
+
+    async with AsyncSessionLocal() as session:
+        if parsed:
+            rows = list(parsed.items())
+            row_calls = [calls.get(f"job-{job_id}") for job_id, _ in rows]
+            result = await session.exec(_APPLY_SQL, params={
+                "provider_name": run["provider"], "model_name": run["model"], "run_prompt": run["prompt_hash"],
+                "ids": [job_id for job_id, _ in rows],
+                **{
+                    column: [str(p.get(field) or "") for _, p in rows]
+                    for column, field in (
+                        ("titles", "title"), ("companies", "company"), ("locations", "location"),
+                        ("salaries", "salary"), ("modes", "mode"), ("seniorities", "seniority"),
+                        ("contracts", "contract"), ("descriptions", "description"),
+                    )
+                },
+                "stacks": [json.dumps(p.get("stack") or []) for _, p in rows],
+                "latencies": [c.latency_ms if c else None for c in row_calls],
+                "input_tokens": [c.usage.input_tokens if c else None for c in row_calls],
+                "output_tokens": [c.usage.output_tokens if c else None for c in row_calls],
+            })
+            updated = [dict(row) for row in result.mappings().all()]
+            await reindex_jobs(session, updated)
+            user_ids = sorted({row["user_id"] for row in updated})
+            for user_id in user_ids:
+                await publish(session, user_id, "resync", {})
+            await invalidate(session, "match_matrix", *user_ids)  # stacks changed
+        marks = [(job_id, "done", None) for job_id in parsed] + [(job_id, "failed", e) for job_id, e in errors.items()]
+        await session.exec(_MARK_SQL, params={
+            "run_id": run["id"],
+            "job_ids": [m[0] for m in marks], "statuses": [m[1] for m in marks], "errors": [m[2] for m in marks],
+        })
+        await session.commit()
+    log.info("applied", run_id=run["id"], done=len(parsed), failed=len(errors))
+    return len(parsed), len(errors)
+
+
+# ---------------------------------------------------------------------------
+# Execution
+# ---------------------------------------------------------------------------
+
+class _Throttle:
+    """Spaces call starts at least 1/rate seconds apart (no limit when rate is 0)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self.next_slot = 0.0
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def run_direct(run: dict, provider: BaseProvider, concurrency: int, rate: float) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    throttle = _Throttle(rate)
+
+    async def parse(job_id: int, raw_text: str) -> tuple[str, dict | Exception, ProviderCall]:
+        async with semaphore:
+            await throttle.wait()
+            with measure_call() as call:
+                try:
+                    result = await provider.parse_job(prepare_job_text(raw_text).text)
+                except Exception as err:
+                    result = err
+            return f"job-{job_id}", result, call
+
+    while chunk := await _take_pending(run["id"], DIRECT_CHUNK):
+        parsed = await asyncio.gather(*(parse(job_id, raw_text) for job_id, raw_text in chunk))
+        results = {custom_id: result for custom_id, result, _ in parsed}
+        calls = {custom_id: call for custom_id, _, call in parsed}
+        await apply_results(run, [job_id for job_id, _ in chunk], results, calls)
+
+
+async def run_batched(run: dict, provider: BaseProvider, batch_size: int, max_batches: int, poll_seconds: float) -> None:
+    outstanding = await _submitted(run["id"])
+    while True:
+        while len(outstanding) < max_batches and (chunk := await _take_pending(run["id"], batch_size)):
+            requests = {f"job-{job_id}": prepare_job_text(raw_text).text for job_id, raw_text in chunk}
+            batch_id = await provider.submit_batch("parse_job", requests)
+            job_ids = [job_id for job_id, _ in chunk]
+            await _mark_submitted(run["id"], job_ids, batch_id)
+            outstanding[batch_id] = job_ids
+            log.info("batch.submitted", run_id=run["id"], batch_id=batch_id, jobs=len(job_ids))
+        if not outstanding:
+            return
+
+        for batch_id, job_ids in list(outstanding.items()):
+            status = await provider.batch_status(batch_id)
+            if status == "running":
+                continue
+            results = await provider.batch_results(batch_id, "parse_job") if status == "ended" else {}
+            if status == "failed":
+                log.warning("batch.failed", run_id=run["id"], batch_id=batch_id, jobs=len(job_ids))
+            await apply_results(run, job_ids, results)
+            del outstanding[batch_id]
+        if outstanding:
+            await asyncio.sleep(poll_seconds)
+
+
+async def _load_run(run_id: int) -> dict | None:
+    async with AsyncSessionLocal() as session:
+        result = await session.exec(
+            text("SELECT id, provider, model, prompt_hash FROM reparse_runs WHERE id = :run_id"),
+            params={"run_id": run_id},
+        )
+        row = result.mappings().first()
+    return dict(row) if row else None
+
+
+async def _finish(run_id: int) -> dict[str, int]:
+    async with AsyncSessionLocal() as session:
+        result = await session.exec(
+            text("SELECT status, count(*) FROM reparse_items WHERE run_id = :run_id GROUP BY status"),
+            params={"run_id": run_id},
+        )
+        counts = dict(result.all())
+        if not counts.get("pending") and not counts.get("submitted"):
+            await session.exec(
+                text("UPDATE reparse_runs SET finished_at = now() WHERE id = :run_id AND finished_at IS NULL"),
+                params={"run_id": run_id},
+            )
+        await session.commit()
+    return counts
+
+
+async def print_status(run_id: int | None) -> None:
+    async with AsyncSessionLocal() as session:
+        result = await session.exec(text("""
+            SELECT r.id, r.provider, r.model, r.prompt_hash, r.created_at, r.finished_at, r.filters,
+                   count(*) FILTER (WHERE i.status = 'pending') AS pending,
+                   count(*) FILTER (WHERE i.status = 'submitted') AS submitted,
+                   count(*) FILTER (WHERE i.status = 'done') AS done,
+                   count(*) FILTER (WHERE i.status = 'failed') AS failed
+            FROM reparse_runs r LEFT JOIN reparse_items i ON i.run_id = r.id
+            WHERE CAST(:run_id AS integer) IS NULL OR r.id = :run_id
+            GROUP BY r.id ORDER BY r.id DESC LIMIT 20
+        """), params={"run_id": run_id})
+        rows = result.mappings().all()
+    for r in rows:
+        state = f"finished {r['finished_at']:%Y-%m-%d %H:%M}" if r["finished_at"] else "open"
+        print(
+            f"run {r['id']}  {r['provider']}/{r['model']} prompt {r['prompt_hash']}  {state}\n"
+            f"    pending {r['pending']}  submitted {r['submitted']}  done {r['done']}  failed {r['failed']}"
+            f"  filters {json.dumps(r['filters'])}"
+        )
+    if not rows:
+        print("no reparse runs")
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-parse stored jobs with the configured AI_PROVIDER.")
+    select = parser.add_argument_group("selection (combined with AND)")
+    select.add_argument("--stale-prompt", action="store_true", help="parsed with a different PARSE_PROMPT")
+    select.add_argument("--stale-model", action="store_true", help="parsed by a different provider/model")
+    select.add_argument("--never-parsed", action="store_true", help="no successful parse recorded")
+    select.add_argument("--prompt-hash", help="parsed with this prompt hash")
+    select.add_argument("--provider", help="parsed by this provider")
+    select.add_argument("--model", help="parsed by this model")
+    select.add_argument("--parsed-before", type=date.fromisoformat, metavar="YYYY-MM-DD")
+    select.add_argument("--clipped-after", type=date.fromisoformat, metavar="YYYY-MM-DD")
+    select.add_argument("--clipped-before", type=date.fromisoformat, metavar="YYYY-MM-DD")
+    select.add_argument("--user", help="only this user's jobs (user id)")
+    select.add_argument("--all", action="store_true", help="every job with stored raw text")
+    select.add_argument("--limit", type=int)
+
+    execution = parser.add_argument_group("execution")
+    execution.add_argument("--dry-run", action="store_true", help="count matching jobs and exit")
+    execution.add_argument("--no-batch", action="store_true", help="direct calls even if a batch API exists")
+    execution.add_argument("--batch-size", type=int, default=1000)
+    execution.add_argument("--max-batches", type=int, default=4, help="batches in flight at once")
+    execution.add_argument("--poll-seconds", type=float, default=60)
+    execution.add_argument("--concurrency", type=int, default=4, help="direct path: parallel calls")
+    execution.add_argument("--rate", type=float, default=0, help="direct path: max calls per second")
+
+    runs = parser.add_argument_group("runs")
+    runs.add_argument("--resume", type=int, metavar="RUN_ID", help="continue an interrupted run")
+    runs.add_argument("--retry-failed", action="store_true", help="with --resume: queue failed items again")
+    runs.add_argument("--status", nargs="?", const=0, type=int, metavar="RUN_ID", help="show recent runs")
+    args = parser.parse_args(argv)
+
+    selectors = ("stale_prompt", "stale_model", "never_parsed", "prompt_hash", "provider", "model",
+                 "parsed_before", "clipped_after", "clipped_before", "user", "all")
+    if args.resume is None and args.status is None and not any(getattr(args, k) for k in selectors):
+        parser.error("choose jobs with a selection option, or --all")
+    return args
+
+
+async def main(argv: list[str]) -> int:
+    args = _parse_args(argv)
+    setup_logging()
+    try:
+        await ensure_schema()
+        if args.status is not None:
+            await print_status(args.status or None)
+            return 0
+
+        provider = create_provider(os.getenv("AI_PROVIDER", "").lower())
+        if args.resume is not None:
+            run = await _load_run(args.resume)
+            if run is None:
+                print(f"run {args.resume} not found", file=sys.stderr)
+                return 1
+            current = (provider.name, provider.model, prompt_hash("parse_job"))
+            if (run["provider"], run["model"], run["prompt_hash"]) != current:
+                print(
+                    f"run {run['id']} was started with {run['provider']}/{run['model']} prompt {run['prompt_hash']}; "
+                    f"the current setup is {'/'.join(current[:2])} prompt {current[2]}",
+                    file=sys.stderr,
+                )
+                return 1
+            if args.retry_failed:
+                async with AsyncSessionLocal() as session:
+                    await session.exec(text("""
+                        UPDATE reparse_items SET status = 'pending', batch_id = NULL, error = NULL
+                        WHERE run_id = :run_id AND status = 'failed'
+                    """), params={"run_id": run["id"]})
+                    await session.exec(text("UPDATE reparse_runs SET finished_at = NULL WHERE id = :run_id"),
+                                       params={"run_id": run["id"]})
+                    await session.commit()
+        elif args.dry_run:
+            print(f"{await count_matching(args, provider)} jobs match")
+            return 0
+        else:
+            run_id, selected = await create_run(args, provider)
+            run = await _load_run(run_id)
+            print(f"run {run_id}: {selected} jobs selected")
+
+        if provider.supports_batch and not args.no_batch:
+            await run_batched(run, provider, args.batch_size, args.max_batches, args.poll_seconds)
+        else:
+            if await _submitted(run["id"]):
+                print(f"run {run['id']} has submitted batches; resume it without --no-batch", file=sys.stderr)
+                return 1
+            await run_direct(run, provider, args.concurrency, args.rate)
+
+        counts = await _finish(run["id"])
+        print(f"run {run['id']}: " + ", ".join(f"{k} {v}" for k, v in sorted(counts.items())))
+        return 0 if not counts.get("failed") else 2
+    finally:
+        await transport.aclose()
+        await engine.dispose()
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(asyncio.run(main(sys.argv[1:])))
+    except KeyboardInterrupt:
+        print("interrupted; continue with --resume <run id> (see --status)", file=sys.stderr)
+        sys.exit(130)
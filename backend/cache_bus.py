@@ -0,0 +1,209 @@
+"""
+Cross-worker invalidation for in-process caches, over Postgres LISTEN/NOTIFY.
+
+Cache owners register a named cache once at import time:
+
+    _matrix_cache = caches.register("match_matrix", ttl_seconds=600)
+
+and writers call invalidate() inside the transaction that changes the data
+behind a key. When that transaction commits, the key is dropped in this
+worker right away and Postgres delivers the NOTIFY to every other worker's
+bus (including processes such as bulk_reparse.py that only publish). A
+rolled-back transaction invalidates nothing. Entries are refilled lazily by
+the next read.
+
+Two races would still serve stale data, and both are closed here:
+- a reader that loaded rows before the commit must not store its value after
+  the invalidation — set() takes the version() read before loading and is
+  ignored if the key was invalidated in between;
+- invalidations sent while a worker's LISTEN connection is down are lost, so
+  caches serve no hits until it is back, and are cleared on reconnect.
+
+The TTL only bounds memory and data that changes outside the database
+(e.g. the NoFluffJobs market stats).
+"""
+import asyncio
+import json
+import time
+from typing import Any, Hashable
+
+import asyncpg
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import DATABASE_URL
+from log import get_logger
+from metrics import Counter
+
+CHANNEL = "hiretree_cache"
+HEARTBEAT_SECONDS = 15
+MAX_KEYS_PER_NOTIFY = 100  # uuid keys; stays well under Postgres' 8000-byte payload limit
+APPLICATION_NAME = "hiretree-cache-bus"  # lets bench/cache_bus.py find and kill the listeners
+
+log = get_logger("cache_bus")
+
+_lookups = Counter("cache_lookups_total", "In-process cache reads", ("cache", "outcome"))
+_invalidations = Counter(
+    "cache_invalidations_total", "Cache keys dropped, by where the invalidation came from", ("cache", "origin"),
+)
+
+_PENDING = "cache_bus.pending"  # session.info key: invalidations waiting for commit
+
+
+class Cache:
+    """Key → value with a TTL; only serves hits while the bus is listening."""
+
+    def __init__(self, bus: "CacheBus", name: str, ttl_seconds: float):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self._bus = bus
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        self._versions: dict[Hashable, int] = {}
+        self._generation = 0  # bumped by clear(), invalidates every outstanding version()
+        self._hit = _lookups.labels(name, "hit")
+        self._miss = _lookups.labels(name, "miss")
+        self._bypass = _lookups.labels(name, "bypass")
+
+    def get(self, key: Hashable) -> Any | None:
+        if not self._bus.connected:
+            self._bypass.inc()
+            return None
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+            self._hit.inc()
+            return entry[1]
+        self._miss.inc()
+        return None
+
+    def version(self, key: Hashable) -> tuple[int, int]:
+        """Read before loading the value to be cached; pass it to set()."""
+        return self._generation, self._versions.get(key, 0)
+
+    def set(self, key: Hashable, value: Any, version: tuple[int, int]) -> None:
+        if self._bus.connected and self.version(key) == version:
+            self._entries[key] = (time.monotonic(), value)
+
+    def drop(self, keys: list | None) -> None:
+        """Forget keys (None: everything) in this worker only; see invalidate()."""
+        if keys is None:
+            self.clear()
+            return
+        for key in keys:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._versions.clear()
+        self._entries.clear()
+
+
+class CacheBus:
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self.caches: dict[str, Cache] = {}
+        self.connected = False
+        self._conn: asyncpg.Connection | None = None
+        self._task: asyncio.Task | None = None
+
+    def register(self, name: str, ttl_seconds: float) -> Cache:
+        if name in self.caches:
+            raise ValueError(f"cache {name!r} is already registered")
+        cache = self.caches[name] = Cache(self, name, ttl_seconds)
+        return cache
+
+    def drop(self, name: str, keys: list | None, origin: str) -> None:
+        cache = self.caches.get(name)
+        if cache is None:  # registered only in other processes
+            return
+        cache.drop(keys)
+        _invalidations.labels(name, origin).inc(len(keys) if keys is not None else 1)
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self.connected = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._conn and not self._conn.is_closed():
+            await self._conn.close()
+
+    async def _run(self) -> None:
+        delay = 1.0
+        while True:
+            try:
+                self._conn = await asyncpg.connect(
+                    self.dsn, server_settings={"application_name": APPLICATION_NAME},
+                )
+                await self._conn.add_listener(CHANNEL, self._on_notify)
+                lost = asyncio.Event()
+                self._conn.add_termination_listener(lambda conn: self._on_lost(lost))
+                # Anything cached before now may have missed an invalidation.
+                self._clear_all()
+                self.connected = True
+                log.info("listening", channel=CHANNEL, caches=sorted(self.caches))
+                delay = 1.0
+                while not self._conn.is_closed():
+                    try:
+                        await asyncio.wait_for(lost.wait(), timeout=HEARTBEAT_SECONDS)
+                    except asyncio.TimeoutError:
+                        await self._conn.execute("SELECT 1")  # detect dead connections
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                log.warning("listener_failed", error=str(err), retry_in=delay)
+                if self._conn and not self._conn.is_closed():
+                    self._conn.terminate()
+            self.connected = False
+            self._clear_all()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def _on_lost(self, lost: asyncio.Event) -> None:
+        # Stop serving hits as soon as the socket closes, not at the next heartbeat.
+        self.connected = False
+        self._clear_all()
+        lost.set()
+
+    def _on_notify(self, conn, pid, channel, payload: str) -> None:
+        message = json.loads(payload)
+        self.drop(message["cache"], message["keys"], "notify")
+
+    def _clear_all(self) -> None:
+        for cache in self.caches.values():
+            cache.clear()
+
+
+async def invalidate(session: AsyncSession, name: str, *keys: Hashable) -> None:
+    """Drop keys of a named cache (no keys: all of it) in every worker once the session commits.
+
+    Keys travel as JSON, so use str or int keys.
+    """
+    batches = [list(keys[i:i + MAX_KEYS_PER_NOTIFY]) for i in range(0, len(keys), MAX_KEYS_PER_NOTIFY)] or [None]
+    for batch in batches:
+        payload = json.dumps({"cache": name, "keys": batch}, separators=(",", ":"))
+        await session.exec(text("SELECT pg_notify(:channel, :payload)"),
+                           params={"channel": CHANNEL, "payload": payload})
+    session.info.setdefault(_PENDING, []).extend((name, batch) for batch in batches)
+
+
+# The local drop must wait for the commit: dropping earlier would let a
+# concurrent reader in this worker re-cache the rows it is about to replace.
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session: Session) -> None:
+    for name, keys in session.info.pop(_PENDING, ()):
+        caches.drop(name, keys, "local")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+caches = CacheBus(DATABASE_URL.replace("+asyncpg", ""))
@@ -0,0 +1,113 @@
+"""
+Per-request database query profiling.
+
+SQLAlchemy cursor events on the shared engine feed a per-request QueryStats
+object (carried in a ContextVar). DBProfilingMiddleware reports it as a
+Server-Timing header and, when DB_SLOW_REQUEST_MS is set, logs requests that
+exceed it. Statements executed DB_REPEAT_THRESHOLD times or more within one
+request are flagged as likely N+1 patterns.
+"""
+import os
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from log import get_logger
+
+SLOW_REQUEST_MS = float(os.getenv("DB_SLOW_REQUEST_MS") or 0)  # 0 = slow log disabled
+REPEAT_THRESHOLD = int(os.getenv("DB_REPEAT_THRESHOLD") or 5)
+
+log = get_logger("db")
+
+
+class QueryStats:
+    __slots__ = ("count", "total", "slowest", "slowest_statement", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement = ""
+        self.statements: dict[str, int] = {}
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.slowest:
+            self.slowest = elapsed
+            self.slowest_statement = statement
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def repeated(self) -> list[tuple[str, int]]:
+        return [(s, n) for s, n in self.statements.items() if n >= REPEAT_THRESHOLD]
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - context._query_start)
+
+
+def install_query_listeners(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _one_line(statement: str, limit: int = 200) -> str:
+    text = " ".join(statement.split())
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+class DBProfilingMiddleware:
+    """Pure ASGI middleware — adds Server-Timing before the response starts."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                timing = (
+                    f'db;dur={stats.total * 1000:.1f};desc="{stats.count} queries", '
+                    f"app;dur={elapsed_ms:.1f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+                _report(scope, stats, elapsed_ms)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+
+
+def _report(scope, stats: QueryStats, elapsed_ms: float) -> None:
+    route = f"{scope['method']} {scope['path']}"
+    for statement, n in stats.repeated():
+        log.warning("possible_n_plus_one", route=route, count=n, statement=_one_line(statement))
+    if SLOW_REQUEST_MS and elapsed_ms >= SLOW_REQUEST_MS:
+        log.warning(
+            "slow_request", route=route, duration_ms=round(elapsed_ms, 1), queries=stats.count,
+            db_ms=round(stats.total * 1000, 1), slowest_ms=round(stats.slowest * 1000, 1),
+            slowest_statement=_one_line(stats.slowest_statement),
+        )
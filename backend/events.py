@@ -0,0 +1,129 @@
+"""
+Per-user change events over Server-Sent Events, fanned out with Postgres LISTEN/NOTIFY.
+
+Writers call publish() inside their transaction; Postgres delivers the NOTIFY
+only if the transaction commits, to every worker's EventHub. Each hub holds
+one dedicated LISTEN connection and routes events to the queues of that
+worker's connected clients.
+"""
+import asyncio
+import json
+
+import asyncpg
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import DATABASE_URL
+from log import get_logger
+
+CHANNEL = "hiretree_events"
+HEARTBEAT_SECONDS = 15
+QUEUE_SIZE = 100
+MAX_IDS_PER_EVENT = 200  # keeps NOTIFY payloads well under Postgres' 8000-byte limit
+
+log = get_logger("events")
+
+
+async def publish(session: AsyncSession, user_id: str, event: str, data: dict) -> None:
+    """Queue an event for delivery when the session's transaction commits."""
+    payload = json.dumps({"user_id": user_id, "event": event, "data": data}, separators=(",", ":"))
+    await session.exec(text("SELECT pg_notify(:channel, :payload)"),
+                       params={"channel": CHANNEL, "payload": payload})
+
+
+async def publish_ids(session: AsyncSession, user_id: str, event: str, ids: list[int], **data) -> None:
+    for start in range(0, len(ids), MAX_IDS_PER_EVENT):
+        await publish(session, user_id, event, {"ids": ids[start:start + MAX_IDS_PER_EVENT], **data})
+
+
+class EventHub:
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self.subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._conn: asyncpg.Connection | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._conn and not self._conn.is_closed():
+            await self._conn.close()
+
+    async def _run(self) -> None:
+        delay = 1.0
+        while True:
+            try:
+                self._conn = await asyncpg.connect(self.dsn)
+                await self._conn.add_listener(CHANNEL, self._on_notify)
+                log.info("listening", channel=CHANNEL)
+                delay = 1.0
+                while not self._conn.is_closed():
+                    await asyncio.sleep(HEARTBEAT_SECONDS)
+                    await self._conn.execute("SELECT 1")  # detect dead connections
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                log.warning("listener_failed", error=str(err), retry_in=delay)
+                if self._conn and not self._conn.is_closed():
+                    self._conn.terminate()
+            # Events may have been missed while disconnected — tell clients to refetch.
+            self._broadcast_all({"event": "resync", "data": {}})
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def _on_notify(self, conn, pid, channel, payload: str) -> None:
+        message = json.loads(payload)
+        for q in self.subscribers.get(message.pop("user_id"), ()):
+            self._offer(q, message)
+
+    def _broadcast_all(self, message: dict) -> None:
+        for queues in self.subscribers.values():
+            for q in queues:
+                self._offer(q, message)
+
+    @staticmethod
+    def _offer(q: asyncio.Queue, message: dict) -> None:
+        try:
+            q.put_nowait(message)
+        except asyncio.QueueFull:
+            # Slow client: replace its backlog with a single resync instruction.
+            while not q.empty():
+                q.get_nowait()
+            q.put_nowait({"event": "resync", "data": {}})
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        q: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.subscribers.setdefault(user_id, set()).add(q)
+        return q
+
+    def unsubscribe(self, user_id: str, q: asyncio.Queue) -> None:
+        queues = self.subscribers.get(user_id)
+        if queues:
+            queues.discard(q)
+            if not queues:
+                del self.subscribers[user_id]
+
+    async def stream(self, user_id: str):
+        """Async generator of SSE frames for one client."""
+        q = self.subscribe(user_id)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(q.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+        finally:
+            self.unsubscribe(user_id, q)
+
+
+hub = EventHub(DATABASE_URL.replace("+asyncpg", ""))
@@ -0,0 +1,129 @@
+"""
+Idempotency-Key support for endpoints that call the AI provider.
+
+A client that retries (the extension on a timeout, a double-clicked button)
+sends the same Idempotency-Key header; the first request runs, later ones get
+its stored response for IDEMPOTENCY_TTL_HOURS instead of another provider call.
+Keys are per user and stored in Postgres, so retries landing on another worker
+are recognized too.
+
+    same key, same request, finished   -> stored response
+    same key, same request, running    -> 409
+    same key, different request        -> 422
+
+Only successful responses are stored; a request that raises releases its key
+so the retry runs again.
+"""
+import functools
+import hashlib
+import json
+import os
+
+from fastapi import HTTPException, UploadFile
+from pydantic import BaseModel
+from sqlalchemy import text
+
+from database import engine
+
+TTL_HOURS = int(os.getenv("IDEMPOTENCY_TTL_HOURS") or 24)
+IN_PROGRESS_TIMEOUT_SECONDS = 300  # a claim older than this is taken to be from a dead worker
+MAX_KEY_LENGTH = 255
+
+# Claim the key unless a live claim or unexpired result already holds it.
+_CLAIM_SQL = text("""
+    INSERT INTO idempotency_keys (user_id, key, endpoint, request_hash)
+    VALUES (:user_id, :key, :endpoint, :request_hash)
+    ON CONFLICT (user_id, key) DO UPDATE
+    SET endpoint = EXCLUDED.endpoint, request_hash = EXCLUDED.request_hash,
+        response = NULL, created_at = now()
+    WHERE idempotency_keys.created_at < now() - make_interval(hours => :ttl_hours)
+       OR (idempotency_keys.response IS NULL
+           AND idempotency_keys.created_at < now() - make_interval(secs => :in_progress_timeout))
+    RETURNING key
+""")
+_LOOKUP_SQL = text("""
+    SELECT endpoint, request_hash, response FROM idempotency_keys
+    WHERE user_id = :user_id AND key = :key
+""")
+_COMPLETE_SQL = text("""
+    UPDATE idempotency_keys SET response = CAST(:response AS jsonb)
+    WHERE user_id = :user_id AND key = :key
+""")
+_RELEASE_SQL = text("DELETE FROM idempotency_keys WHERE user_id = :user_id AND key = :key AND response IS NULL")
+
+
+async def _fingerprint(kwargs: dict) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(kwargs):
+        value = kwargs[name]
+        if isinstance(value, UploadFile):
+            content = await value.read()
+            await value.seek(0)
+            value = {"filename": value.filename, "sha256": hashlib.sha256(content).hexdigest()}
+        elif isinstance(value, BaseModel):
+            value = value.model_dump(mode="json")
+        digest.update(json.dumps([name, value], sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+async def _execute(sql, params: dict):
+    # Own short transactions, independent of the handler's session, so a claim
+    # is visible to concurrent retries before the handler finishes.
+    async with engine.begin() as conn:
+        return await conn.execute(sql, params)
+
+
+def idempotent(endpoint: str):
+    """Decorate a route handler that takes `idempotency_key` and `current_user` parameters.
+
+    The handler's other arguments (except the session) form the request fingerprint.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(**kwargs):
+            key = kwargs.get("idempotency_key")
+            if not key:
+                return await handler(**kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+
+            user_id = kwargs["current_user"].id
+            request_hash = await _fingerprint({
+                name: value for name, value in kwargs.items()
+                if name not in ("idempotency_key", "current_user", "session")
+            })
+            ids = {"user_id": user_id, "key": key}
+
+            claimed = await _execute(_CLAIM_SQL, {
+                **ids, "endpoint": endpoint, "request_hash": request_hash,
+                "ttl_hours": TTL_HOURS, "in_progress_timeout": IN_PROGRESS_TIMEOUT_SECONDS,
+            })
+            if claimed.first() is None:
+                row = (await _execute(_LOOKUP_SQL, ids)).first()
+                if row is None:  # released between the two statements; let the client retry
+                    raise HTTPException(status_code=409, detail="Request with this Idempotency-Key is in progress")
+                if row.endpoint != endpoint or row.request_hash != request_hash:
+                    raise HTTPException(
+                        status_code=422, detail="Idempotency-Key was already used for a different request",
+                    )
+                if row.response is None:
+                    raise HTTPException(status_code=409, detail="Request with this Idempotency-Key is in progress")
+                return row.response
+
+            try:
+                result = await handler(**kwargs)
+            except BaseException:
+                await _execute(_RELEASE_SQL, ids)
+                raise
+            await _execute(_COMPLETE_SQL, {**ids, "response": json.dumps(result, default=str)})
+            return result
+
+        return wrapper
+    return decorator
+
+
+async def prune_idempotency_keys() -> None:
+    await _execute(
+        text("DELETE FROM idempotency_keys WHERE created_at < now() - make_interval(hours => :ttl_hours)"),
+        {"ttl_hours": TTL_HOURS},
+    )
@@ -0,0 +1,152 @@
+"""
+Clean up clipped page text before it is sent to the AI provider.
+
+The extension sends the whole page (navigation, cookie banners, footers,
+"similar offers" lists). Only the job-description block is useful to the
+parser, and every extra line is paid for in prompt tokens.
+"""
+import os
+import re
+from dataclasses import dataclass
+
+# Rough chars-per-token ratio for mixed English/Polish text. Good enough for
+# budgeting — the provider's own tokenizer is not available offline.
+CHARS_PER_TOKEN = 4
+
+TOKEN_BUDGET = int(os.getenv("JOB_TEXT_TOKEN_BUDGET") or 3000)
+
+# Page chrome. Navigation items and buttons only count as a whole line, so a
+# sentence that mentions "register" or "newsletter" survives; notices are
+# matched on whole words anywhere in a short line.
+_RE_BOILERPLATE_LINE = re.compile(
+    r"^(sign in|log in|zaloguj( się)?|register|zarejestruj( się)?|newsletter|accept( all)?|akceptuj\w*"
+    r"|skip to content|share( on \w+)?|udostępnij|follow us|obserwuj nas|regulamin)[\s.!:|»›>-]*$",
+    re.IGNORECASE,
+)
+_RE_BOILERPLATE = re.compile(
+    r"\b(cookies?|ciasteczk\w*|privacy policy|polityk\w* prywatności|terms of (use|service)"
+    r"|all rights reserved|wszelkie prawa zastrzeżone)\b|©",
+    re.IGNORECASE,
+)
+
+# Headings after which the page stops describing this offer.
+_RE_TAIL_MARKER = re.compile(
+    r"^(similar (offers|jobs)|podobne oferty|other (offers|jobs)|inne oferty"
+    r"|recommended (offers|jobs)|polecane oferty|you may also like|zobacz też|see also)\b",
+    re.IGNORECASE,
+)
+
+# Words typical of a job description — used to locate the main block.
+_RE_JOB_KEYWORD = re.compile(
+    r"requirement|responsibilit|we offer|offer|benefit|experience|skills?|stack|salary|remote"
+    r"|hybrid|contract|b2b|uop|wymagani|obowiązk|oferujemy|doświadczeni|umiejętnoś|wynagrodzeni"
+    r"|zdaln|hybrydow|umow|zespoł|team|project|projekt|developer|engineer|inżynier",
+    re.IGNORECASE,
+)
+
+_RE_SPACES = re.compile(r"[ \t ]+")
+_SHORT_LINE = 25  # blocks of lines shorter than this on average are menu-like
+
+
+@dataclass
+class PreparedText:
+    text: str
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _clean_lines(raw_text: str) -> list[str]:
+    lines = [_RE_SPACES.sub(" ", line).strip() for line in raw_text.splitlines()]
+
+    cleaned: list[str] = []
+    seen: set[str] = set()
+    for line in lines:
+        if not line:
+            if cleaned and cleaned[-1]:
+                cleaned.append("")  # keep a single blank line as a block separator
+            continue
+        key = line.lower()
+        if key in seen:
+            continue  # repeated menu items and duplicated blocks; the first copy stays
+        if _RE_BOILERPLATE_LINE.match(line) or (len(line) < 120 and _RE_BOILERPLATE.search(line)):
+            continue
+        seen.add(key)
+        cleaned.append(line)
+    return cleaned
+
+
+def _cut_tail(lines: list[str]) -> list[str]:
+    # Only look past the first third — a marker near the top is a navigation link.
+    start = len(lines) // 3
+    for i in range(start, len(lines)):
+        if _RE_TAIL_MARKER.match(lines[i]):
+            return lines[:i]
+    return lines
+
+
+def _main_block(lines: list[str]) -> list[str]:
+    """Return the densest run of job-description blocks, dropping leading/trailing chrome."""
+    blocks: list[list[str]] = [[]]
+    for line in lines:
+        if line:
+            blocks[-1].append(line)
+        elif blocks[-1]:
+            blocks.append([])
+    blocks = [b for b in blocks if b]
+    if len(blocks) <= 2:
+        return [line for line in lines if line]
+
+    # A block scores for keywords and prose; short menu-like blocks score negative.
+    scores = []
+    for block in blocks:
+        text = " ".join(block)
+        avg_len = len(text) / len(block)
+        score = len(_RE_JOB_KEYWORD.findall(text)) * 2 + len(text) / 200
+        if avg_len < _SHORT_LINE:
+            score -= 2
+        scores.append(score)
+
+    # Maximum-sum contiguous run (Kadane) over the block scores.
+    best_sum, best = float("-inf"), (0, len(blocks))
+    run_sum, run_start = 0.0, 0
+    for i, score in enumerate(scores):
+        if run_sum <= 0:
+            run_sum, run_start = score, i
+        else:
+            run_sum += score
+        if run_sum > best_sum:
+            best_sum, best = run_sum, (run_start, i + 1)
+
+    result: list[str] = []
+    for block in blocks[best[0]:best[1]]:
+        result.extend(block)
+    return result
+
+
+def _truncate(text: str, token_budget: int) -> str:
+    max_chars = token_budget * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n", 0, max_chars)
+    return text[: cut if cut > max_chars // 2 else max_chars]
+
+
+def prepare_job_text(raw_text: str, token_budget: int = TOKEN_BUDGET) -> PreparedText:
+    """Strip boilerplate, keep the main description block and fit it into token_budget."""
+    lines = _cut_tail(_clean_lines(raw_text))
+    main = _main_block(lines)
+    text = "\n".join(main) or raw_text.strip()
+    text = _truncate(text, token_budget)
+    return PreparedText(
+        text=text,
+        tokens_before=estimate_tokens(raw_text),
+        tokens_after=estimate_tokens(text),
+    )
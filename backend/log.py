@@ -0,0 +1,171 @@
+"""
+Structured, non-blocking logging.
+
+Handlers only enqueue the record; a QueueListener thread formats it as one
+JSON line and writes it to stdout. When the queue is full the record is
+dropped (and counted) instead of blocking the event loop.
+
+    log = get_logger("clip")
+    log.info("parsed", title=title, stack=stack)
+    log.debug("tokens", saved=n, sample=0.1)   # keep ~10% of these events
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()  # json | text
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE") or 10_000)
+
+request_id: ContextVar[str] = ContextVar("request_id", default="-")
+
+
+class _DroppingQueueHandler(QueueHandler):
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the writer thread; only capture request-scoped state here.
+        record.request_id = request_id.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.msg,
+            "request_id": getattr(record, "request_id", "-"),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " | ".join(f"{k}: {v}" for k, v in getattr(record, "fields", {}).items())
+        line = f"[{record.name}] {record.msg}" + (f" | {fields}" if fields else "")
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_handler = _DroppingQueueHandler(_queue)
+_listener: QueueListener | None = None
+_root = logging.getLogger("hiretree")
+
+
+def setup_logging() -> None:
+    """Attach the queue handler and start the background writer.
+
+    Called from the API lifespan and CLI entry points. Safe to call again, also
+    after shutdown_logging() (e.g. a second lifespan cycle in tests or --reload).
+    """
+    global _listener
+    if _listener is not None:
+        return
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(_JSONFormatter() if LOG_FORMAT == "json" else _TextFormatter())
+    _listener = QueueListener(_queue, stream, respect_handler_level=False)
+    _listener.start()
+    _root.addHandler(_handler)
+    _root.setLevel(LOG_LEVEL)
+    _root.propagate = False
+    atexit.unregister(shutdown_logging)
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is None:
+        return
+    # Detach first, so records logged from here on go to logging's last-resort
+    # handler instead of filling a queue nobody drains.
+    _root.removeHandler(_handler)
+    _root.propagate = True
+    _listener.stop()
+    _listener = None
+    if _handler.dropped:
+        print(f"[log] dropped {_handler.dropped} records (queue full)", file=sys.stderr)
+        _handler.dropped = 0
+
+
+class Logger:
+    def __init__(self, name: str):
+        self._logger = _root.getChild(name)
+
+    def _log(self, level: int, event: str, sample: float, exc_info, fields: dict) -> None:
+        if not self._logger.isEnabledFor(level):
+            return
+        if sample < 1.0 and random.random() >= sample:
+            return
+        if sample < 1.0:
+            fields["sample"] = sample
+        self._logger.log(level, event, exc_info=exc_info, extra={"fields": fields})
+
+    def debug(self, event: str, *, sample: float = 1.0, **fields) -> None:
+        self._log(logging.DEBUG, event, sample, None, fields)
+
+    def info(self, event: str, *, sample: float = 1.0, **fields) -> None:
+        self._log(logging.INFO, event, sample, None, fields)
+
+    def warning(self, event: str, *, sample: float = 1.0, **fields) -> None:
+        self._log(logging.WARNING, event, sample, None, fields)
+
+    def error(self, event: str, *, exc_info=None, **fields) -> None:
+        self._log(logging.ERROR, event, 1.0, exc_info, fields)
+
+
+def get_logger(name: str) -> Logger:
+    return Logger(name)
+
+
+class RequestIdMiddleware:
+    """Pure ASGI middleware — reuses an incoming X-Request-ID or generates one, and echoes it back."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rid = ""
+        for key, value in scope.get("headers", []):
+            if key == b"x-request-id":
+                rid = value.decode("latin-1")[:64]
+                break
+        rid = rid or uuid.uuid4().hex[:16]
+        token = request_id.set(rid)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", rid.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id.reset(token)
@@ -1,40 +1,86 @@
+import asyncio
+import html
 import os
 import random
 import time
+from collections import Counter
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 import httpx
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, Cookie, Response, Request
+import numpy as np
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, Cookie, Header, Response, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, EmailStr, Field
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy import func
+from sqlalchemy import delete, func, text, literal, true, union_all, update
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from providers.claude import ClaudeProvider
-from providers.openai import OpenAIProvider
-from providers.gemini import GeminiProvider
-from providers.groq import GroqProvider
-from providers.base import BaseProvider
+from providers.base import ProviderCall, measure_call, prompt_hash
+from providers import transport as provider_transport
+from providers.loader import load_provider
 from cv_parser import extract_text, anonymize, fingerprint
+from idempotency import idempotent, prune_idempotency_keys
+from job_text import prepare_job_text
+from metrics import render_metrics
+from log import get_logger, setup_logging, shutdown_logging, RequestIdMiddleware
 from profile_utils import skills_to_compact
 from auth import hash_password, verify_password, create_access_token, decode_access_token
-from database import get_session, create_tables
-from models import User, Job, Resume, Question, InterviewSession
+from database import get_session, ensure_schema, prune_tombstones, engine
+from db_profiling import DBProfilingMiddleware, install_query_listeners
+from ranking import build_vocabulary, fit_scores, match_matrix, skill_vector, stack_matrix
+from responses import CompressionMiddleware, FastJSONResponse
+from resume_skills import canonical_skill_name, replace_skills, update_skill
+from question_gen import DIFFICULTIES, TARGET_PER_DIFFICULTY, generator as question_generator
+from similarity import index_job, index_missing, similar_jobs
+from events import hub, publish, publish_ids
+from cache_bus import caches, invalidate
+from models import User, Job, Resume, ResumeSkill, Question, InterviewSession
+
+
+log_auth = get_logger("auth")
+log_jobs = get_logger("jobs")
+log_resumes = get_logger("resumes")
+log_startup = get_logger("startup")
+
+
+async def _startup_maintenance() -> None:
+    """Housekeeping that used to delay startup; the app serves traffic meanwhile."""
+    from seed import seed_questions
+
+    for name, step in (
+        ("prune_tombstones", lambda: prune_tombstones(TOMBSTONE_RETENTION_DAYS)),
+        ("prune_idempotency_keys", prune_idempotency_keys),
+        ("seed_questions", seed_questions),
+    ):
+        try:
+            await step()
+        except Exception as err:
+            log_startup.warning("maintenance_failed", step=name, error=str(err))
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await create_tables()
-    from seed import seed_questions
-    await seed_questions()
+    setup_logging()
+    await ensure_schema()
+    await hub.start()
+    await caches.start()
+    await question_generator.start(provider)
+    maintenance = asyncio.create_task(_startup_maintenance())
     yield
+    maintenance.cancel()
+    await asyncio.gather(maintenance, return_exceptions=True)
+    await question_generator.stop()
+    await provider_transport.aclose()
+    await caches.stop()
+    await hub.stop()
+    shutdown_logging()
 
 
-app = FastAPI(title="HireTree API", lifespan=lifespan)
+app = FastAPI(title="HireTree API", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -43,24 +89,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
+
+install_query_listeners(engine)
+app.add_middleware(DBProfilingMiddleware)
+app.add_middleware(RequestIdMiddleware)
 
 COOKIE_NAME = "access_token"
 COOKIE_MAX_AGE = 7 * 24 * 60 * 60  # 7 days
-
-
-def load_provider() -> BaseProvider:
-    name = os.getenv("AI_PROVIDER", "").lower()
-    if name == "claude":
-        return ClaudeProvider(api_key=os.environ["ANTHROPIC_API_KEY"])
-    if name == "openai":
-        return OpenAIProvider(api_key=os.environ["OPENAI_API_KEY"])
-    if name == "gemini":
-        return GeminiProvider(api_key=os.environ["GEMINI_API_KEY"])
-    if name == "groq":
-        return GroqProvider(api_key=os.environ["GROQ_API_KEY"])
-    raise RuntimeError(
-        f"Unknown AI_PROVIDER '{name}'. Set it to: claude | openai | gemini | groq"
-    )
+ADMIN_EMAILS = {e.strip().lower() for e in (os.getenv("ADMIN_EMAILS") or "").split(",") if e.strip()}
 
 
 provider = load_provider()
@@ -95,6 +132,12 @@ async def get_current_user(
     return user
 
 
+async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -123,6 +166,7 @@ def _parsed_to_resume(
     source: str,
     hash_value: str = "",
     is_first: bool = False,
+    provenance: dict | None = None,
 ) -> Resume:
     skills = [_skill_defaults(s) for s in parsed.get("skills", [])]
     return Resume(
@@ -137,9 +181,16 @@ def _parsed_to_resume(
         refined=False,
         hash=hash_value,
         uploaded_at=datetime.now(timezone.utc),
+        **(provenance or {}),
     )
 
 
+async def _add_resume(session: AsyncSession, resume: Resume) -> None:
+    session.add(resume)
+    await session.flush()
+    await replace_skills(session, resume, resume.skills or [])
+
+
 def _entries_to_text(entries) -> str:
     parts = []
     for i, e in enumerate(entries, 1):
@@ -173,7 +224,7 @@ def _user_public(user: User) -> dict:
 def _compute_match(job_stack: list, resume_skills: list) -> dict:
     if not job_stack:
         return {"match_score": None, "matched": [], "missing": []}
-    resume_names = {s["name"].lower() for s in resume_skills}
+    resume_names = {s["name"].lower() for s in resume_skills if s.get("name")}
     matched = [t for t in job_stack if t.lower() in resume_names]
     missing = [t for t in job_stack if t.lower() not in resume_names]
     return {
@@ -183,6 +234,9 @@ def _compute_match(job_stack: list, resume_skills: list) -> dict:
     }
 
 
+# Job payloads hold only JSON-native values (dates as isoformat strings), so the
+# listing endpoints hand them to FastJSONResponse directly and skip FastAPI's
+# jsonable_encoder pass, which costs more than the orjson render itself.
 def _job_to_dict(job: Job, resume_skills: list) -> dict:
     stack = job.stack or []
     return {
@@ -205,6 +259,19 @@ def _job_to_dict(job: Job, resume_skills: list) -> dict:
     }
 
 
+def _parse_provenance(operation: str, call: ProviderCall) -> dict:
+    """Job/Resume parse_* values for a result just produced by the current provider."""
+    return {
+        "parse_provider": provider.name,
+        "parse_model": provider.model,
+        "parse_prompt_hash": prompt_hash(operation),
+        "parsed_at": datetime.now(timezone.utc),
+        "parse_latency_ms": call.latency_ms,
+        "parse_input_tokens": call.usage.input_tokens,
+        "parse_output_tokens": call.usage.output_tokens,
+    }
+
+
 def _resume_to_dict(resume: Resume) -> dict:
     return {
         "id": resume.id,
@@ -270,6 +337,13 @@ class JobPatch(BaseModel):
     apply_url: str | None = None
 
 
+class BulkJobPayload(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=1000)
+    delete: bool = False
+    status: str | None = None
+    apply_url: str | None = None
+
+
 class ResumePatch(BaseModel):
     name: str | None = None
     is_active: bool | None = None
@@ -286,6 +360,42 @@ VALID_STATUSES = {
 }
 
 
+class JobFilters:
+    """Query-string filters shared by the job listing and facet endpoints.
+
+    Repeat a parameter to match any of several values (?status=saved&status=applied).
+    Stack values must all be present in the job's stack (JSONB containment).
+    """
+
+    def __init__(
+        self,
+        status: list[str] | None = Query(None),
+        seniority: list[str] | None = Query(None),
+        mode: list[str] | None = Query(None),
+        contract: list[str] | None = Query(None),
+        stack: list[str] | None = Query(None),
+    ):
+        self.status = status
+        self.seniority = seniority
+        self.mode = mode
+        self.contract = contract
+        self.stack = stack
+
+    def where(self, user_id: str) -> list:
+        conditions = [Job.user_id == user_id]
+        if self.status:
+            conditions.append(Job.status.in_(self.status))
+        if self.seniority:
+            conditions.append(Job.seniority.in_(self.seniority))
+        if self.mode:
+            conditions.append(Job.mode.in_(self.mode))
+        if self.contract:
+            conditions.append(Job.contract.in_(self.contract))
+        if self.stack:
+            conditions.append(Job.stack.contains(self.stack))  # served by ix_jobs_stack
+        return conditions
+
+
 # ---------------------------------------------------------------------------
 # Auth endpoints
 # ---------------------------------------------------------------------------
@@ -310,7 +420,7 @@ async def register(
     await session.commit()
     await session.refresh(user)
     _set_auth_cookie(response, user.id)
-    print(f"[auth] registered: {user.email}")
+    log_auth.info("registered", user_id=user.id)
     return _user_public(user)
 
 
@@ -326,7 +436,7 @@ async def login(
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
     _set_auth_cookie(response, user.id)
-    print(f"[auth] login: {user.email}")
+    log_auth.info("login", user_id=user.id)
     return _user_public(user)
 
 
@@ -346,20 +456,33 @@ async def me(current_user: User = Depends(get_current_user)):
 # ---------------------------------------------------------------------------
 
 @app.post("/api/clip", status_code=201)
+@idempotent("clip")
 async def clip(
     payload: ClipPayload,
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
     if not payload.raw_text.strip():
         raise HTTPException(status_code=400, detail="raw_text is required")
 
-    print(f"[clip] parsing with AI | url: {payload.url} | text_len: {len(payload.raw_text)}")
+    prepared = prepare_job_text(payload.raw_text)
+    log_jobs.info(
+        "clip.parsing", url=payload.url, text_len=len(payload.raw_text),
+        tokens=prepared.tokens_after, tokens_saved=prepared.tokens_saved,
+    )
     try:
-        parsed = await provider.parse_job(payload.raw_text)
-        print(f"[clip] AI ok | is_job_offer: {parsed.get('is_job_offer')} | title: {parsed.get('title')} | stack: {parsed.get('stack')}")
+        with measure_call() as call:
+            parsed = await provider.parse_job(prepared.text)
+        provenance = _parse_provenance("parse_job", call)
+        log_jobs.debug(
+            "clip.parsed", is_job_offer=parsed.get("is_job_offer"),
+            title=parsed.get("title"), stack=parsed.get("stack"),
+        )
     except Exception as err:
-        print(f"[clip] AI failed: {err} — storing raw")
+        log_jobs.warning("clip.ai_failed", error=str(err))
+        provider.record_fallback("parse_job")
+        provenance = {}
         parsed = {
             "is_job_offer": True,
             "title": payload.url or "Untitled",
@@ -369,7 +492,7 @@ async def clip(
         }
 
     if not payload.force and parsed.get("is_job_offer") is False:
-        print(f"[clip] rejected — not a job offer | url: {payload.url}")
+        log_jobs.info("clip.rejected", url=payload.url)
         return {"received": False, "is_job_offer": False}
 
     if payload.url:
@@ -378,7 +501,7 @@ async def clip(
         )
         existing = dup_result.first()
         if existing:
-            print(f"[clip] duplicate url — existing id: {existing.id}")
+            log_jobs.info("clip.duplicate", job_id=existing.id)
             return {"received": True, "duplicate": True, "id": existing.id}
 
     job = Job(
@@ -397,23 +520,331 @@ async def clip(
         contract=parsed.get("contract", ""),
         stack=parsed.get("stack", []),
         description=parsed.get("description", ""),
+        **provenance,
     )
     session.add(job)
+    await session.flush()
+    await index_job(session, job)
+    await publish(session, current_user.id, "job.created", {"id": job.id})
+    await _invalidate_match_matrix(session, current_user.id)
     await session.commit()
     await session.refresh(job)
-    print(f"[clip] saved — id: {job.id} | title: {job.title}")
+    log_jobs.info("clip.saved", job_id=job.id, title=job.title)
     return {"received": True, "id": job.id}
 
 
 @app.get("/api/jobs")
 async def get_jobs(
+    filters: JobFilters = Depends(),
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
-    result = await session.exec(select(Job).where(Job.user_id == current_user.id))
+    result = await session.exec(select(Job).where(*filters.where(current_user.id)))
     jobs = list(result.all())
     resume_skills = await _get_resume_skills(current_user.id, session)
-    return [_job_to_dict(job, resume_skills) for job in jobs]
+    return FastJSONResponse([_job_to_dict(job, resume_skills) for job in jobs])
+
+
+_RANKED_COLUMNS = (
+    Job.id, Job.title, Job.company, Job.location, Job.status,
+    Job.mode, Job.seniority, Job.contract, Job.stack, Job.clipped_at,
+)
+
+
+@app.get("/api/jobs/ranked")
+async def get_ranked_jobs(
+    filters: JobFilters = Depends(),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Jobs ordered by weighted fit against the active resume (see ranking.py)."""
+    result = await session.exec(
+        select(*_RANKED_COLUMNS)
+        .where(*filters.where(current_user.id))
+        .order_by(Job.clipped_at.desc(), Job.id.desc())
+    )
+    rows = result.all()
+    resume_skills = await _get_resume_skills(current_user.id, session)
+
+    vocab = build_vocabulary(resume_skills)
+    matrix = stack_matrix([row.stack or [] for row in rows], vocab)
+    scores = fit_scores(matrix, skill_vector(resume_skills, vocab))
+    # Best fit first, newest first among ties; jobs without a stack go last.
+    order = np.argsort(np.nan_to_num(-scores, nan=np.inf), kind="stable")[offset:offset + limit]
+
+    items = []
+    for i in order.tolist():
+        row = rows[i]
+        stack = row.stack or []
+        score = scores[i]
+        items.append({
+            "id": row.id,
+            "title": row.title,
+            "company": row.company,
+            "location": row.location,
+            "status": row.status,
+            "mode": row.mode,
+            "seniority": row.seniority,
+            "contract": row.contract,
+            "stack": stack,
+            "clippedAt": row.clipped_at.isoformat(),
+            "fit_score": None if np.isnan(score) else round(float(score)),
+            **_compute_match(stack, resume_skills),
+        })
+    return FastJSONResponse({"total": len(rows), "items": items})
+
+
+# Per-user jobs × resumes matrix. Writers that change a stack or a resume's
+# skills call _invalidate_match_matrix before committing; cache_bus drops the
+# entry in every worker when the transaction commits.
+_match_matrix_cache = caches.register("match_matrix", ttl_seconds=10 * 60)
+
+
+async def _invalidate_match_matrix(session: AsyncSession, user_id: str) -> None:
+    await invalidate(session, "match_matrix", user_id)
+
+
+def _fit_or_none(score) -> int | None:
+    return None if np.isnan(score) else round(float(score))
+
+
+@app.get("/api/jobs/resume-matrix")
+async def get_resume_matrix(
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Fit of every job against every resume, the best resume per job and the jobs each resume wins."""
+    cached = _match_matrix_cache.get(current_user.id)
+    if cached is not None:
+        return FastJSONResponse(cached)
+    version = _match_matrix_cache.version(current_user.id)
+
+    jobs = (await session.exec(
+        select(Job.id, Job.title, Job.company, Job.stack)
+        .where(Job.user_id == current_user.id)
+        .order_by(Job.clipped_at.desc(), Job.id.desc())
+    )).all()
+    resumes = (await session.exec(
+        select(Resume.id, Resume.name, Resume.is_active, Resume.skills)
+        .where(Resume.user_id == current_user.id)
+    )).all()
+    # Active resume first, so it wins ties.
+    resumes = sorted(resumes, key=lambda r: (not r.is_active, r.id))
+
+    scores = match_matrix([job.stack or [] for job in jobs], [r.skills or [] for r in resumes])
+    has_stack = ~np.isnan(scores).all(axis=1)
+    best = np.argmax(np.nan_to_num(scores, nan=-1.0), axis=1) if resumes else np.zeros(len(jobs), dtype=int)
+
+    wins: dict[int, list[int]] = {r.id: [] for r in resumes}
+    job_items = []
+    for i, job in enumerate(jobs):
+        best_resume = resumes[best[i]] if has_stack[i] else None
+        if best_resume:
+            wins[best_resume.id].append(job.id)
+        job_items.append({
+            "id": job.id,
+            "title": job.title,
+            "company": job.company,
+            "scores": [_fit_or_none(s) for s in scores[i].tolist()],
+            "best_resume_id": best_resume.id if best_resume else None,
+            "best_fit": _fit_or_none(scores[i, best[i]]) if best_resume else None,
+        })
+
+    payload = {
+        "resumes": [
+            {"id": r.id, "name": r.name, "is_active": r.is_active, "wins": wins[r.id]}
+            for r in resumes
+        ],
+        "jobs": job_items,
+    }
+    _match_matrix_cache.set(current_user.id, payload, version)
+    return FastJSONResponse(payload)
+
+
+# How long deleted-job tombstones are kept; older cursors get a full resync.
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("TOMBSTONE_RETENTION_DAYS") or 30)
+
+# Delta sync cursor: "<xid>-<issued unix time>". The xid is the xmin of the
+# snapshot taken *before* reading rows, so transactions still in flight are
+# picked up next time; rows may be sent twice, never missed.
+_SYNC_XMIN_SQL = text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text")
+_SYNC_TOMBSTONES_SQL = text(
+    "SELECT job_id FROM job_tombstones WHERE user_id = :user_id AND change_xid >= CAST(CAST(:since AS text) AS xid8)"
+)
+
+
+def _parse_sync_cursor(cursor: str) -> tuple[int, int]:
+    xid, _, issued = cursor.partition("-")
+    if not xid.isdigit() or not issued.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return int(xid), int(issued)
+
+
+@app.get("/api/jobs/changes")
+async def get_job_changes(
+    since: str | None = None,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    xmin = (await session.exec(_SYNC_XMIN_SQL)).scalar_one()
+    cursor = f"{xmin}-{int(time.time())}"
+    resume_skills = await _get_resume_skills(current_user.id, session)
+
+    reset = since is None
+    if since is not None:
+        since_xid, issued = _parse_sync_cursor(since)
+        # Tombstones older than the retention window may be gone — force a full resync.
+        reset = time.time() - issued > TOMBSTONE_RETENTION_DAYS * 24 * 60 * 60
+
+    if reset:
+        result = await session.exec(select(Job).where(Job.user_id == current_user.id))
+        changed = [_job_to_dict(job, resume_skills) for job in result.all()]
+        return FastJSONResponse({"cursor": cursor, "reset": True, "changed": changed, "deleted": []})
+
+    result = await session.exec(
+        select(Job).where(
+            Job.user_id == current_user.id,
+            text("jobs.change_xid >= CAST(CAST(:since AS text) AS xid8)").bindparams(since=str(since_xid)),
+        )
+    )
+    changed = [_job_to_dict(job, resume_skills) for job in result.all()]
+    deleted_rows = await session.exec(
+        _SYNC_TOMBSTONES_SQL, params={"user_id": current_user.id, "since": str(since_xid)},
+    )
+    # A re-used id (never in practice with a serial PK) would appear in both lists; changed wins.
+    changed_ids = {j["id"] for j in changed}
+    deleted = [job_id for job_id in deleted_rows.scalars().all() if job_id not in changed_ids]
+    return FastJSONResponse({"cursor": cursor, "reset": False, "changed": changed, "deleted": deleted})
+
+
+_FACET_STACK_LIMIT = 50
+
+
+@app.get("/api/jobs/facets")
+async def get_job_facets(
+    filters: JobFilters = Depends(),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Counts per status, seniority, mode, contract and stack technology — one SQL round-trip."""
+    matched = (
+        select(Job.status, Job.seniority, Job.mode, Job.contract, Job.stack)
+        .where(*filters.where(current_user.id))
+        .cte("matched")
+    )
+    tech = func.jsonb_array_elements_text(matched.c.stack).table_valued("value").alias("tech")
+    facet_queries = [
+        select(literal("total"), literal(""), func.count()).select_from(matched),
+        *(
+            select(literal(name), matched.c[name], func.count()).group_by(matched.c[name])
+            for name in ("status", "seniority", "mode", "contract")
+        ),
+        select(literal("stack"), tech.c.value, func.count())
+        .select_from(matched).join(tech, true()).group_by(tech.c.value),
+    ]
+    rows = (await session.exec(union_all(*facet_queries))).all()
+
+    facets: dict = {"total": 0, "status": {}, "seniority": {}, "mode": {}, "contract": {}, "stack": []}
+    for facet, value, count in rows:
+        if facet == "total":
+            facets["total"] = count
+        elif facet == "stack":
+            facets["stack"].append({"name": value, "count": count})
+        else:
+            facets[facet][value] = count
+    facets["stack"].sort(key=lambda t: (-t["count"], t["name"].lower()))
+    facets["stack"] = facets["stack"][:_FACET_STACK_LIMIT]
+    return facets
+
+
+# Prefix query built with the same parser as search_vector, so tokens like
+# "node.js" or "c#" split identically on both sides: "pyth dja" → 'pyth':* & 'dja':*
+# ts_headline marks matches with \x02/\x03 (stripped from the source first);
+# _highlight_html escapes the scraped text and only then turns them into <mark>.
+_SEARCH_SQL = text("""
+    WITH q AS (
+        SELECT to_tsquery('simple', string_agg(quote_literal(lexeme) || ':*', ' & ')) AS query
+        FROM unnest(to_tsvector('simple', :q))
+    ),
+    hits AS (
+        SELECT j.id, ts_rank_cd(j.search_vector, q.query) AS rank, count(*) OVER () AS total
+        FROM jobs j, q
+        WHERE j.user_id = :user_id AND j.search_vector @@ q.query
+        ORDER BY rank DESC, j.clipped_at DESC
+        LIMIT :limit OFFSET :offset
+    )
+    SELECT j.id, j.title, j.company, j.location, j.status, j.mode, j.seniority,
+           j.contract, j.stack, j.clipped_at, h.rank, h.total,
+           ts_headline('simple', translate(j.title, E'\x02\x03', ''), q.query,
+                       E'StartSel=\x02, StopSel=\x03, HighlightAll=true') AS title_highlight,
+           ts_headline('simple', translate(j.description, E'\x02\x03', ''), q.query,
+                       E'StartSel=\x02, StopSel=\x03, MaxFragments=2, MaxWords=20, MinWords=5') AS snippet
+    FROM hits h JOIN jobs j ON j.id = h.id, q
+    ORDER BY h.rank DESC, j.clipped_at DESC
+""")
+
+_SEARCH_COUNT_SQL = text("""
+    SELECT count(*) FROM jobs
+    WHERE user_id = :user_id AND search_vector @@ (
+        SELECT to_tsquery('simple', string_agg(quote_literal(lexeme) || ':*', ' & '))
+        FROM unnest(to_tsvector('simple', :q))
+    )
+""")
+
+
+def _highlight_html(headline: str | None) -> str:
+    return html.escape(headline or "").replace("\x02", "<mark>").replace("\x03", "</mark>")
+
+
+@app.get("/api/jobs/search")
+async def search_jobs(
+    q: str,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Prefix search over title, company, description and stack.
+
+    title_highlight and snippet are HTML-safe: the job text is escaped and the
+    matches are wrapped in <mark>, so clients can render them as HTML.
+    """
+    q = q.strip()[:200]
+    if not q:
+        return {"total": 0, "items": []}
+
+    params = {"q": q, "user_id": current_user.id, "limit": limit, "offset": offset}
+    rows = (await session.exec(_SEARCH_SQL, params=params)).mappings().all()
+    if rows:
+        total = rows[0]["total"]
+    elif offset:
+        total = (await session.exec(_SEARCH_COUNT_SQL, params=params)).scalar_one()
+    else:
+        total = 0
+
+    resume_skills = await _get_resume_skills(current_user.id, session)
+    items = []
+    for row in rows:
+        stack = row["stack"] or []
+        items.append({
+            "id": row["id"],
+            "title": row["title"],
+            "company": row["company"],
+            "location": row["location"],
+            "status": row["status"],
+            "mode": row["mode"],
+            "seniority": row["seniority"],
+            "contract": row["contract"],
+            "stack": stack,
+            "clippedAt": row["clipped_at"].isoformat(),
+            "rank": round(row["rank"], 4),
+            "title_highlight": _highlight_html(row["title_highlight"]),
+            "snippet": _highlight_html(row["snippet"]),
+            **_compute_match(stack, resume_skills),
+        })
+    return FastJSONResponse({"total": total, "items": items})
 
 
 @app.get("/api/jobs/{job_id}")
@@ -433,8 +864,10 @@ async def get_job(
 
 
 @app.post("/api/jobs/{job_id}/reparse")
+@idempotent("reparse")
 async def reparse_job(
     job_id: int,
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
@@ -451,29 +884,71 @@ async def reparse_job(
             detail="No raw text stored for this job — re-clip it from the extension.",
         )
 
-    print(f"[reparse] job_id: {job_id} | text_len: {len(job.raw_text)}")
+    prepared = prepare_job_text(job.raw_text)
+    log_jobs.info(
+        "reparse.parsing", job_id=job_id, text_len=len(job.raw_text),
+        tokens=prepared.tokens_after, tokens_saved=prepared.tokens_saved,
+    )
     try:
-        parsed = await provider.parse_job(job.raw_text)
-        print(f"[reparse] AI ok | title: {parsed.get('title')} | stack: {parsed.get('stack')}")
+        with measure_call() as call:
+            parsed = await provider.parse_job(prepared.text)
+        log_jobs.debug("reparse.parsed", title=parsed.get("title"), stack=parsed.get("stack"))
     except Exception as err:
-        print(f"[reparse] AI failed: {err}")
+        log_jobs.warning("reparse.ai_failed", job_id=job_id, error=str(err))
         raise HTTPException(status_code=502, detail=f"AI parsing failed: {err}")
 
-    job.title = parsed.get("title", job.title)
-    job.company = parsed.get("company", job.company)
-    job.location = parsed.get("location", job.location)
-    job.salary = parsed.get("salary", job.salary)
-    job.mode = parsed.get("mode", job.mode)
-    job.seniority = parsed.get("seniority", job.seniority)
-    job.contract = parsed.get("contract", job.contract)
-    job.stack = parsed.get("stack", job.stack)
-    job.description = parsed.get("description", job.description)
+    # Same rules as bulk_reparse.apply_results: a reply that rejects the page or
+    # has no title leaves the job alone, and empty fields keep their current value.
+    if parsed.get("is_job_offer") is False or not str(parsed.get("title") or "").strip():
+        log_jobs.warning("reparse.rejected", job_id=job_id, is_job_offer=parsed.get("is_job_offer"))
+        raise HTTPException(status_code=502, detail="AI parsing returned no job offer")
+    for field in ("title", "company", "location", "salary", "mode", "seniority", "contract", "description"):
+        if parsed.get(field):
+            setattr(job, field, parsed[field])
+    if parsed.get("stack"):
+        job.stack = parsed["stack"]
+    for field, value in _parse_provenance("parse_job", call).items():
+        setattr(job, field, value)
+    await index_job(session, job)
+    await publish(session, current_user.id, "job.parsed", {"id": job.id})
+    await _invalidate_match_matrix(session, current_user.id)
     await session.commit()
 
     resume_skills = await _get_resume_skills(current_user.id, session)
     return _job_to_dict(job, resume_skills)
 
 
+@app.get("/api/jobs/{job_id}/similar")
+async def get_similar_jobs(
+    job_id: int,
+    k: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Top-k of the user's jobs most similar to this one (TF-IDF over title, description, stack)."""
+    result = await session.exec(
+        select(Job.id).where(Job.id == job_id, Job.user_id == current_user.id)
+    )
+    if result.first() is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if await index_missing(session, current_user.id):
+        await session.commit()
+
+    rows = await similar_jobs(session, current_user.id, job_id, k)
+    return {"items": [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "company": row["company"],
+            "status": row["status"],
+            "stack": row["stack"] or [],
+            "score": round(row["score"], 4),
+        }
+        for row in rows
+    ]}
+
+
 @app.delete("/api/jobs/{job_id}", status_code=204)
 async def delete_job(
     job_id: int,
@@ -487,8 +962,10 @@ async def delete_job(
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     await session.delete(job)
+    await publish(session, current_user.id, "job.deleted", {"ids": [job_id]})
+    await _invalidate_match_matrix(session, current_user.id)
     await session.commit()
-    print(f"[jobs] deleted — id: {job_id}")
+    log_jobs.info("deleted", job_id=job_id)
 
 
 @app.patch("/api/jobs/{job_id}")
@@ -510,11 +987,77 @@ async def patch_job(
         job.status = patch.status
     if patch.apply_url is not None:
         job.apply_url = patch.apply_url
+    await publish(session, current_user.id, "job.updated", {
+        "ids": [job.id], "status": job.status, "apply_url": job.apply_url,
+    })
     await session.commit()
     resume_skills = await _get_resume_skills(current_user.id, session)
     return _job_to_dict(job, resume_skills)
 
 
+@app.post("/api/jobs/bulk")
+async def bulk_jobs(
+    payload: BulkJobPayload,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Apply one status / apply_url change, or a delete, to many jobs in a single statement.
+
+    Ids that do not exist or belong to another user are silently skipped; the
+    response lists only the rows that actually changed.
+    """
+    ids = list(set(payload.ids))
+    owned = (Job.id.in_(ids), Job.user_id == current_user.id)
+
+    if payload.delete:
+        if payload.status is not None or payload.apply_url is not None:
+            raise HTTPException(status_code=400, detail="delete cannot be combined with field changes")
+        owned_ids = select(Job.id).where(*owned).scalar_subquery()
+        await session.exec(delete(InterviewSession).where(InterviewSession.job_id.in_(owned_ids)))
+        result = await session.exec(delete(Job).where(*owned).returning(Job.id))
+        deleted = sorted(result.scalars().all())
+        await publish_ids(session, current_user.id, "job.deleted", deleted)
+        await _invalidate_match_matrix(session, current_user.id)
+        await session.commit()
+        log_jobs.info("bulk.deleted", requested=len(ids), deleted=len(deleted))
+        return {"updated": [], "deleted": deleted}
+
+    values = {}
+    if payload.status is not None:
+        if payload.status not in VALID_STATUSES:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {payload.status}")
+        values["status"] = payload.status
+    if payload.apply_url is not None:
+        values["apply_url"] = payload.apply_url
+    if not values:
+        raise HTTPException(status_code=400, detail="Nothing to change: set status, apply_url or delete")
+
+    result = await session.exec(
+        update(Job).where(*owned).values(**values)
+        .returning(Job.id, Job.status, Job.apply_url)
+        .execution_options(synchronize_session=False)
+    )
+    updated = [{"id": r.id, "status": r.status, "apply_url": r.apply_url} for r in result.all()]
+    await publish_ids(session, current_user.id, "job.updated", [r["id"] for r in updated], **values)
+    await session.commit()
+    log_jobs.info("bulk.updated", requested=len(ids), updated=len(updated), fields=sorted(values))
+    return {"updated": updated, "deleted": []}
+
+
+@app.get("/api/events")
+async def job_events(
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Server-Sent Events: job.created, job.updated, job.deleted, job.parsed and resync."""
+    await session.close()  # release the pooled connection — the stream may stay open for hours
+    return StreamingResponse(
+        hub.stream(current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ---------------------------------------------------------------------------
 # Resume endpoints
 # ---------------------------------------------------------------------------
@@ -528,10 +1071,49 @@ async def get_resumes(
     return [_resume_to_dict(r) for r in result.all()]
 
 
+@app.get("/api/resumes/with-skill")
+async def get_resumes_with_skill(
+    name: str,
+    min_rating: int = Query(1, ge=1, le=5),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Resumes that list a skill at or above a rating (the user's own, else the parser's)."""
+    rating = func.coalesce(ResumeSkill.user_rating, ResumeSkill.ai_confidence)
+    result = await session.exec(
+        select(Resume.id, Resume.name, Resume.is_active, ResumeSkill)
+        .join(ResumeSkill, ResumeSkill.resume_id == Resume.id)
+        .where(
+            Resume.user_id == current_user.id,
+            ResumeSkill.canonical_name == canonical_skill_name(name),
+            rating >= min_rating,
+        )
+        .order_by(rating.desc(), Resume.id)
+    )
+    return [
+        {
+            "resume_id": row.id,
+            "resume_name": row.name,
+            "is_active": row.is_active,
+            "skill": {
+                "name": row.ResumeSkill.name,
+                "years": row.ResumeSkill.years,
+                "recency": row.ResumeSkill.recency,
+                "ai_confidence": row.ResumeSkill.ai_confidence,
+                "user_rating": row.ResumeSkill.user_rating,
+                "note": row.ResumeSkill.note,
+            },
+        }
+        for row in result.all()
+    ]
+
+
 @app.post("/api/resumes", status_code=201)
+@idempotent("create_resume")
 async def create_resume(
     file: UploadFile = File(...),
     name: str = Form("My Resume"),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
@@ -551,9 +1133,13 @@ async def create_resume(
         return {**_resume_to_dict(cached), "cached": True}
 
     try:
-        parsed = await provider.parse_cv(anonymized)
+        with measure_call() as call:
+            parsed = await provider.parse_cv(anonymized)
+        provenance = _parse_provenance("parse_cv", call)
     except Exception as err:
-        print(f"[resumes] AI failed: {err}")
+        log_resumes.warning("create.ai_failed", error=str(err))
+        provider.record_fallback("parse_cv")
+        provenance = {}
         parsed = {"skills": [], "years_experience": 0, "current_role": "", "summary": ""}
 
     count_result = await session.exec(select(Resume).where(Resume.user_id == current_user.id))
@@ -565,11 +1151,13 @@ async def create_resume(
         source="cv",
         hash_value=fp,
         is_first=is_first,
+        provenance=provenance,
     )
-    session.add(resume)
+    await _add_resume(session, resume)
+    await _invalidate_match_matrix(session, current_user.id)
     await session.commit()
     await session.refresh(resume)
-    print(f"[resumes] created — id: {resume.id} | name: {resume.name}")
+    log_resumes.info("created", resume_id=resume.id, source="cv")
     return {**_resume_to_dict(resume), "cached": False}
 
 
@@ -584,9 +1172,13 @@ async def create_resume_manual(
 
     entries_text = _entries_to_text(payload.entries)
     try:
-        parsed = await provider.parse_work_history(entries_text)
+        with measure_call() as call:
+            parsed = await provider.parse_work_history(entries_text)
+        provenance = _parse_provenance("parse_work_history", call)
     except Exception as err:
-        print(f"[resumes/manual] AI failed: {err}")
+        log_resumes.warning("manual.ai_failed", error=str(err))
+        provider.record_fallback("parse_work_history")
+        provenance = {}
         parsed = {"skills": [], "years_experience": 0, "current_role": "", "summary": ""}
 
     count_result = await session.exec(select(Resume).where(Resume.user_id == current_user.id))
@@ -597,11 +1189,13 @@ async def create_resume_manual(
         name=payload.name.strip() or "My Resume",
         source="manual",
         is_first=is_first,
+        provenance=provenance,
     )
-    session.add(resume)
+    await _add_resume(session, resume)
+    await _invalidate_match_matrix(session, current_user.id)
     await session.commit()
     await session.refresh(resume)
-    print(f"[resumes/manual] created — id: {resume.id} | name: {resume.name}")
+    log_resumes.info("created", resume_id=resume.id, source="manual")
     return _resume_to_dict(resume)
 
 
@@ -627,6 +1221,7 @@ async def patch_resume(
         )
         for r in all_result.all():
             r.is_active = (r.id == resume_id)
+    await _invalidate_match_matrix(session, current_user.id)
     await session.commit()
     await session.refresh(resume)
     return _resume_to_dict(resume)
@@ -647,6 +1242,7 @@ async def delete_resume(
 
     was_active = resume.is_active
     await session.delete(resume)
+    await _invalidate_match_matrix(session, current_user.id)
     await session.commit()
 
     if was_active:
@@ -656,6 +1252,7 @@ async def delete_resume(
         first = remaining_result.first()
         if first:
             first.is_active = True
+            await _invalidate_match_matrix(session, current_user.id)
             await session.commit()
 
 
@@ -668,32 +1265,18 @@ async def patch_resume_skill(
     session: AsyncSession = Depends(get_session),
 ):
     result = await session.exec(
-        select(Resume).where(Resume.id == resume_id, Resume.user_id == current_user.id)
+        select(Resume.id).where(Resume.id == resume_id, Resume.user_id == current_user.id)
     )
-    resume = result.first()
-    if not resume:
+    if result.first() is None:
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    skills = resume.skills or []
-    if not any(s["name"].lower() == skill_name.lower() for s in skills):
-        raise HTTPException(status_code=404, detail=f"Skill '{skill_name}' not found")
-
     if patch.user_rating is not None and not 1 <= patch.user_rating <= 5:
         raise HTTPException(status_code=400, detail="user_rating must be between 1 and 5")
 
-    updated_skill = None
-    new_skills = []
-    for s in skills:
-        if s["name"].lower() == skill_name.lower():
-            s = dict(s)
-            if patch.user_rating is not None:
-                s["user_rating"] = patch.user_rating
-            if patch.note is not None:
-                s["note"] = patch.note
-            updated_skill = s
-        new_skills.append(s)
-
-    resume.skills = new_skills  # full reassignment — required for JSONB change tracking
+    updated_skill = await update_skill(session, resume_id, skill_name, patch.user_rating, patch.note)
+    if updated_skill is None:
+        raise HTTPException(status_code=404, detail=f"Skill '{skill_name}' not found")
+    await _invalidate_match_matrix(session, current_user.id)
     await session.commit()
     return updated_skill
 
@@ -724,9 +1307,13 @@ async def upload_cv(
         return {**_resume_to_dict(cached), "cached": True}
 
     try:
-        parsed = await provider.parse_cv(anonymized)
+        with measure_call() as call:
+            parsed = await provider.parse_cv(anonymized)
+        provenance = _parse_provenance("parse_cv", call)
     except Exception as err:
-        print(f"[cv] AI failed: {err}")
+        log_resumes.warning("cv.ai_failed", error=str(err))
+        provider.record_fallback("parse_cv")
+        provenance = {}
         parsed = {"skills": [], "years_experience": 0, "current_role": "", "summary": ""}
 
     count_result = await session.exec(select(Resume).where(Resume.user_id == current_user.id))
@@ -739,8 +1326,10 @@ async def upload_cv(
         source="cv",
         hash_value=fp,
         is_first=is_first,
+        provenance=provenance,
     )
-    session.add(resume)
+    await _add_resume(session, resume)
+    await _invalidate_match_matrix(session, current_user.id)
     await session.commit()
     await session.refresh(resume)
     return {**_resume_to_dict(resume), "cached": False}
@@ -770,9 +1359,13 @@ async def build_manual_profile(
 
     entries_text = _entries_to_text(payload.entries)
     try:
-        parsed = await provider.parse_work_history(entries_text)
+        with measure_call() as call:
+            parsed = await provider.parse_work_history(entries_text)
+        provenance = _parse_provenance("parse_work_history", call)
     except Exception as err:
-        print(f"[profile/manual] AI failed: {err}")
+        log_resumes.warning("profile_manual.ai_failed", error=str(err))
+        provider.record_fallback("parse_work_history")
+        provenance = {}
         parsed = {"skills": [], "years_experience": 0, "current_role": "", "summary": ""}
 
     count_result = await session.exec(select(Resume).where(Resume.user_id == current_user.id))
@@ -783,8 +1376,10 @@ async def build_manual_profile(
         name="Manual Profile",
         source="manual",
         is_first=is_first,
+        provenance=provenance,
     )
-    session.add(resume)
+    await _add_resume(session, resume)
+    await _invalidate_match_matrix(session, current_user.id)
     await session.commit()
     await session.refresh(resume)
     return _resume_to_dict(resume)
@@ -812,12 +1407,18 @@ async def refine_profile(
     try:
         ai_result = await provider.refine_profile(compact, entries_text)
         updated_skills = [_skill_defaults(s) for s in ai_result.get("skills", [])]
+        # A reply repaired after truncation can be missing the tail of the list;
+        # refining never removes skills, so carry over any the model did not return.
+        returned = {canonical_skill_name(s["name"]) for s in updated_skills}
+        updated_skills += [s for s in active.skills or [] if canonical_skill_name(s.get("name") or "") not in returned]
     except Exception as err:
-        print(f"[profile/refine] AI failed: {err}")
+        log_resumes.warning("refine.ai_failed", error=str(err))
+        provider.record_fallback("refine_profile")
         updated_skills = active.skills or []
 
-    active.skills = updated_skills  # full reassignment for JSONB change tracking
+    await replace_skills(session, active, updated_skills)
     active.refined = True
+    await _invalidate_match_matrix(session, current_user.id)
     await session.commit()
     return _resume_to_dict(active)
 
@@ -829,32 +1430,20 @@ async def patch_skill(
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
-    resumes_result = await session.exec(select(Resume).where(Resume.user_id == current_user.id))
-    resumes = list(resumes_result.all())
-    active = _active_resume(resumes)
+    resumes_result = await session.exec(
+        select(Resume.id, Resume.is_active).where(Resume.user_id == current_user.id)
+    )
+    active = _active_resume(list(resumes_result.all()))
     if not active:
         raise HTTPException(status_code=404, detail="No profile found")
 
-    skills = active.skills or []
-    if not any(s["name"].lower() == skill_name.lower() for s in skills):
-        raise HTTPException(status_code=404, detail=f"Skill '{skill_name}' not found")
-
     if patch.user_rating is not None and not 1 <= patch.user_rating <= 5:
         raise HTTPException(status_code=400, detail="user_rating must be between 1 and 5")
 
-    updated_skill = None
-    new_skills = []
-    for s in skills:
-        if s["name"].lower() == skill_name.lower():
-            s = dict(s)
-            if patch.user_rating is not None:
-                s["user_rating"] = patch.user_rating
-            if patch.note is not None:
-                s["note"] = patch.note
-            updated_skill = s
-        new_skills.append(s)
-
-    active.skills = new_skills  # full reassignment for JSONB change tracking
+    updated_skill = await update_skill(session, active.id, skill_name, patch.user_rating, patch.note)
+    if updated_skill is None:
+        raise HTTPException(status_code=404, detail=f"Skill '{skill_name}' not found")
+    await _invalidate_match_matrix(session, current_user.id)
     await session.commit()
     return updated_skill
 
@@ -911,6 +1500,14 @@ async def get_interview(
             select(Question).where(func.lower(Question.skill).in_(stack_lower))
         )
         candidates = list(q_result.all())
+
+        # Thin coverage: queue background generation (see question_gen.py); never waits.
+        coverage = Counter((q.skill.lower(), q.difficulty) for q in candidates)
+        for skill in job.stack:
+            for difficulty in allowed_difficulties or DIFFICULTIES:
+                if coverage[(skill.lower(), difficulty)] < TARGET_PER_DIFFICULTY:
+                    question_generator.request(skill, difficulty)
+
         if allowed_difficulties:
             filtered = [q for q in candidates if q.difficulty in allowed_difficulties]
             questions = filtered if filtered else candidates  # relax if nothing matches
@@ -972,8 +1569,7 @@ async def get_interview(
 # Market statistics — aggregated skill demand from NoFluffJobs
 # ---------------------------------------------------------------------------
 
-_market_cache: dict[str, tuple[float, dict]] = {}
-_MARKET_TTL = 6 * 60 * 60  # 6 hours
+_market_cache = caches.register("market", ttl_seconds=6 * 60 * 60)
 
 _NFJ_HEADERS = {
     "Accept": "application/json",
@@ -992,8 +1588,9 @@ async def get_market_stats(category: str = "backend", _: User = Depends(get_curr
         raise HTTPException(status_code=400, detail=f"Unknown category. Valid: {sorted(_VALID_CATEGORIES)}")
 
     cached = _market_cache.get(category)
-    if cached and (time.time() - cached[0]) < _MARKET_TTL:
-        return cached[1]
+    if cached is not None:
+        return cached
+    version = _market_cache.version(category)
 
     nfj_category = "artificialIntelligence" if category == "ai" else category
 
@@ -1047,5 +1644,110 @@ async def get_market_stats(category: str = "backend", _: User = Depends(get_curr
         "source": "nofluffjobs",
         "cached_at": datetime.now(timezone.utc).isoformat(),
     }
-    _market_cache[category] = (time.time(), result)
+    _market_cache.set(category, result, version)
     return result
+
+
+# ---------------------------------------------------------------------------
+# Admin — parse provenance summary, cache invalidation
+# ---------------------------------------------------------------------------
+
+# Prompt each resume source is parsed with; refining keeps the original provenance.
+_RESUME_SOURCE_OPERATIONS = {"cv": "parse_cv", "manual": "parse_work_history"}
+
+_PROVENANCE_SQL = """
+    SELECT {columns}, count(*) AS count,
+           min(parsed_at) AS first_parsed_at, max(parsed_at) AS last_parsed_at,
+           avg(parse_latency_ms) AS latency_avg_ms,
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY parse_latency_ms) AS latency_p50_ms,
+           percentile_cont(0.95) WITHIN GROUP (ORDER BY parse_latency_ms) AS latency_p95_ms,
+           avg(parse_input_tokens) AS input_tokens_avg, sum(parse_input_tokens) AS input_tokens_total,
+           avg(parse_output_tokens) AS output_tokens_avg, sum(parse_output_tokens) AS output_tokens_total
+    FROM {table}
+    WHERE parse_prompt_hash IS NOT NULL
+    GROUP BY {columns}
+    ORDER BY max(parsed_at) DESC
+"""
+
+
+def _provenance_group(row, current_hash: str) -> dict:
+    def rounded(value):
+        return round(float(value), 1) if value is not None else None
+
+    return {
+        "provider": row["parse_provider"],
+        "model": row["parse_model"],
+        "prompt_hash": row["parse_prompt_hash"],
+        "current": row["parse_prompt_hash"] == current_hash,
+        "count": row["count"],
+        "first_parsed_at": row["first_parsed_at"].isoformat(),
+        "last_parsed_at": row["last_parsed_at"].isoformat(),
+        "latency_ms": {
+            "avg": rounded(row["latency_avg_ms"]),
+            "p50": rounded(row["latency_p50_ms"]),
+            "p95": rounded(row["latency_p95_ms"]),
+        },
+        "input_tokens": {"avg": rounded(row["input_tokens_avg"]), "total": row["input_tokens_total"]},
+        "output_tokens": {"avg": rounded(row["output_tokens_avg"]), "total": row["output_tokens_total"]},
+    }
+
+
+@app.get("/api/admin/provenance")
+async def admin_provenance(
+    admin: User = Depends(get_admin_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Which provider, model and prompt version produced the stored parses, across all users."""
+    columns = "parse_provider, parse_model, parse_prompt_hash"
+    job_rows = (await session.exec(text(_PROVENANCE_SQL.format(columns=columns, table="jobs")))).mappings().all()
+    resume_rows = (await session.exec(
+        text(_PROVENANCE_SQL.format(columns=f"source, {columns}", table="resumes"))
+    )).mappings().all()
+    unparsed = (await session.exec(text("""
+        SELECT (SELECT count(*) FROM jobs WHERE parse_prompt_hash IS NULL) AS jobs,
+               (SELECT count(*) FROM resumes WHERE parse_prompt_hash IS NULL) AS resumes
+    """))).mappings().one()
+
+    return {
+        "current_prompts": {
+            operation: prompt_hash(operation) for operation in ("parse_job", *_RESUME_SOURCE_OPERATIONS.values())
+        },
+        "jobs": {
+            "unparsed": unparsed["jobs"],
+            "groups": [_provenance_group(row, prompt_hash("parse_job")) for row in job_rows],
+        },
+        "resumes": {
+            "unparsed": unparsed["resumes"],
+            "groups": [
+                {
+                    "source": row["source"],
+                    **_provenance_group(row, prompt_hash(_RESUME_SOURCE_OPERATIONS.get(row["source"], "parse_cv"))),
+                }
+                for row in resume_rows
+            ],
+        },
+    }
+
+
+@app.post("/api/admin/caches/{name}/invalidate")
+async def admin_invalidate_cache(
+    name: str,
+    admin: User = Depends(get_admin_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Empty an in-process cache in every worker, e.g. after fixing data by hand."""
+    if name not in caches.caches:
+        raise HTTPException(status_code=404, detail=f"Unknown cache. Valid: {sorted(caches.caches)}")
+    await invalidate(session, name)
+    await session.commit()
+    log_auth.info("admin.cache_invalidated", user_id=admin.id, cache=name)
+    return {"ok": True}
+
+
+# ---------------------------------------------------------------------------
+# Metrics — Prometheus text exposition
+# ---------------------------------------------------------------------------
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return render_metrics()
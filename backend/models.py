@@ -3,7 +3,7 @@ from typing import Optional
 import uuid
 
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB
 
 # Shorthand for a timezone-aware timestamp column (TIMESTAMPTZ in Postgres).
@@ -46,6 +46,16 @@ class Job(SQLModel, table=True):
     contract: str = ""
     stack: Optional[list] = Field(default=None, sa_column=Column(JSONB))
     description: str = ""
+    # Parse provenance: which provider, model and prompt version produced the
+    # parsed fields, and what the call took; NULL when parsing fell back to an
+    # empty result. bulk_reparse.py selects on these, /api/admin/provenance sums them.
+    parse_provider: Optional[str] = None
+    parse_model: Optional[str] = None
+    parse_prompt_hash: Optional[str] = None
+    parsed_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    parse_latency_ms: Optional[int] = None
+    parse_input_tokens: Optional[int] = None
+    parse_output_tokens: Optional[int] = None
 
 
 class Resume(SQLModel, table=True):
@@ -66,6 +76,33 @@ class Resume(SQLModel, table=True):
         sa_column=Column(DateTime(timezone=True)),
     )
     skills: Optional[list] = Field(default=None, sa_column=Column(JSONB))
+    # Parse provenance of the initial parse, as on Job; refining does not change it.
+    parse_provider: Optional[str] = None
+    parse_model: Optional[str] = None
+    parse_prompt_hash: Optional[str] = None
+    parsed_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    parse_latency_ms: Optional[int] = None
+    parse_input_tokens: Optional[int] = None
+    parse_output_tokens: Optional[int] = None
+
+
+class ResumeSkill(SQLModel, table=True):
+    """One skill of a resume. The source of truth; Resume.skills is a derived copy
+    kept in the same order (position) for cheap whole-profile reads."""
+    __tablename__ = "resume_skills"
+    __table_args__ = (UniqueConstraint("resume_id", "canonical_name", name="uq_resume_skills_resume_name"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    resume_id: int = Field(foreign_key="resumes.id", ondelete="CASCADE")
+    canonical_name: str = Field(index=True)
+    position: int = 0
+    name: str
+    years: Optional[float] = None
+    last_used_year: Optional[int] = None
+    recency: str = ""
+    ai_confidence: Optional[int] = None
+    user_rating: Optional[int] = None
+    note: str = ""
 
 
 class Question(SQLModel, table=True):
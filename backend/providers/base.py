@@ -1,4 +1,14 @@
+import hashlib
+import time
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+# The *_PROMPT constants are sent as the system message, byte-identical on every
+# call, with only the variable text in the user message. That fixed prefix is
+# what provider prompt caches key on (Anthropic cache_control, OpenAI/Groq/Gemini
+# automatic prefix caching), so keep anything per-request out of them.
 
 PARSE_PROMPT = """Extract structured job offer data from the text below.
 Return a JSON object with exactly these fields:
@@ -75,9 +85,7 @@ Apply the same rules as for CV parsing:
 - Derive years of use and recency from the periods provided.
 - "ai_confidence" 1-5 based on prominence and recency.
 - Return only valid JSON. No markdown, no explanation.
-
-Work history entries:
-"""
+The work history entries follow in the user message."""
 
 REFINE_PROMPT = """You are a CV analyser. Below is an existing skill profile (compact format) and additional work history context.
 Merge the new evidence into the existing skills and return an updated skills array only.
@@ -99,13 +107,125 @@ Rules:
 - Keep all existing skills. Update years/recency/ai_confidence where the new context provides better evidence.
 - Add new skills found in the work history entries that were not in the existing profile.
 - Do not remove skills.
-- Return only valid JSON. No markdown, no explanation.
+- Return only valid JSON. No markdown, no explanation."""
+
+QUESTIONS_PROMPT = """You write technical interview questions for a practice question bank.
+For the skill and difficulty given below, write the requested number of distinct questions,
+each with a concise model answer (2-4 sentences). Return a JSON object with exactly this shape:
 
-Existing profile (compact):
+{
+  "questions": [
+    {"question": "the question", "answer": "model answer", "category": "basics | advanced | concurrency | performance | design | tooling"}
+  ]
+}
+
+Difficulty rubric: "easy" = definitions and everyday usage; "medium" = trade-offs and how things work;
+"hard" = internals, failure modes and design under constraints.
+Return only valid JSON. No markdown, no explanation.
 """
 
 
+PROMPTS = {
+    "parse_job": PARSE_PROMPT,
+    "parse_cv": CV_PARSE_PROMPT,
+    "parse_work_history": WORK_HISTORY_PROMPT,
+    "refine_profile": REFINE_PROMPT,
+    "generate_questions": QUESTIONS_PROMPT,
+}
+
+
+def prompt_hash(operation: str) -> str:
+    """Identifies the prompt version a stored result was produced with."""
+    return hashlib.sha256(PROMPTS[operation].encode("utf-8")).hexdigest()[:16]
+
+
+def refine_request(compact_skills: str, entries_text: str) -> str:
+    return f"Existing profile (compact):\n{compact_skills}\n\nAdditional work history:\n{entries_text}"
+
+
+def questions_request(skill: str, difficulty: str, count: int) -> str:
+    return f"Skill: {skill}\nDifficulty: {difficulty}\nNumber of questions: {count}"
+
+
+@dataclass
+class Usage:
+    input_tokens: int = 0  # all prompt tokens, cached or not
+    output_tokens: int = 0
+    cache_read_tokens: int = 0  # the part of input_tokens served from the provider's prompt cache
+
+
+# Set by the caller (providers/instrumented.py, measure_call) for the duration
+# of one provider call; _call implementations report SDK usage into it.
+current_usage: ContextVar[Usage | None] = ContextVar("provider_usage", default=None)
+
+
+def report_usage(input_tokens: int | None, output_tokens: int | None, cache_read_tokens: int | None = None) -> None:
+    usage = current_usage.get()
+    if usage is not None:
+        usage.input_tokens += input_tokens or 0
+        usage.output_tokens += output_tokens or 0
+        usage.cache_read_tokens += cache_read_tokens or 0
+
+
+@dataclass
+class ProviderCall:
+    usage: Usage = field(default_factory=Usage)
+    latency_ms: int = 0
+    shared_latency_ms: int | None = None  # set by report_latency()
+
+
+current_call: ContextVar[ProviderCall | None] = ContextVar("provider_call", default=None)
+
+
+def report_latency(latency_ms: int) -> None:
+    """Latency of the provider call behind a shared (coalesced) result, to use instead
+    of the time this caller spent waiting for it."""
+    call = current_call.get()
+    if call is not None:
+        call.shared_latency_ms = (call.shared_latency_ms or 0) + latency_ms
+
+
+@contextmanager
+def measure_call():
+    """Collect token usage and latency of the provider calls made inside the block.
+
+    A call coalesced onto another request's in-flight call reports that call's
+    tokens and latency, so every result carries what producing it cost.
+    """
+    call = ProviderCall()
+    usage_token = current_usage.set(call.usage)
+    call_token = current_call.set(call)
+    start = time.perf_counter()
+    try:
+        yield call
+    finally:
+        measured = round((time.perf_counter() - start) * 1000)
+        call.latency_ms = measured if call.shared_latency_ms is None else call.shared_latency_ms
+        current_call.reset(call_token)
+        current_usage.reset(usage_token)
+
+
 class BaseProvider(ABC):
+    name: str = ""
+    model: str = ""
+
+    # Asynchronous batch APIs (used by bulk_reparse.py). A batch maps caller-chosen
+    # custom ids to user messages for one operation; results arrive hours later at
+    # a discount. Providers without one keep supports_batch False.
+    supports_batch: bool = False
+
+    async def submit_batch(self, operation: str, requests: dict[str, str]) -> str:
+        """Submit {custom_id: user message}; returns the provider's batch id."""
+        raise RuntimeError(f"{self.name} has no batch API")
+
+    async def batch_status(self, batch_id: str) -> str:
+        """"running", "ended" (results ready, possibly partial) or "failed"."""
+        raise RuntimeError(f"{self.name} has no batch API")
+
+    async def batch_results(self, batch_id: str, operation: str) -> dict[str, dict | Exception]:
+        """Parsed result, or the error, per custom id. Ids missing from the dict got no result."""
+        raise RuntimeError(f"{self.name} has no batch API")
+
     @abstractmethod
     async def parse_job(self, raw_text: str) -> dict:
         pass
@@ -121,3 +241,7 @@ class BaseProvider(ABC):
     @abstractmethod
     async def refine_profile(self, compact_skills: str, entries_text: str) -> dict:
         pass
+
+    @abstractmethod
+    async def generate_questions(self, skill: str, difficulty: str, count: int) -> dict:
+        pass
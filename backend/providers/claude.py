@@ -1,29 +1,96 @@
-import json
 import anthropic
-from .base import BaseProvider, PARSE_PROMPT, CV_PARSE_PROMPT, WORK_HISTORY_PROMPT, REFINE_PROMPT
+from .base import (
+    BaseProvider, report_usage, refine_request, questions_request, PROMPTS,
+    PARSE_PROMPT, CV_PARSE_PROMPT, WORK_HISTORY_PROMPT, REFINE_PROMPT, QUESTIONS_PROMPT,
+)
+from .structured import decode, response_schema, validate
+from .transport import deadline, pooled
+
+MAX_TOKENS = {"parse_job": 1024}  # other operations: 2048
 
 
 class ClaudeProvider(BaseProvider):
+    name = "claude"
+    model = "claude-sonnet-4-6"
+    supports_batch = True
+
     def __init__(self, api_key: str):
-        self.client = anthropic.AsyncAnthropic(api_key=api_key)
+        self._pool = pooled(anthropic.DefaultAsyncHttpxClient)
+        self.client = anthropic.AsyncAnthropic(api_key=api_key, http_client=self._pool.client)
+
+    def _params(self, operation: str, system: str, user: str) -> dict:
+        # Forcing a single tool makes the reply the tool's input, shaped by its schema.
+        # The breakpoint on the system block caches tools + instructions as one prefix
+        # (prefixes under the model's minimum cacheable length are simply not cached).
+        return {
+            "model": self.model,
+            "max_tokens": MAX_TOKENS.get(operation, 2048),
+            "system": [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}],
+            "messages": [{"role": "user", "content": user}],
+            "tools": [{
+                "name": operation,
+                "description": "Record the extracted result.",
+                "input_schema": response_schema(operation),
+            }],
+            "tool_choice": {"type": "tool", "name": operation},
+        }
 
-    async def _call(self, prompt: str, max_tokens: int = 1024) -> dict:
-        message = await self.client.messages.create(
-            model="claude-sonnet-4-6",
-            max_tokens=max_tokens,
-            messages=[{"role": "user", "content": prompt}],
+    def _result(self, operation: str, message) -> dict:
+        usage = message.usage
+        cache_read = usage.cache_read_input_tokens or 0
+        # Anthropic counts cached and cache-written tokens apart from input_tokens.
+        report_usage(
+            usage.input_tokens + cache_read + (usage.cache_creation_input_tokens or 0),
+            usage.output_tokens, cache_read,
         )
-        return json.loads(message.content[0].text)
+        for block in message.content:
+            if block.type == "tool_use":
+                return validate(operation, block.input)
+        return decode(self.name, operation, "".join(b.text for b in message.content if b.type == "text"))
+
+    async def _call(self, operation: str, system: str, user: str) -> dict:
+        async with deadline(operation):
+            message = await self.client.messages.create(
+                **self._params(operation, system, user), timeout=self._pool.timeout(operation),
+            )
+        return self._result(operation, message)
 
     async def parse_job(self, raw_text: str) -> dict:
-        return await self._call(f"{PARSE_PROMPT}\n\n---\n\n{raw_text}")
+        return await self._call("parse_job", PARSE_PROMPT, raw_text)
 
     async def parse_cv(self, anonymized_text: str) -> dict:
-        return await self._call(f"{CV_PARSE_PROMPT}\n\n---\n\n{anonymized_text}", max_tokens=2048)
+        return await self._call("parse_cv", CV_PARSE_PROMPT, anonymized_text)
 
     async def parse_work_history(self, entries_text: str) -> dict:
-        return await self._call(f"{WORK_HISTORY_PROMPT}{entries_text}", max_tokens=2048)
+        return await self._call("parse_work_history", WORK_HISTORY_PROMPT, entries_text)
 
     async def refine_profile(self, compact_skills: str, entries_text: str) -> dict:
-        prompt = f"{REFINE_PROMPT}{compact_skills}\n\nAdditional work history:\n{entries_text}"
-        return await self._call(prompt, max_tokens=2048)
+        return await self._call("refine_profile", REFINE_PROMPT, refine_request(compact_skills, entries_text))
+
+    async def generate_questions(self, skill: str, difficulty: str, count: int) -> dict:
+        return await self._call("generate_questions", QUESTIONS_PROMPT, questions_request(skill, difficulty, count))
+
+    # Message Batches API: same request params as _call, half the price.
+
+    async def submit_batch(self, operation: str, requests: dict[str, str]) -> str:
+        batch = await self.client.messages.batches.create(requests=[
+            {"custom_id": custom_id, "params": self._params(operation, PROMPTS[operation], user)}
+            for custom_id, user in requests.items()
+        ])
+        return batch.id
+
+    async def batch_status(self, batch_id: str) -> str:
+        batch = await self.client.messages.batches.retrieve(batch_id)
+        return "ended" if batch.processing_status == "ended" else "running"
+
+    async def batch_results(self, batch_id: str, operation: str) -> dict[str, dict | Exception]:
+        results: dict[str, dict | Exception] = {}
+        async for entry in await self.client.messages.batches.results(batch_id):
+            if entry.result.type != "succeeded":
+                results[entry.custom_id] = RuntimeError(f"batch request {entry.result.type}")
+                continue
+            try:
+                results[entry.custom_id] = self._result(operation, entry.result.message)
+            except ValueError as err:
+                results[entry.custom_id] = err
+        return results
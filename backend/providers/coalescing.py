@@ -0,0 +1,81 @@
+"""
+Single-flight coalescing: concurrent calls with identical input share one provider call.
+
+Extension retries and double-clicked reparses arrive while the first call is
+still running; they wait on that call's task instead of starting another.
+The shared task is shielded, so a caller that disconnects does not cancel it
+for the others. Only in-flight calls are shared — nothing is cached once the
+call finishes. Per process, like the rest of the provider stack.
+
+Every caller, the one that started the call included, gets the call's token
+usage and latency reported into its own measure_call(), so parse provenance
+records what the result cost rather than zero tokens and a wait time. Provider
+metrics are recorded once, inside the shared call.
+"""
+import asyncio
+import hashlib
+import json
+
+from metrics import Counter
+from .base import BaseProvider, measure_call, report_latency, report_usage
+
+_coalesced = Counter(
+    "provider_coalesced_total", "Provider calls served by an identical call already in flight",
+    ("provider", "operation"),
+)
+
+
+class CoalescingProvider(BaseProvider):
+    def __init__(self, inner: BaseProvider):
+        self.inner = inner
+        self.name = inner.name
+        self.model = inner.model
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def record_fallback(self, operation: str) -> None:
+        self.inner.record_fallback(operation)
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller went away
+
+    @staticmethod
+    async def _measured(call, args: tuple):
+        with measure_call() as measured:
+            result = await call(*args)
+        return result, measured
+
+    async def _single_flight(self, operation: str, args: tuple, call) -> dict:
+        key = hashlib.sha256(json.dumps([operation, *args], ensure_ascii=False).encode("utf-8")).hexdigest()
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._measured(call, args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            _coalesced.labels(self.name, operation).inc()
+        result, measured = await asyncio.shield(task)
+        usage = measured.usage
+        report_usage(usage.input_tokens, usage.output_tokens, usage.cache_read_tokens)
+        report_latency(measured.latency_ms)
+        return json.loads(json.dumps(result))  # each caller gets its own copy to mutate
+
+    async def parse_job(self, raw_text: str) -> dict:
+        return await self._single_flight("parse_job", (raw_text,), self.inner.parse_job)
+
+    async def parse_cv(self, anonymized_text: str) -> dict:
+        return await self._single_flight("parse_cv", (anonymized_text,), self.inner.parse_cv)
+
+    async def parse_work_history(self, entries_text: str) -> dict:
+        return await self._single_flight("parse_work_history", (entries_text,), self.inner.parse_work_history)
+
+    async def refine_profile(self, compact_skills: str, entries_text: str) -> dict:
+        return await self._single_flight(
+            "refine_profile", (compact_skills, entries_text), self.inner.refine_profile,
+        )
+
+    async def generate_questions(self, skill: str, difficulty: str, count: int) -> dict:
+        return await self._single_flight(
+            "generate_questions", (skill, difficulty, count), self.inner.generate_questions,
+        )
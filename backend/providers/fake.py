@@ -0,0 +1,103 @@
+import asyncio
+import os
+import random
+import re
+
+from .base import BaseProvider, report_usage
+
+# Small vocabulary so fake jobs and resumes overlap and match scores are non-trivial.
+TECHNOLOGIES = [
+    "Python", "Django", "FastAPI", "PostgreSQL", "Redis", "Docker", "Kubernetes", "AWS",
+    "React", "TypeScript", "JavaScript", "Node.js", "Java", "Spring", "Go", "Kafka",
+    "Terraform", "GCP", "Azure", "Linux", "Git", "CI/CD", "SQL", "GraphQL",
+]
+_RE_TECH = re.compile(
+    r"\b(" + "|".join(re.escape(t) for t in TECHNOLOGIES) + r")\b", re.IGNORECASE,
+)
+_CANONICAL = {t.lower(): t for t in TECHNOLOGIES}
+
+
+class FakeProvider(BaseProvider):
+    """Offline provider for local development and load testing — no network, no API key.
+
+    Latency is simulated with FAKE_PROVIDER_LATENCY_MS (mean, exponential jitter).
+    """
+
+    name = "fake"
+    model = "fake"
+
+    def __init__(self, latency_ms: float | None = None):
+        if latency_ms is None:
+            latency_ms = float(os.getenv("FAKE_PROVIDER_LATENCY_MS") or 0)
+        self.latency = latency_ms / 1000
+
+    async def _sleep(self) -> None:
+        if self.latency:
+            await asyncio.sleep(random.expovariate(1 / self.latency))
+
+    def _stack(self, text: str) -> list[str]:
+        seen: dict[str, None] = {}
+        for m in _RE_TECH.finditer(text):
+            seen.setdefault(_CANONICAL[m.group(1).lower()], None)
+        return list(seen)
+
+    def _skills(self, text: str) -> list[dict]:
+        return [
+            {
+                "name": name,
+                "years": random.randint(1, 8),
+                "last_used_year": None,
+                "recency": random.choice(["current", "1-2 years ago", "3+ years ago"]),
+                "ai_confidence": random.randint(1, 5),
+            }
+            for name in self._stack(text)
+        ]
+
+    async def parse_job(self, raw_text: str) -> dict:
+        await self._sleep()
+        report_usage(len(raw_text) // 4, 150)
+        lines = [line.strip() for line in raw_text.splitlines() if line.strip()]
+        return {
+            "is_job_offer": True,
+            "title": lines[0][:120] if lines else "Untitled",
+            "company": lines[1][:120] if len(lines) > 1 else "",
+            "location": "Warsaw",
+            "salary": "",
+            "mode": random.choice(["remote", "hybrid", "onsite"]),
+            "seniority": random.choice(["junior", "mid", "senior"]),
+            "contract": random.choice(["B2B", "Permanent"]),
+            "stack": self._stack(raw_text),
+            "description": " ".join(lines[2:5])[:300],
+        }
+
+    async def parse_cv(self, anonymized_text: str) -> dict:
+        await self._sleep()
+        report_usage(len(anonymized_text) // 4, 400)
+        return {
+            "skills": self._skills(anonymized_text),
+            "years_experience": random.randint(1, 15),
+            "current_role": "Software Engineer",
+            "summary": "Fake profile generated offline.",
+        }
+
+    async def parse_work_history(self, entries_text: str) -> dict:
+        return await self.parse_cv(entries_text)
+
+    async def refine_profile(self, compact_skills: str, entries_text: str) -> dict:
+        await self._sleep()
+        report_usage((len(compact_skills) + len(entries_text)) // 4, 400)
+        return {"skills": self._skills(f"{compact_skills}\n{entries_text}")}
+
+    async def generate_questions(self, skill: str, difficulty: str, count: int) -> dict:
+        await self._sleep()
+        report_usage(60, 80 * count)
+        return {
+            "questions": [
+                {
+                    "question": f"[{difficulty}] {skill} question {random.randint(1, 10**6)}?",
+                    "answer": f"A fake {difficulty} answer about {skill}.",
+                    "category": random.choice(["basics", "advanced", "performance"]),
+                }
+                for _ in range(count)
+            ]
+        }
@@ -1,36 +1,53 @@
-import json
-import asyncio
 from google import genai
-from .base import BaseProvider, PARSE_PROMPT, CV_PARSE_PROMPT, WORK_HISTORY_PROMPT, REFINE_PROMPT
+from google.genai import types
+from .base import (
+    BaseProvider, report_usage, refine_request, questions_request,
+    PARSE_PROMPT, CV_PARSE_PROMPT, WORK_HISTORY_PROMPT, REFINE_PROMPT, QUESTIONS_PROMPT,
+)
+from .structured import SCHEMAS, decode
+from .transport import TIMEOUTS, deadline, pooled
 
 
 class GeminiProvider(BaseProvider):
+    name = "gemini"
+    model = "gemini-2.5-flash"
+
     def __init__(self, api_key: str):
-        self.client = genai.Client(api_key=api_key)
-        self.model = "gemini-2.5-flash"
-
-    async def _call(self, prompt: str) -> dict:
-        response = await asyncio.to_thread(
-            self.client.models.generate_content,
-            model=self.model,
-            contents=prompt,
+        self.client = genai.Client(
+            api_key=api_key, http_options=types.HttpOptions(httpx_async_client=pooled().client),
         )
-        text = response.text.strip()
-        if text.startswith("```"):
-            text = text.split("```")[1]
-            if text.startswith("json"):
-                text = text[4:]
-        return json.loads(text.strip())
+
+    async def _call(self, operation: str, system: str, user: str) -> dict:
+        # Instructions as system_instruction keep the prefix identical across calls,
+        # which is what Gemini's implicit caching matches on.
+        async with deadline(operation):
+            response = await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=user,
+                config=types.GenerateContentConfig(
+                    system_instruction=system,
+                    response_mime_type="application/json",
+                    response_schema=SCHEMAS[operation],
+                    # Per attempt, in milliseconds; deadline() bounds the retries.
+                    http_options=types.HttpOptions(timeout=int(TIMEOUTS[operation].read * 1000)),
+                ),
+            )
+        usage = response.usage_metadata
+        if usage:
+            report_usage(usage.prompt_token_count, usage.candidates_token_count, usage.cached_content_token_count)
+        return decode(self.name, operation, response.text or "")
 
     async def parse_job(self, raw_text: str) -> dict:
-        return await self._call(f"{PARSE_PROMPT}\n\n---\n\n{raw_text}")
+        return await self._call("parse_job", PARSE_PROMPT, raw_text)
 
     async def parse_cv(self, anonymized_text: str) -> dict:
-        return await self._call(f"{CV_PARSE_PROMPT}\n\n---\n\n{anonymized_text}")
+        return await self._call("parse_cv", CV_PARSE_PROMPT, anonymized_text)
 
     async def parse_work_history(self, entries_text: str) -> dict:
-        return await self._call(f"{WORK_HISTORY_PROMPT}{entries_text}")
+        return await self._call("parse_work_history", WORK_HISTORY_PROMPT, entries_text)
 
     async def refine_profile(self, compact_skills: str, entries_text: str) -> dict:
-        prompt = f"{REFINE_PROMPT}{compact_skills}\n\nAdditional work history:\n{entries_text}"
-        return await self._call(prompt)
+        return await self._call("refine_profile", REFINE_PROMPT, refine_request(compact_skills, entries_text))
+
+    async def generate_questions(self, skill: str, difficulty: str, count: int) -> dict:
+        return await self._call("generate_questions", QUESTIONS_PROMPT, questions_request(skill, difficulty, count))
@@ -1,35 +1,57 @@
-import json
-from groq import AsyncGroq
-from .base import BaseProvider, PARSE_PROMPT, CV_PARSE_PROMPT, WORK_HISTORY_PROMPT, REFINE_PROMPT
+from groq import AsyncGroq, DefaultAsyncHttpxClient
+from .base import (
+    BaseProvider, report_usage, refine_request, questions_request,
+    PARSE_PROMPT, CV_PARSE_PROMPT, WORK_HISTORY_PROMPT, REFINE_PROMPT, QUESTIONS_PROMPT,
+)
+from .structured import decode
+from .transport import deadline, pooled
 
 MODEL = "llama-3.3-70b-versatile"
 
 
 class GroqProvider(BaseProvider):
+    name = "groq"
+    model = MODEL
+
     def __init__(self, api_key: str):
-        self.client = AsyncGroq(api_key=api_key)
-
-    async def _call(self, system: str, user: str, max_tokens: int = 1024) -> dict:
-        response = await self.client.chat.completions.create(
-            model=MODEL,
-            max_tokens=max_tokens,
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ],
-            response_format={"type": "json_object"},
-        )
-        return json.loads(response.choices[0].message.content)
+        self._pool = pooled(DefaultAsyncHttpxClient)
+        self.client = AsyncGroq(api_key=api_key, http_client=self._pool.client)
+
+    async def _call(self, operation: str, system: str, user: str, max_tokens: int = 1024) -> dict:
+        async with deadline(operation):
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                max_tokens=max_tokens,
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": user},
+                ],
+                # llama-3.3-70b-versatile has no json_schema mode on Groq; JSON mode plus
+                # the schema in the prompt, repaired and validated by decode().
+                response_format={"type": "json_object"},
+                timeout=self._pool.timeout(operation),
+            )
+        if response.usage:
+            details = response.usage.prompt_tokens_details
+            report_usage(
+                response.usage.prompt_tokens, response.usage.completion_tokens,
+                details.cached_tokens if details else 0,
+            )
+        return decode(self.name, operation, response.choices[0].message.content or "")
 
     async def parse_job(self, raw_text: str) -> dict:
-        return await self._call(PARSE_PROMPT, raw_text)
+        return await self._call("parse_job", PARSE_PROMPT, raw_text)
 
     async def parse_cv(self, anonymized_text: str) -> dict:
-        return await self._call(CV_PARSE_PROMPT, anonymized_text, max_tokens=2048)
+        return await self._call("parse_cv", CV_PARSE_PROMPT, anonymized_text, max_tokens=2048)
 
     async def parse_work_history(self, entries_text: str) -> dict:
-        return await self._call(WORK_HISTORY_PROMPT, entries_text, max_tokens=2048)
+        return await self._call("parse_work_history", WORK_HISTORY_PROMPT, entries_text, max_tokens=2048)
 
     async def refine_profile(self, compact_skills: str, entries_text: str) -> dict:
-        user = f"Existing profile:\n{compact_skills}\n\nAdditional work history:\n{entries_text}"
-        return await self._call(REFINE_PROMPT, user, max_tokens=2048)
+        return await self._call(
+            "refine_profile", REFINE_PROMPT, refine_request(compact_skills, entries_text), max_tokens=2048,
+        )
+
+    async def generate_questions(self, skill: str, difficulty: str, count: int) -> dict:
+        return await self._call("generate_questions", QUESTIONS_PROMPT, questions_request(skill, difficulty, count), max_tokens=2048)
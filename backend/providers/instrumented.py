@@ -0,0 +1,113 @@
+import json
+import time
+
+from metrics import Counter, Histogram
+from .base import BaseProvider, Usage, current_usage, report_usage
+from .structured import StructuredOutputError
+from .transport import ProviderTimeout
+
+OPERATIONS = ("parse_job", "parse_cv", "parse_work_history", "refine_profile", "generate_questions")
+
+# USD per 1M tokens (input, cached input, output). Used for cost estimates only.
+PRICES: dict[str, tuple[float, float, float]] = {
+    "claude-sonnet-4-6": (3.00, 0.30, 15.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gemini-2.5-flash": (0.30, 0.075, 2.50),
+    "llama-3.3-70b-versatile": (0.59, 0.295, 0.79),
+}
+
+_LABELS = ("provider", "model", "operation")
+
+_latency = Histogram(
+    "provider_request_seconds", "AI provider call latency", _LABELS,
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 16, 32, 64),
+)
+_calls = Counter("provider_requests_total", "AI provider calls", _LABELS + ("outcome",))
+_input_tokens = Counter("provider_input_tokens_total", "Prompt tokens reported by the SDK", _LABELS)
+_output_tokens = Counter("provider_output_tokens_total", "Completion tokens reported by the SDK", _LABELS)
+_cache_read_tokens = Counter(
+    "provider_cache_read_tokens_total", "Prompt tokens served from the provider's prompt cache", _LABELS,
+)
+_cost = Counter("provider_cost_usd_total", "Estimated provider cost in USD", _LABELS)
+_fallbacks = Counter("provider_fallbacks_total", "Calls where the endpoint fell back to an empty result", _LABELS)
+
+
+class _OpMetrics:
+    """Metric children for one (provider, model, operation), resolved once."""
+
+    __slots__ = ("latency", "ok", "json_error", "timeout", "error", "input_tokens", "output_tokens", "cache_read_tokens",
+                 "cost", "fallbacks", "input_price", "cached_price", "output_price")
+
+    def __init__(self, provider: str, model: str, operation: str):
+        labels = (provider, model, operation)
+        self.latency = _latency.labels(*labels)
+        self.ok = _calls.labels(*labels, "ok")
+        self.json_error = _calls.labels(*labels, "json_error")
+        self.timeout = _calls.labels(*labels, "timeout")
+        self.error = _calls.labels(*labels, "error")
+        self.input_tokens = _input_tokens.labels(*labels)
+        self.output_tokens = _output_tokens.labels(*labels)
+        self.cache_read_tokens = _cache_read_tokens.labels(*labels)
+        self.cost = _cost.labels(*labels)
+        self.fallbacks = _fallbacks.labels(*labels)
+        self.input_price, self.cached_price, self.output_price = PRICES.get(model, (0.0, 0.0, 0.0))
+
+
+class InstrumentedProvider(BaseProvider):
+    """Wraps a provider and records latency, token usage, failures and cost per operation."""
+
+    def __init__(self, inner: BaseProvider):
+        self.inner = inner
+        self.name = inner.name
+        self.model = inner.model
+        self._ops = {op: _OpMetrics(inner.name, inner.model, op) for op in OPERATIONS}
+
+    async def _observe(self, operation: str, coro) -> dict:
+        m = self._ops[operation]
+        usage = Usage()
+        token = current_usage.set(usage)
+        start = time.perf_counter()
+        try:
+            result = await coro
+        except (json.JSONDecodeError, StructuredOutputError):
+            m.json_error.inc()
+            raise
+        except ProviderTimeout:
+            m.timeout.inc()
+            raise
+        except Exception:
+            m.error.inc()
+            raise
+        else:
+            m.ok.inc()
+            return result
+        finally:
+            m.latency.observe(time.perf_counter() - start)
+            current_usage.reset(token)
+            report_usage(usage.input_tokens, usage.output_tokens, usage.cache_read_tokens)  # to measure_call
+            m.input_tokens.inc(usage.input_tokens)
+            m.output_tokens.inc(usage.output_tokens)
+            m.cache_read_tokens.inc(usage.cache_read_tokens)
+            uncached = usage.input_tokens - usage.cache_read_tokens
+            m.cost.inc((
+                uncached * m.input_price + usage.cache_read_tokens * m.cached_price
+                + usage.output_tokens * m.output_price
+            ) / 1e6)
+
+    def record_fallback(self, operation: str) -> None:
+        self._ops[operation].fallbacks.inc()
+
+    async def parse_job(self, raw_text: str) -> dict:
+        return await self._observe("parse_job", self.inner.parse_job(raw_text))
+
+    async def parse_cv(self, anonymized_text: str) -> dict:
+        return await self._observe("parse_cv", self.inner.parse_cv(anonymized_text))
+
+    async def parse_work_history(self, entries_text: str) -> dict:
+        return await self._observe("parse_work_history", self.inner.parse_work_history(entries_text))
+
+    async def refine_profile(self, compact_skills: str, entries_text: str) -> dict:
+        return await self._observe("refine_profile", self.inner.refine_profile(compact_skills, entries_text))
+
+    async def generate_questions(self, skill: str, difficulty: str, count: int) -> dict:
+        return await self._observe("generate_questions", self.inner.generate_questions(skill, difficulty, count))
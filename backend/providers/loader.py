@@ -0,0 +1,51 @@
+"""
+Provider construction from AI_PROVIDER, shared by the API and offline tools
+(bulk_reparse.py) so both build exactly the same provider.
+
+Each branch imports its provider module, and with it the SDK, only when that
+provider is selected: importing all four SDKs takes seconds and is most of the
+API's cold-start time.
+"""
+import os
+
+from .base import BaseProvider
+from .coalescing import CoalescingProvider
+from .instrumented import InstrumentedProvider
+
+
+def create_provider(name: str) -> BaseProvider:
+    if name == "claude":
+        from .claude import ClaudeProvider
+        return ClaudeProvider(api_key=os.environ["ANTHROPIC_API_KEY"])
+    if name == "openai":
+        from .openai import OpenAIProvider
+        return OpenAIProvider(api_key=os.environ["OPENAI_API_KEY"])
+    if name == "gemini":
+        from .gemini import GeminiProvider
+        return GeminiProvider(api_key=os.environ["GEMINI_API_KEY"])
+    if name == "groq":
+        from .groq import GroqProvider
+        return GroqProvider(api_key=os.environ["GROQ_API_KEY"])
+    if name == "fake":
+        from .fake import FakeProvider
+        return FakeProvider()
+
+    from .recording import RecordingProvider, ReplayProvider, DEFAULT_CASSETTE
+    cassette = os.getenv("PROVIDER_CASSETTE") or DEFAULT_CASSETTE
+    if name == "record":
+        inner = create_provider(os.getenv("RECORD_PROVIDER", "").lower())
+        return RecordingProvider(inner, cassette)
+    if name == "replay":
+        return ReplayProvider(
+            cassette,
+            latency=os.getenv("REPLAY_LATENCY", "recorded").lower(),
+            on_miss=os.getenv("REPLAY_ON_MISS", "any").lower(),
+        )
+    raise RuntimeError(
+        f"Unknown AI_PROVIDER '{name}'. Set it to: claude | openai | gemini | groq | fake | record | replay"
+    )
+
+
+def load_provider() -> CoalescingProvider:
+    # Coalescing sits outside instrumentation so metrics count real provider calls.
+    return CoalescingProvider(InstrumentedProvider(create_provider(os.getenv("AI_PROVIDER", "").lower())))
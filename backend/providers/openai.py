@@ -1,33 +1,121 @@
 import json
-from openai import AsyncOpenAI
-from .base import BaseProvider, PARSE_PROMPT, CV_PARSE_PROMPT, WORK_HISTORY_PROMPT, REFINE_PROMPT
+
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from openai.types.chat import ChatCompletion
+from .base import (
+    BaseProvider, report_usage, refine_request, questions_request, PROMPTS,
+    PARSE_PROMPT, CV_PARSE_PROMPT, WORK_HISTORY_PROMPT, REFINE_PROMPT, QUESTIONS_PROMPT,
+)
+from .structured import decode, response_schema
+from .transport import deadline, pooled
+
+MAX_TOKENS = {"parse_job": 1024}  # other operations: 2048
+CHAT_COMPLETIONS = "/v1/chat/completions"
 
 
 class OpenAIProvider(BaseProvider):
+    name = "openai"
+    model = "gpt-4o-mini"
+    supports_batch = True
+
     def __init__(self, api_key: str):
-        self.client = AsyncOpenAI(api_key=api_key)
+        # OPENAI_BASE_URL, when set, is picked up by the SDK (e.g. bench/fake_batch_api.py).
+        self._pool = pooled(DefaultAsyncHttpxClient)
+        self.client = AsyncOpenAI(api_key=api_key, http_client=self._pool.client)
 
-    async def _call(self, system: str, user: str, max_tokens: int = 1024) -> dict:
-        response = await self.client.chat.completions.create(
-            model="gpt-4o-mini",
-            max_tokens=max_tokens,
-            messages=[
+    def _body(self, operation: str, system: str, user: str) -> dict:
+        return {
+            "model": self.model,
+            "max_tokens": MAX_TOKENS.get(operation, 2048),
+            # Same system prompt and schema per operation: route them to the same
+            # cache shard so the automatic prefix cache actually hits.
+            "prompt_cache_key": f"hiretree-{operation}",
+            "messages": [
                 {"role": "system", "content": system},
                 {"role": "user", "content": user},
             ],
-            response_format={"type": "json_object"},
-        )
-        return json.loads(response.choices[0].message.content)
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": operation, "schema": response_schema(operation), "strict": True},
+            },
+        }
+
+    def _result(self, operation: str, response: ChatCompletion) -> dict:
+        if response.usage:
+            details = response.usage.prompt_tokens_details
+            report_usage(
+                response.usage.prompt_tokens, response.usage.completion_tokens,
+                details.cached_tokens if details else 0,
+            )
+        return decode(self.name, operation, response.choices[0].message.content or "")
+
+    async def _call(self, operation: str, system: str, user: str) -> dict:
+        async with deadline(operation):
+            response = await self.client.chat.completions.create(
+                **self._body(operation, system, user), timeout=self._pool.timeout(operation),
+            )
+        return self._result(operation, response)
 
     async def parse_job(self, raw_text: str) -> dict:
-        return await self._call(PARSE_PROMPT, raw_text)
+        return await self._call("parse_job", PARSE_PROMPT, raw_text)
 
     async def parse_cv(self, anonymized_text: str) -> dict:
-        return await self._call(CV_PARSE_PROMPT, anonymized_text, max_tokens=2048)
+        return await self._call("parse_cv", CV_PARSE_PROMPT, anonymized_text)
 
     async def parse_work_history(self, entries_text: str) -> dict:
-        return await self._call(WORK_HISTORY_PROMPT, entries_text, max_tokens=2048)
+        return await self._call("parse_work_history", WORK_HISTORY_PROMPT, entries_text)
 
     async def refine_profile(self, compact_skills: str, entries_text: str) -> dict:
-        user = f"Existing profile:\n{compact_skills}\n\nAdditional work history:\n{entries_text}"
-        return await self._call(REFINE_PROMPT, user, max_tokens=2048)
+        return await self._call("refine_profile", REFINE_PROMPT, refine_request(compact_skills, entries_text))
+
+    async def generate_questions(self, skill: str, difficulty: str, count: int) -> dict:
+        return await self._call("generate_questions", QUESTIONS_PROMPT, questions_request(skill, difficulty, count))
+
+    # Batch API: a JSONL file of chat completion bodies in, a JSONL file of responses out.
+
+    async def submit_batch(self, operation: str, requests: dict[str, str]) -> str:
+        lines = "".join(
+            json.dumps({
+                "custom_id": custom_id, "method": "POST", "url": CHAT_COMPLETIONS,
+                "body": self._body(operation, PROMPTS[operation], user),
+            }, ensure_ascii=False) + "\n"
+            for custom_id, user in requests.items()
+        )
+        upload = await self.client.files.create(
+            file=("batch.jsonl", lines.encode("utf-8"), "application/jsonl"), purpose="batch",
+        )
+        batch = await self.client.batches.create(
+            input_file_id=upload.id, endpoint=CHAT_COMPLETIONS, completion_window="24h",
+        )
+        return batch.id
+
+    async def batch_status(self, batch_id: str) -> str:
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status == "failed":
+            return "failed"
+        # expired and cancelled batches still return what finished
+        return "ended" if batch.status in ("completed", "expired", "cancelled") else "running"
+
+    async def batch_results(self, batch_id: str, operation: str) -> dict[str, dict | Exception]:
+        batch = await self.client.batches.retrieve(batch_id)
+        results: dict[str, dict | Exception] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self.client.files.content(file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get("response") or {}
+                if entry.get("error") or response.get("status_code") != 200:
+                    error = entry.get("error") or response.get("body", {}).get("error") or response.get("status_code")
+                    results[entry["custom_id"]] = RuntimeError(f"batch request failed: {error}")
+                    continue
+                try:
+                    results[entry["custom_id"]] = self._result(
+                        operation, ChatCompletion.model_validate(response["body"]),
+                    )
+                except ValueError as err:
+                    results[entry["custom_id"]] = err
+        return results
@@ -0,0 +1,172 @@
+"""
+Record/replay providers for deterministic offline runs.
+
+RecordingProvider wraps a real provider and appends every call — operation,
+input hash, response, latency and token usage — to a gzip-compressed JSON
+Lines cassette. ReplayProvider serves those responses back without network
+access, optionally sleeping for the recorded latency or a synthetic one drawn
+from the recorded distribution.
+
+Replay is deterministic: an input that was not recorded gets a recorded
+response of the same operation picked by the input's hash (REPLAY_ON_MISS=any)
+or raises (error), and synthetic latencies are seeded by the same hash.
+
+    AI_PROVIDER=record  RECORD_PROVIDER=claude  PROVIDER_CASSETTE=data/provider_cassette.jsonl.gz
+    AI_PROVIDER=replay  REPLAY_LATENCY=recorded|synthetic|none  REPLAY_ON_MISS=any|error
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import math
+import random
+import statistics
+import time
+from pathlib import Path
+
+from .base import BaseProvider, Usage, current_usage, report_usage
+
+DEFAULT_CASSETTE = Path(__file__).parent.parent / "data" / "provider_cassette.jsonl.gz"
+
+
+def _key(operation: str, *args: str) -> str:
+    digest = hashlib.sha256(json.dumps([operation, *args], ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+class RecordingProvider(BaseProvider):
+    def __init__(self, inner: BaseProvider, path: Path = DEFAULT_CASSETTE):
+        self.inner = inner
+        self.name = inner.name
+        self.model = inner.model
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = asyncio.Lock()  # one writer at a time, or gzip members interleave
+
+    def _write(self, entry: dict) -> None:
+        # Each append is its own gzip member; gzip.open reads them back as one stream.
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    async def _append(self, entry: dict) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._write, entry)
+
+    async def _record(self, operation: str, args: tuple[str, ...], coro) -> dict:
+        usage = Usage()
+        token = current_usage.set(usage)
+        start = time.perf_counter()
+        try:
+            response = await coro
+        finally:
+            latency = time.perf_counter() - start
+            current_usage.reset(token)
+            report_usage(usage.input_tokens, usage.output_tokens, usage.cache_read_tokens)
+        await self._append({
+            "key": _key(operation, *args),
+            "op": operation,
+            "model": self.model,
+            "latency_ms": round(latency * 1000, 1),
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "cache_read_tokens": usage.cache_read_tokens,
+            "response": response,
+        })
+        return response
+
+    async def parse_job(self, raw_text: str) -> dict:
+        return await self._record("parse_job", (raw_text,), self.inner.parse_job(raw_text))
+
+    async def parse_cv(self, anonymized_text: str) -> dict:
+        return await self._record("parse_cv", (anonymized_text,), self.inner.parse_cv(anonymized_text))
+
+    async def parse_work_history(self, entries_text: str) -> dict:
+        return await self._record(
+            "parse_work_history", (entries_text,), self.inner.parse_work_history(entries_text),
+        )
+
+    async def refine_profile(self, compact_skills: str, entries_text: str) -> dict:
+        return await self._record(
+            "refine_profile", (compact_skills, entries_text),
+            self.inner.refine_profile(compact_skills, entries_text),
+        )
+
+    async def generate_questions(self, skill: str, difficulty: str, count: int) -> dict:
+        return await self._record(
+            "generate_questions", (skill, difficulty, str(count)),
+            self.inner.generate_questions(skill, difficulty, count),
+        )
+
+
+class ReplayProvider(BaseProvider):
+    name = "replay"
+
+    def __init__(self, path: Path = DEFAULT_CASSETTE, latency: str = "recorded", on_miss: str = "any"):
+        if latency not in ("recorded", "synthetic", "none"):
+            raise ValueError(f"Unknown replay latency mode '{latency}'")
+        if on_miss not in ("any", "error"):
+            raise ValueError(f"Unknown replay miss mode '{on_miss}'")
+        path = Path(path)
+        if not path.exists():
+            raise RuntimeError(f"Replay cassette not found: {path}")
+
+        self.latency = latency
+        self.on_miss = on_miss
+        self.entries: dict[str, dict] = {}
+        self.by_op: dict[str, list[dict]] = {}
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.entries[entry["key"]] = entry  # last recording wins
+                    self.by_op.setdefault(entry["op"], []).append(entry)
+        if not self.entries:
+            raise RuntimeError(f"Replay cassette is empty: {path}")
+        self.model = next(iter(self.entries.values())).get("model", "")
+        # Stand-ins for unrecorded inputs, in key order so the pick does not depend on recording order.
+        self._fallbacks: dict[str, list[dict]] = {}
+        for key in sorted(self.entries):
+            self._fallbacks.setdefault(self.entries[key]["op"], []).append(self.entries[key])
+
+        # Log-normal fit per operation for synthetic latencies.
+        self._lognormal: dict[str, tuple[float, float]] = {}
+        for op, entries in self.by_op.items():
+            logs = [math.log(max(e["latency_ms"], 0.1)) for e in entries]
+            self._lognormal[op] = (statistics.fmean(logs), statistics.pstdev(logs))
+
+    def _delay(self, operation: str, key: str, entry: dict) -> float:
+        if self.latency == "recorded":
+            return entry["latency_ms"] / 1000
+        if self.latency == "synthetic":
+            mu, sigma = self._lognormal[operation]
+            return random.Random(key).lognormvariate(mu, sigma) / 1000
+        return 0.0
+
+    async def _replay(self, operation: str, *args: str) -> dict:
+        key = _key(operation, *args)
+        entry = self.entries.get(key)
+        if entry is None:
+            candidates = self._fallbacks.get(operation)
+            if self.on_miss == "error" or not candidates:
+                raise LookupError(f"No recorded response for {operation}")
+            entry = candidates[int(key, 16) % len(candidates)]
+        delay = self._delay(operation, key, entry)
+        if delay:
+            await asyncio.sleep(delay)
+        report_usage(entry.get("input_tokens"), entry.get("output_tokens"), entry.get("cache_read_tokens"))
+        return json.loads(json.dumps(entry["response"]))  # callers may mutate the result
+
+    async def parse_job(self, raw_text: str) -> dict:
+        return await self._replay("parse_job", raw_text)
+
+    async def parse_cv(self, anonymized_text: str) -> dict:
+        return await self._replay("parse_cv", anonymized_text)
+
+    async def parse_work_history(self, entries_text: str) -> dict:
+        return await self._replay("parse_work_history", entries_text)
+
+    async def refine_profile(self, compact_skills: str, entries_text: str) -> dict:
+        return await self._replay("refine_profile", compact_skills, entries_text)
+
+    async def generate_questions(self, skill: str, difficulty: str, count: int) -> dict:
+        return await self._replay("generate_questions", skill, difficulty, str(count))
@@ -0,0 +1,274 @@
+"""
+Structured output: one response schema per operation, JSON repair, validation.
+
+Each provider asks its SDK for schema-constrained output (Claude tool use,
+OpenAI json_schema, Gemini response_schema) using response_schema(operation),
+then passes the model text through decode(), which:
+
+    json.loads  ->  repair (fences, prose, trailing commas, truncation)  ->  validate
+
+Repair salvages what the model already paid for — a reply cut off at
+max_tokens keeps every complete skill — instead of failing the call and
+costing the user another round trip. provider_json_repairs_total counts how
+often that worked. Validation coerces the result into the operation's model
+and returns a plain dict, so callers, caches and cassettes are unchanged;
+list items that cannot be coerced are dropped, not fatal.
+"""
+import json
+import re
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator, model_validator
+
+from metrics import Counter
+
+_repairs = Counter(
+    "provider_json_repairs_total",
+    "Unparseable provider replies by repair outcome; repaired = a re-call avoided",
+    ("provider", "operation", "outcome"),
+)
+
+
+class StructuredOutputError(ValueError):
+    """The reply could not be parsed or validated into the operation's schema."""
+
+
+def _whole(value):
+    # "3.5 years" of experience or a float year still make a usable integer.
+    return round(value) if isinstance(value, float) else value
+
+
+def _keep_valid(item_model: type[BaseModel], items: Any) -> list:
+    if not isinstance(items, list):
+        return []
+    kept = []
+    for item in items:
+        try:
+            kept.append(item_model.model_validate(item))
+        except ValidationError:
+            continue
+    return kept
+
+
+class _Result(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def _none_to_default(cls, value, info):
+        # Models write null for "unknown"; fall back to the field default where it has one.
+        field = cls.model_fields[info.field_name]
+        if value is None and not field.is_required() and field.default is not None:
+            return field.default
+        return value
+
+
+class ParsedJob(_Result):
+    is_job_offer: bool = True
+    title: str = ""
+    company: str = ""
+    location: str = ""
+    salary: str = ""
+    mode: str = ""
+    seniority: str = ""
+    contract: str = ""
+    stack: list[str] = []
+    description: str = ""
+
+    @field_validator("stack", mode="before")
+    @classmethod
+    def _stack(cls, value):
+        if not isinstance(value, list):
+            return []
+        return [str(s).strip() for s in value if isinstance(s, (str, int, float)) and str(s).strip()]
+
+    @model_validator(mode="after")
+    def _not_empty(self):
+        # Every field has a default, so {} or a truncated tool call would otherwise
+        # pass as a blank job offer instead of falling back like any failed parse.
+        if self.is_job_offer and not self.title.strip() and not self.description.strip():
+            raise ValueError("job offer without a title or description")
+        return self
+
+
+class ParsedSkill(_Result):
+    name: str
+    years: float = 0
+    last_used_year: int | None = None
+    recency: str = ""
+    ai_confidence: int = 3
+
+    @field_validator("name")
+    @classmethod
+    def _name(cls, value: str) -> str:
+        if not value.strip():
+            raise ValueError("empty skill name")
+        return value.strip()
+
+    @field_validator("last_used_year", "ai_confidence", mode="before")
+    @classmethod
+    def _integers(cls, value):
+        return _whole(value)
+
+    @field_validator("ai_confidence")
+    @classmethod
+    def _confidence(cls, value: int) -> int:
+        return min(max(value, 1), 5)
+
+
+class ParsedSkills(_Result):
+    skills: list[ParsedSkill] = []
+
+    @field_validator("skills", mode="before")
+    @classmethod
+    def _skills(cls, value):
+        return _keep_valid(ParsedSkill, value)
+
+
+class ParsedProfile(ParsedSkills):
+    years_experience: int = 0
+    current_role: str = ""
+    summary: str = ""
+
+    @field_validator("years_experience", mode="before")
+    @classmethod
+    def _years(cls, value):
+        return _whole(value)
+
+
+class GeneratedQuestion(_Result):
+    question: str
+    answer: str = ""
+    category: str = ""
+
+
+class GeneratedQuestions(_Result):
+    questions: list[GeneratedQuestion] = []
+
+    @field_validator("questions", mode="before")
+    @classmethod
+    def _questions(cls, value):
+        return _keep_valid(GeneratedQuestion, value)
+
+
+SCHEMAS: dict[str, type[BaseModel]] = {
+    "parse_job": ParsedJob,
+    "parse_cv": ParsedProfile,
+    "parse_work_history": ParsedProfile,
+    "refine_profile": ParsedSkills,
+    "generate_questions": GeneratedQuestions,
+}
+
+
+def _strict(schema: dict, defs: dict) -> dict:
+    """Inline $refs and make every object closed with all properties required —
+    the subset OpenAI strict mode, Anthropic tools and Gemini all accept."""
+    if "$ref" in schema:
+        return _strict(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    out = {k: v for k, v in schema.items() if k not in ("title", "default", "$defs")}
+    if "properties" in out:
+        out["properties"] = {name: _strict(prop, defs) for name, prop in out["properties"].items()}
+        out["required"] = list(out["properties"])
+        out["additionalProperties"] = False
+    if "items" in out:
+        out["items"] = _strict(out["items"], defs)
+    if "anyOf" in out:
+        out["anyOf"] = [_strict(option, defs) for option in out["anyOf"]]
+    return out
+
+
+_RESPONSE_SCHEMAS: dict[str, dict] = {}
+
+
+def response_schema(operation: str) -> dict:
+    schema = _RESPONSE_SCHEMAS.get(operation)
+    if schema is None:
+        raw = SCHEMAS[operation].model_json_schema()
+        schema = _RESPONSE_SCHEMAS[operation] = _strict(raw, raw.get("$defs", {}))
+    return schema
+
+
+# ---------------------------------------------------------------------------
+# Repair
+# ---------------------------------------------------------------------------
+
+_RE_FENCE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+_RE_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_CLOSERS = {"{": "}", "[": "]"}
+MAX_REPAIR_ATTEMPTS = 50
+
+
+def _truncation_candidates(text: str):
+    """Yield prefixes of `text` closed at points where a complete value ended, latest first."""
+    stack: list[str] = []
+    cuts: list[tuple[int, str]] = []  # (prefix length, closing brackets)
+    in_string = escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+                cuts.append((i + 1, "".join(_CLOSERS[c] for c in reversed(stack))))
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append(ch)
+            cuts.append((i + 1, "".join(_CLOSERS[c] for c in reversed(stack))))
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            cuts.append((i + 1, "".join(_CLOSERS[c] for c in reversed(stack))))
+        elif ch == ",":
+            cuts.append((i, "".join(_CLOSERS[c] for c in reversed(stack))))
+    for end, closers in reversed(cuts[-MAX_REPAIR_ATTEMPTS:]):
+        yield text[:end] + closers
+
+
+def repair_json(text: str) -> Any:
+    """Best-effort parse of almost-JSON model output. Raises StructuredOutputError."""
+    fenced = _RE_FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        raise StructuredOutputError("no JSON object in provider reply")
+    text = _RE_TRAILING_COMMA.sub(r"\1", text[start:].strip())
+
+    try:
+        # raw_decode stops at the end of the first value, ignoring trailing prose.
+        return json.JSONDecoder().raw_decode(text)[0]
+    except json.JSONDecodeError:
+        pass
+    for candidate in _truncation_candidates(text):
+        try:
+            return json.loads(_RE_TRAILING_COMMA.sub(r"\1", candidate))
+        except json.JSONDecodeError:
+            continue
+    raise StructuredOutputError("provider reply is not repairable JSON")
+
+
+def validate(operation: str, data: Any) -> dict:
+    if not isinstance(data, dict):
+        raise StructuredOutputError(f"{operation}: expected a JSON object, got {type(data).__name__}")
+    try:
+        return SCHEMAS[operation].model_validate(data).model_dump()
+    except ValidationError as err:
+        raise StructuredOutputError(f"{operation}: {err.error_count()} invalid field(s)") from err
+
+
+def decode(provider: str, operation: str, text: str) -> dict:
+    """Parse, repair if needed, and validate one provider reply."""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            data = repair_json(text)
+        except StructuredOutputError:
+            _repairs.labels(provider, operation, "failed").inc()
+            raise
+        _repairs.labels(provider, operation, "repaired").inc()
+    return validate(operation, data)
@@ -0,0 +1,133 @@
+"""
+Pooled HTTP transport for the provider SDK clients.
+
+Each SDK client (Anthropic, OpenAI, Groq, Gemini) is built on a pooled
+client from this module instead of its own default one:
+- the connection pool has explicit limits and a long keep-alive, so a burst
+  of requests reuses warm TLS connections instead of opening new ones;
+- HTTP/2 is used when the h2 package is installed, which lets concurrent
+  calls share one connection;
+- when the pool is full, callers queue for a free connection (pool timeout)
+  instead of piling up in a thread pool.
+
+Clients are created on first use and kept per client class. Some SDK
+releases ship their own httpx flavour, so pool and timeout objects are built
+with the module the client class comes from. Only one real provider runs at
+a time, so in practice there is one pool per process. The offline providers
+never open one. The API lifespan (and bulk_reparse.py) close them with
+aclose() on shutdown.
+
+Timeouts are per operation:
+- connect and read bound each HTTP attempt;
+- total bounds the whole call, SDK retries included.
+
+A call that runs out of time raises ProviderTimeout, which the endpoints
+treat like any other provider failure.
+"""
+import asyncio
+import os
+import sys
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from types import ModuleType
+
+import httpx
+
+MAX_CONNECTIONS = int(os.getenv("PROVIDER_MAX_CONNECTIONS") or 64)
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("PROVIDER_KEEPALIVE_CONNECTIONS") or 32)
+KEEPALIVE_SECONDS = float(os.getenv("PROVIDER_KEEPALIVE_SECONDS") or 120)
+POOL_TIMEOUT_SECONDS = float(os.getenv("PROVIDER_POOL_TIMEOUT_SECONDS") or 10)
+HTTP2 = (os.getenv("PROVIDER_HTTP2") or "1") != "0"
+
+
+@dataclass(frozen=True)
+class OperationTimeouts:
+    connect: float
+    read: float
+    total: float
+
+
+# Seconds. parse_job sits on the clip request path, so it gets the tightest
+# budget. CV parsing, refining and question generation write long outputs.
+TIMEOUTS: dict[str, OperationTimeouts] = {
+    "parse_job": OperationTimeouts(connect=5, read=30, total=45),
+    "parse_cv": OperationTimeouts(connect=5, read=60, total=90),
+    "parse_work_history": OperationTimeouts(connect=5, read=60, total=90),
+    "refine_profile": OperationTimeouts(connect=5, read=60, total=90),
+    "generate_questions": OperationTimeouts(connect=5, read=90, total=120),
+}
+# Client default (connect, read), used by requests outside TIMEOUTS: batch uploads,
+# status polls, result downloads.
+DEFAULT_TIMEOUT = (10.0, 120.0)
+
+
+class ProviderTimeout(TimeoutError):
+    """A provider call exceeded its connect, read or total timeout."""
+
+
+class PooledClient:
+    """A pooled client plus timeout objects, all in the client class's httpx flavour."""
+
+    def __init__(self, client_class: type):
+        base = next(c for c in client_class.__mro__ if c.__name__ == "AsyncClient")
+        self.http: ModuleType = sys.modules[base.__module__.partition(".")[0]]  # httpx, or a fork of it
+        options = {
+            "limits": self.http.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_SECONDS,
+            ),
+            "timeout": self._timeout(*DEFAULT_TIMEOUT),
+            "follow_redirects": True,
+        }
+        try:
+            self.client = client_class(http2=HTTP2, **options)
+        except ImportError:  # HTTP/2 needs the optional h2 package
+            self.client = client_class(http2=False, **options)
+
+    def _timeout(self, connect: float, read: float):
+        return self.http.Timeout(connect=connect, read=read, write=connect, pool=POOL_TIMEOUT_SECONDS)
+
+    def timeout(self, operation: str):
+        """Per-attempt timeout to pass to the SDK call."""
+        return self._timeout(TIMEOUTS[operation].connect, TIMEOUTS[operation].read)
+
+
+_pools: dict[type, PooledClient] = {}
+
+
+def pooled(client_class: type = httpx.AsyncClient) -> PooledClient:
+    """The process-wide pool for a client class, e.g. anthropic.DefaultAsyncHttpxClient."""
+    pool = _pools.get(client_class)
+    if pool is None:
+        pool = _pools[client_class] = PooledClient(client_class)
+    return pool
+
+
+async def aclose() -> None:
+    for pool in _pools.values():
+        await pool.client.aclose()
+    _pools.clear()
+
+
+def _is_transport_timeout(err: BaseException | None) -> bool:
+    # By name, so httpx forks' TimeoutException counts too.
+    return err is not None and any(c.__name__ == "TimeoutException" for c in type(err).__mro__)
+
+
+def _is_timeout(err: BaseException) -> bool:
+    # The SDKs raise their own APITimeoutError from the transport's timeout error.
+    return isinstance(err, TimeoutError) or _is_transport_timeout(err) or _is_transport_timeout(err.__cause__)
+
+
+@asynccontextmanager
+async def deadline(operation: str):
+    """Bound a whole provider call, retries included, by the operation's total timeout."""
+    total = TIMEOUTS[operation].total
+    try:
+        async with asyncio.timeout(total):
+            yield
+    except Exception as err:
+        if _is_timeout(err):
+            raise ProviderTimeout(f"{operation} timed out (total budget {total:g}s)") from err
+        raise
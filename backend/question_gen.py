@@ -0,0 +1,247 @@
+"""
+Background generation of interview questions for skills the bank does not cover.
+
+A periodic scan over the stacks of recently changed jobs finds (skill,
+difficulty) pairs with fewer than QUESTION_TARGET questions and queues them;
+get_interview also queues the gaps it runs into. A scan starts where the last
+complete one did (a short overlap covers transactions still open then), and
+every QUESTION_FULL_SCAN_SECONDS one covers all jobs again. Workers drain the
+bounded queue, ask the provider for the missing questions, drop any that
+duplicate a question already in the bank, and insert the rest. Requests never
+wait on this: a full queue drops the item and the scan keeps its starting
+point, so the next one picks it up again.
+
+No transaction stays open across the provider call. Every uvicorn worker runs
+its own generator and scans the same gaps, so before calling the provider a
+worker takes a session-level advisory lock per (skill, difficulty) with
+pg_try_advisory_lock on one dedicated connection per generator, and skips
+the gap when another worker holds it: each gap is paid for once. The write
+transaction still locks the gap and re-checks coverage, so a worker whose
+lock connection dropped mid-call cannot insert past the target either.
+
+    QUESTION_GEN_WORKERS=1   # 0 disables generation
+    QUESTION_TARGET=3        # questions wanted per skill and difficulty
+    QUESTION_QUEUE_SIZE=100
+    QUESTION_SCAN_SECONDS=600
+    QUESTION_FULL_SCAN_SECONDS=86400
+"""
+import asyncio
+import os
+import re
+import time
+from datetime import timedelta
+
+import asyncpg
+from sqlalchemy import func, text
+from sqlmodel import select
+
+from database import DATABASE_URL, AsyncSessionLocal
+from log import get_logger
+from metrics import Counter
+from models import Question
+from providers.base import BaseProvider
+
+DIFFICULTIES = ("easy", "medium", "hard")
+WORKERS = int(os.getenv("QUESTION_GEN_WORKERS") or 1)
+TARGET_PER_DIFFICULTY = int(os.getenv("QUESTION_TARGET") or 3)
+QUEUE_SIZE = int(os.getenv("QUESTION_QUEUE_SIZE") or 100)
+SCAN_SECONDS = float(os.getenv("QUESTION_SCAN_SECONDS") or 600)
+FULL_SCAN_SECONDS = float(os.getenv("QUESTION_FULL_SCAN_SECONDS") or 24 * 60 * 60)
+SCAN_OVERLAP = timedelta(minutes=5)  # jobs.updated_at is its transaction's start time
+SCAN_LIMIT = 50  # most-demanded gaps queued per scan
+FIRST_SCAN_DELAY = 30
+
+log = get_logger("question_gen")
+
+_outcomes = Counter("question_generation_total", "Background question generation outcomes", ("outcome",))
+_inserted = _outcomes.labels("inserted")
+_duplicate = _outcomes.labels("duplicate")
+_failed = _outcomes.labels("failed")
+_dropped = _outcomes.labels("dropped")
+_locked = _outcomes.labels("locked")  # another worker is generating the gap
+
+# Stack skills of jobs changed since :since (NULL: all jobs) whose question count
+# for a difficulty is below target, most common skills first.
+_GAPS_SQL = text("""
+    WITH skills AS (
+        SELECT lower(s.skill) AS key, min(s.skill) AS skill, count(*) AS jobs
+        FROM jobs
+        CROSS JOIN LATERAL jsonb_array_elements_text(
+            CASE WHEN jsonb_typeof(jobs.stack) = 'array' THEN jobs.stack ELSE '[]'::jsonb END
+        ) AS s(skill)
+        WHERE (CAST(:since AS timestamptz) IS NULL OR jobs.updated_at >= CAST(:since AS timestamptz))
+          AND btrim(s.skill) <> ''
+        GROUP BY lower(s.skill)
+    ),
+    difficulties AS (
+        SELECT unnest(CAST(:difficulties AS varchar[])) AS difficulty
+    )
+    SELECT skills.skill, d.difficulty
+    FROM skills
+    CROSS JOIN difficulties d
+    LEFT JOIN questions q ON lower(q.skill) = skills.key AND q.difficulty = d.difficulty
+    GROUP BY skills.key, skills.skill, skills.jobs, d.difficulty
+    HAVING count(q.id) < :target
+    ORDER BY skills.jobs DESC, skills.key, d.difficulty
+    LIMIT :limit
+""")
+
+_RE_NON_WORD = re.compile(r"[\W_]+")
+
+
+def _normalize(question: str) -> str:
+    return _RE_NON_WORD.sub(" ", question.lower()).strip()
+
+
+class QuestionGenerator:
+    def __init__(self):
+        self.queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.pending: set[tuple[str, str]] = set()  # queued or in progress, by (lower skill, difficulty)
+        self.provider: BaseProvider | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._since = None  # where the next incremental scan starts (database time)
+        self._last_full_scan = float("-inf")
+        # Holds the per-gap session locks; shared by this generator's workers, whose
+        # gaps never overlap (see pending), so one statement at a time is enough.
+        self._lock_conn: asyncpg.Connection | None = None
+        self._lock_conn_lock = asyncio.Lock()
+
+    async def start(self, provider: BaseProvider) -> None:
+        if WORKERS <= 0:
+            return
+        self.provider = provider
+        self._tasks = [asyncio.create_task(self._scan_loop())]
+        self._tasks += [asyncio.create_task(self._worker()) for _ in range(WORKERS)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._lock_conn and not self._lock_conn.is_closed():
+            await self._lock_conn.close()
+        self._lock_conn = None
+
+    def request(self, skill: str, difficulty: str) -> bool:
+        """Queue a (skill, difficulty) gap without waiting. False if dropped or already pending."""
+        if not self._tasks:
+            return False
+        key = (skill.lower(), difficulty)
+        if key in self.pending:
+            return False
+        try:
+            self.queue.put_nowait((skill, difficulty))
+        except asyncio.QueueFull:
+            _dropped.inc()
+            return False
+        self.pending.add(key)
+        return True
+
+    async def scan(self) -> int:
+        full = self._since is None or time.monotonic() - self._last_full_scan >= FULL_SCAN_SECONDS
+        async with AsyncSessionLocal() as session:
+            started = (await session.exec(text("SELECT now()"))).scalar_one()
+            result = await session.exec(_GAPS_SQL, params={
+                "difficulties": list(DIFFICULTIES), "target": TARGET_PER_DIFFICULTY, "limit": SCAN_LIMIT,
+                "since": None if full else self._since,
+            })
+            gaps = result.all()
+        queued = sum(self.request(skill, difficulty) for skill, difficulty in gaps)
+        # Move the starting point only when every gap found is queued or in progress;
+        # otherwise the next scan has to see the same jobs again.
+        if len(gaps) < SCAN_LIMIT and all((skill.lower(), d) in self.pending for skill, d in gaps):
+            self._since = started - SCAN_OVERLAP
+            if full:
+                self._last_full_scan = time.monotonic()
+        if gaps:
+            log.info("scan", gaps=len(gaps), queued=queued, full=full)
+        return queued
+
+    async def _scan_loop(self) -> None:
+        await asyncio.sleep(min(FIRST_SCAN_DELAY, SCAN_SECONDS))
+        while True:
+            try:
+                await self.scan()
+            except Exception as err:
+                log.warning("scan_failed", error=str(err))
+            await asyncio.sleep(SCAN_SECONDS)
+
+    async def _worker(self) -> None:
+        while True:
+            skill, difficulty = await self.queue.get()
+            try:
+                await self.fill(skill, difficulty)
+            except Exception as err:
+                _failed.inc()
+                log.warning("generate_failed", skill=skill, difficulty=difficulty, error=str(err))
+            finally:
+                self.pending.discard((skill.lower(), difficulty))
+                self.queue.task_done()
+
+    @staticmethod
+    async def _coverage(session, skill: str, difficulty: str) -> tuple[int, set[str]]:
+        """Questions still missing for (skill, difficulty), and the skill's normalized questions."""
+        result = await session.exec(select(Question).where(func.lower(Question.skill) == skill.lower()))
+        existing = list(result.all())
+        missing = TARGET_PER_DIFFICULTY - sum(q.difficulty == difficulty for q in existing)
+        return missing, {_normalize(q.question) for q in existing}
+
+    async def _gap_lock(self, sql: str, key: str):
+        async with self._lock_conn_lock:
+            if self._lock_conn is None or self._lock_conn.is_closed():
+                self._lock_conn = await asyncpg.connect(DATABASE_URL.replace("+asyncpg", ""))
+            return await self._lock_conn.fetchval(sql, key)
+
+    async def fill(self, skill: str, difficulty: str) -> int:
+        """Top up one (skill, difficulty) to the target. Returns the number of questions inserted."""
+        key = f"questions:{skill.lower()}:{difficulty}"
+        if not await self._gap_lock("SELECT pg_try_advisory_lock(hashtext($1))", key):
+            _locked.inc()
+            return 0
+        try:
+            return await self._fill(skill, difficulty, key)
+        finally:
+            try:
+                await self._gap_lock("SELECT pg_advisory_unlock(hashtext($1))", key)
+            except Exception as err:  # a closed connection has released its locks already
+                log.warning("unlock_failed", skill=skill, difficulty=difficulty, error=str(err))
+
+    async def _fill(self, skill: str, difficulty: str, gap_key: str) -> int:
+        async with AsyncSessionLocal() as session:
+            missing, _ = await self._coverage(session, skill, difficulty)
+        if missing <= 0:
+            return 0
+
+        # No pooled connection is held while the provider runs.
+        generated = await self.provider.generate_questions(skill, difficulty, missing)
+
+        async with AsyncSessionLocal() as session:
+            # Serialize writers for this gap and re-check: another worker may have
+            # filled it while the provider was running.
+            # A key of its own: the gap lock is held on another connection.
+            write_lock = text("SELECT pg_advisory_xact_lock(hashtext(:key))")
+            await session.exec(write_lock, params={"key": f"{gap_key}:write"})
+            missing, seen = await self._coverage(session, skill, difficulty)
+            added = 0
+            for item in generated.get("questions", [])[:max(missing, 0)]:
+                question = str(item.get("question") or "").strip()
+                key = _normalize(question)
+                if not key or key in seen:
+                    _duplicate.inc()
+                    continue
+                seen.add(key)
+                session.add(Question(
+                    skill=skill,
+                    question=question[:1000],
+                    answer=str(item.get("answer") or "").strip()[:4000],
+                    category=str(item.get("category") or "").strip()[:50],
+                    difficulty=difficulty,
+                ))
+                added += 1
+            await session.commit()
+        _inserted.inc(added)
+        log.info("generated", skill=skill, difficulty=difficulty, inserted=added)
+        return added
+
+
+generator = QuestionGenerator()
@@ -0,0 +1,105 @@
+"""
+Weighted job ranking against a resume profile.
+
+A resume becomes a weighted skill vector over a vocabulary of lower-cased
+skill names; index 0 is reserved for "not in the profile" and always weighs 0.
+A set of jobs becomes a sparse indicator matrix in coordinate form (one row
+per job, one column index per stack item), so scoring every job is a single
+gather plus a segmented sum, whatever the number of jobs.
+
+A skill's weight (0–1] combines the user's rating (or the parser's
+ai_confidence), years of experience and recency. A job's fit is the mean
+weight of its stack items, as a percentage.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from resume_skills import _number
+
+RECENCY_FACTOR = {"current": 1.0, "1-2 years ago": 0.8, "3+ years ago": 0.55}
+UNKNOWN_RECENCY = 0.75
+YEARS_SATURATION = 5  # experience beyond this many years adds nothing
+
+
+def skill_weight(skill: dict) -> float:
+    # Older JSONB copies can hold numeric strings ("4"); parse them as the rows do.
+    rating = _number(skill.get("user_rating")) or _number(skill.get("ai_confidence")) or 3
+    rating = min(max(rating, 1), 5) / 5
+    years = min(max(_number(skill.get("years")) or 0, 0), YEARS_SATURATION) / YEARS_SATURATION
+    recency = RECENCY_FACTOR.get(skill.get("recency") or "", UNKNOWN_RECENCY)
+    # Rating dominates; a highly rated skill with no recorded years still counts.
+    return rating * (0.6 + 0.4 * years) * recency
+
+
+def _name_key(name: str | None) -> str:
+    # Older resumes can hold skills without a name; they match nothing.
+    return (name or "").strip().lower()
+
+
+def build_vocabulary(*skill_lists: list[dict]) -> dict[str, int]:
+    vocab: dict[str, int] = {}
+    for skills in skill_lists:
+        for s in skills:
+            key = _name_key(s.get("name"))
+            if key:
+                vocab.setdefault(key, len(vocab) + 1)
+    return vocab
+
+
+def skill_vector(skills: list[dict], vocab: dict[str, int]) -> np.ndarray:
+    vector = np.zeros(len(vocab) + 1, dtype=np.float32)
+    for s in skills:
+        index = vocab.get(_name_key(s.get("name")))
+        if index:
+            vector[index] = max(vector[index], skill_weight(s))
+    return vector
+
+
+@dataclass
+class StackMatrix:
+    """Sparse jobs × vocabulary indicator matrix; rows are stored contiguously."""
+    cols: np.ndarray     # vocabulary index per stack item, 0 when unknown
+    offsets: np.ndarray  # row i spans cols[offsets[i]:offsets[i + 1]]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+
+def stack_matrix(stacks: list[list[str]], vocab: dict[str, int]) -> StackMatrix:
+    lengths = np.fromiter((len(stack) for stack in stacks), dtype=np.int64, count=len(stacks))
+    offsets = np.zeros(len(stacks) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    cols = np.fromiter(
+        (vocab.get(_name_key(t), 0) for stack in stacks for t in stack),
+        dtype=np.int64, count=int(offsets[-1]),
+    )
+    return StackMatrix(cols, offsets)
+
+
+def fit_scores(matrix: StackMatrix, vectors: np.ndarray) -> np.ndarray:
+    """Mean skill weight per job, 0–100; NaN for jobs without a stack.
+
+    `vectors` is one skill vector (V+1,) or several stacked as columns
+    (V+1, R), giving scores of shape (jobs,) or (jobs, R).
+    """
+    gathered = vectors[matrix.cols]
+    # Segmented row sums via a prefix sum; empty rows come out as 0.
+    prefix = np.zeros((len(gathered) + 1, *gathered.shape[1:]), dtype=np.float64)
+    np.cumsum(gathered, axis=0, out=prefix[1:])
+    sums = prefix[matrix.offsets[1:]] - prefix[matrix.offsets[:-1]]
+    lengths = matrix.lengths.astype(np.float64)
+    if sums.ndim == 2:
+        lengths = lengths[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / lengths * 100
+
+
+def match_matrix(stacks: list[list[str]], skill_lists: list[list[dict]]) -> np.ndarray:
+    """Fit of every job against every resume: shape (jobs, resumes), NaN for empty stacks."""
+    vocab = build_vocabulary(*skill_lists)
+    vectors = np.zeros((len(vocab) + 1, len(skill_lists)), dtype=np.float32)
+    for r, skills in enumerate(skill_lists):
+        vectors[:, r] = skill_vector(skills, vocab)
+    return fit_scores(stack_matrix(stacks, vocab), vectors)
@@ -0,0 +1,138 @@
+"""
+Fast JSON responses and negotiated response compression.
+
+FastJSONResponse renders with orjson and is the app's default response class.
+Plain returns still pass through FastAPI's jsonable_encoder first, so the
+large job listings, whose payloads are JSON-native already, return it
+directly and skip that pass.
+
+CompressionMiddleware compresses bodies above COMPRESS_MIN_BYTES with brotli
+or gzip, whichever the client prefers in Accept-Encoding (brotli wins ties).
+Event streams and already-encoded bodies pass through untouched.
+"""
+import os
+import zlib
+
+import anyio.to_thread
+import brotli
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES") or 1024)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # levels above ~5 cost far more CPU than they save on JSON
+THREAD_MIN_BYTES = 256 * 1024  # compress bigger bodies off the event loop
+
+_SKIP_CONTENT_TYPES = ("text/event-stream", "image/", "application/gzip", "application/zip")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _parse_accept_encoding(value: str) -> dict[str, float]:
+    codings = {}
+    for part in value.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            codings[name.strip().lower()] = q
+    return codings
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    codings = _parse_accept_encoding(accept_encoding)
+    wildcard = codings.get("*", 0.0)
+    br = codings.get("br", wildcard)
+    gzip = codings.get("gzip", wildcard)
+    if br <= 0 and gzip <= 0:
+        return None
+    return "br" if br >= gzip else "gzip"
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.brotli = encoding == "br"
+        if self.brotli:
+            self._obj = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            # wbits 16+ writes a gzip header and trailer instead of a raw zlib stream.
+            self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.brotli:
+            return self._obj.process(data) + (self._obj.finish() if final else self._obj.flush())
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor: _Compressor | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = (
+                    "content-encoding" in headers
+                    or content_type.startswith(_SKIP_CONTENT_TYPES)
+                )
+                if passthrough:
+                    await send(start)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    # Small, complete body: not worth the header overhead.
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                headers = MutableHeaders(raw=start["headers"])
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["content-length"]
+                if not more_body and len(body) >= THREAD_MIN_BYTES:
+                    body = await anyio.to_thread.run_sync(compressor.compress, body, True)
+                else:
+                    body = compressor.compress(body, not more_body)
+                if not more_body:
+                    headers["content-length"] = str(len(body))
+                await send(start)
+            else:
+                body = compressor.compress(body, not more_body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,149 @@
+"""
+Resume skills: the resume_skills table is the source of truth, Resume.skills
+(JSONB) a derived copy in the same order for whole-profile reads.
+
+Whole-list writes (new resume, refine) go through replace_skills; a single
+skill edit is one UPDATE of its row plus an in-place jsonb_set of the cached
+element at the row's position.
+"""
+import json
+import math
+
+from sqlalchemy import delete, insert, text
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import Resume, ResumeSkill
+
+
+def canonical_skill_name(name: str) -> str:
+    return " ".join(name.split()).lower()
+
+
+def _number(value, cast=float):
+    """A numeric skill field, or None. Numeric strings ("3", "2.5") are parsed; whole
+    numbers come back as int, so the JSONB copy keeps 3 rather than 3.0."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        try:
+            value = float(value.strip())
+        except ValueError:
+            return None
+    if not isinstance(value, (int, float)) or not math.isfinite(value):
+        return None
+    return int(value) if cast is int or float(value).is_integer() else float(value)
+
+
+def _normalized(skill: dict) -> dict:
+    # The same values go to the row and the JSONB copy, so the two never disagree.
+    return {
+        **skill,
+        "years": _number(skill.get("years")),
+        "last_used_year": _number(skill.get("last_used_year"), int),
+        "ai_confidence": _number(skill.get("ai_confidence"), int),
+        "user_rating": _number(skill.get("user_rating"), int),
+    }
+
+
+async def replace_skills(session: AsyncSession, resume: Resume, skills: list[dict]) -> None:
+    """Rewrite a resume's skill rows and JSONB copy. The resume must already have an id."""
+    unique: dict[str, dict] = {}
+    for s in skills:
+        canonical = canonical_skill_name(s.get("name") or "")
+        if canonical:
+            unique.setdefault(canonical, _normalized(s))
+
+    await session.exec(delete(ResumeSkill).where(ResumeSkill.resume_id == resume.id))
+    if unique:
+        await session.exec(insert(ResumeSkill), params=[
+            {
+                "resume_id": resume.id,
+                "canonical_name": canonical,
+                "position": position,
+                "name": s["name"],
+                "years": s["years"],
+                "last_used_year": s["last_used_year"],
+                "recency": s.get("recency") or "",
+                "ai_confidence": s["ai_confidence"],
+                "user_rating": s["user_rating"],
+                "note": s.get("note") or "",
+            }
+            for position, (canonical, s) in enumerate(unique.items())
+        ])
+    resume.skills = list(unique.values())  # full reassignment for JSONB change tracking
+
+
+_UPDATE_SKILL_SQL = text("""
+    UPDATE resume_skills
+    SET user_rating = coalesce(:user_rating, user_rating), note = coalesce(:note, note)
+    WHERE resume_id = :resume_id AND canonical_name = :canonical_name
+    RETURNING position
+""")
+
+# Only when the copy has an element at that position: past its end, skills -> position
+# is NULL and jsonb_set would turn the whole column NULL.
+_PATCH_CACHED_SKILL_SQL = text("""
+    UPDATE resumes
+    SET skills = jsonb_set(skills, CAST(:path AS text[]), (skills -> CAST(:position AS integer)) || CAST(:changes AS jsonb))
+    WHERE id = :resume_id AND jsonb_typeof(skills) = 'array' AND jsonb_array_length(skills) > :position
+    RETURNING skills -> CAST(:position AS integer)
+""")
+
+
+async def _rebuild_cached_skills(session: AsyncSession, resume_id: int) -> list[dict]:
+    """Rewrite Resume.skills from the rows, for a JSONB copy that fell out of step with them."""
+    rows = await session.exec(
+        select(ResumeSkill).where(ResumeSkill.resume_id == resume_id).order_by(ResumeSkill.position)
+        .execution_options(populate_existing=True)
+    )
+    skills = [
+        {
+            "name": row.name, "years": _number(row.years), "last_used_year": row.last_used_year,
+            "recency": row.recency, "ai_confidence": row.ai_confidence,
+            "user_rating": row.user_rating, "note": row.note,
+        }
+        for row in rows.all()
+    ]
+    resume = await session.get(Resume, resume_id)
+    resume.skills = skills
+    session.add(resume)
+    return skills
+
+
+async def update_skill(
+    session: AsyncSession,
+    resume_id: int,
+    skill_name: str,
+    user_rating: int | None = None,
+    note: str | None = None,
+) -> dict | None:
+    """Patch one skill's rating and/or note. Returns the updated skill, or None if the resume lacks it."""
+    params = {
+        "resume_id": resume_id, "canonical_name": canonical_skill_name(skill_name),
+        "user_rating": user_rating, "note": note,
+    }
+    position = (await session.exec(_UPDATE_SKILL_SQL, params=params)).scalar_one_or_none()
+    if position is None:
+        # Resumes stored before the table existed, or written without it, have
+        # only the JSONB copy: materialize their rows once and retry.
+        has_rows = await session.exec(select(ResumeSkill.id).where(ResumeSkill.resume_id == resume_id).limit(1))
+        if has_rows.first() is not None:
+            return None
+        resume = await session.get(Resume, resume_id)
+        await replace_skills(session, resume, resume.skills or [])
+        await session.flush()
+        position = (await session.exec(_UPDATE_SKILL_SQL, params=params)).scalar_one_or_none()
+        if position is None:
+            return None
+
+    changes = {k: v for k, v in (("user_rating", user_rating), ("note", note)) if v is not None}
+    result = await session.exec(_PATCH_CACHED_SKILL_SQL, params={
+        "resume_id": resume_id, "position": position, "path": [str(position)], "changes": json.dumps(changes),
+    })
+    patched = result.scalar_one_or_none()
+    if patched is None:
+        # The copy is shorter than the rows say (or not a list): rebuild it from them.
+        skills = await _rebuild_cached_skills(session, resume_id)
+        return next((s for s in skills if canonical_skill_name(s["name"]) == params["canonical_name"]), None)
+    return patched
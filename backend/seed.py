@@ -1,13 +1,15 @@
 """
 Seed the question bank from backend/seeds/questions.json.
 
-Runs automatically on startup (called from main.py lifespan).
+Runs in the background after startup (main.py lifespan); replicas starting
+together take an advisory lock, so only one of them inserts.
 Can also be run standalone: python seed.py
 """
 import asyncio
 import json
 from pathlib import Path
 
+from sqlalchemy import text
 from sqlmodel import select
 
 from database import AsyncSessionLocal
@@ -22,6 +24,7 @@ async def seed_questions() -> None:
         return
 
     async with AsyncSessionLocal() as session:
+        await session.exec(text("SELECT pg_advisory_xact_lock(hashtext('hiretree.seed'))"))
         result = await session.exec(select(Question))
         if result.first() is not None:
             return  # Already seeded
@@ -0,0 +1,170 @@
+"""
+"Similar jobs" over TF-IDF term vectors, stored in Postgres.
+
+Each job is indexed once, when it is clipped or reparsed: its title,
+description and stack become a sparse vector of sublinear term frequencies,
+L2-normalized at index time and written to job_terms (the postings list,
+keyed by user and term). job_terms_indexed records which jobs have been
+indexed, since a job with no usable terms has no postings to show for it.
+Per-user document frequencies in job_term_df are kept up to date by
+triggers, so IDF is always current without rescanning.
+
+Scoring a job is a sparse matrix–vector product done by the database: the
+query job's terms, weighted by idf², are joined against the postings of the
+same terms and summed per candidate job. As in Lucene's classic similarity,
+document norms ignore IDF, so adding jobs never invalidates stored weights.
+"""
+import math
+import re
+from collections import Counter
+
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import Job
+
+# Title words count double and each stack item is a single high-weight term.
+TITLE_BOOST = 2.0
+STACK_BOOST = 3.0
+MAX_TERMS = 200  # per job; the long tail of a description adds little
+
+_RE_WORD = re.compile(r"[\w+#]+(?:\.[\w+#]+)*")
+_STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in is it of on or our the to we will with you your
+    i w z na do dla oraz jest się są od po przy jak nie to ten ta te że lub
+""".split())
+
+
+def _words(value: str) -> list[str]:
+    return [
+        w for w in _RE_WORD.findall(value.lower())
+        if len(w) > 1 and w not in _STOPWORDS and not w.isdigit()
+    ]
+
+
+def job_terms(title: str, description: str, stack: list[str]) -> dict[str, float]:
+    """Normalized term weights for one job."""
+    counts: Counter[str] = Counter(_words(description))
+    weights = {term: 1 + math.log(n) for term, n in counts.items()}
+    for term, n in Counter(_words(title)).items():
+        weights[term] = weights.get(term, 0) + TITLE_BOOST * (1 + math.log(n))
+    for item in {s.strip().lower() for s in stack or [] if s.strip()}:
+        weights[f"stack:{item}"] = STACK_BOOST
+
+    top = sorted(weights.items(), key=lambda kv: -kv[1])[:MAX_TERMS]
+    norm = math.sqrt(sum(w * w for _, w in top)) or 1.0
+    return {term: w / norm for term, w in top}
+
+
+# One statement for any number of postings (executemany would be a round trip per row).
+# ON CONFLICT: a concurrent request may be backfilling the same jobs.
+_INSERT_POSTINGS_SQL = text("""
+    INSERT INTO job_terms (job_id, user_id, term, weight)
+    SELECT * FROM unnest(
+        CAST(:job_ids AS integer[]), CAST(:user_ids AS varchar[]),
+        CAST(:terms AS varchar[]), CAST(:weights AS real[])
+    )
+    ON CONFLICT DO NOTHING
+""")
+
+
+async def _insert_postings(session: AsyncSession, user_id: str, terms_by_job: dict[int, dict[str, float]]) -> None:
+    job_ids, terms, weights = [], [], []
+    for job_id, vector in terms_by_job.items():
+        for term, weight in vector.items():
+            job_ids.append(job_id)
+            terms.append(term)
+            weights.append(weight)
+    if job_ids:
+        await session.exec(_INSERT_POSTINGS_SQL, params={
+            "job_ids": job_ids, "user_ids": [user_id] * len(job_ids), "terms": terms, "weights": weights,
+        })
+
+
+_MARK_INDEXED_SQL = text("""
+    INSERT INTO job_terms_indexed (job_id)
+    SELECT * FROM unnest(CAST(:job_ids AS integer[]))
+    ON CONFLICT (job_id) DO UPDATE SET indexed_at = now()
+""")
+
+
+async def _mark_indexed(session: AsyncSession, job_ids: list[int]) -> None:
+    if job_ids:
+        await session.exec(_MARK_INDEXED_SQL, params={"job_ids": job_ids})
+
+
+async def index_job(session: AsyncSession, job: Job) -> None:
+    """Replace a job's postings; runs inside the caller's transaction."""
+    await session.exec(text("DELETE FROM job_terms WHERE job_id = :job_id"), params={"job_id": job.id})
+    await _insert_postings(session, job.user_id, {job.id: job_terms(job.title, job.description, job.stack or [])})
+    await _mark_indexed(session, [job.id])
+
+
+async def reindex_jobs(session: AsyncSession, rows: list[dict]) -> None:
+    """index_job for many jobs (of any users) in two statements; rows need id, user_id, title, description, stack."""
+    if not rows:
+        return
+    await session.exec(
+        text("DELETE FROM job_terms WHERE job_id = ANY(CAST(:job_ids AS integer[]))"),
+        params={"job_ids": [row["id"] for row in rows]},
+    )
+    job_ids, user_ids, terms, weights = [], [], [], []
+    for row in rows:
+        for term, weight in job_terms(row["title"], row["description"], row["stack"] or []).items():
+            job_ids.append(row["id"])
+            user_ids.append(row["user_id"])
+            terms.append(term)
+            weights.append(weight)
+    if job_ids:
+        await session.exec(_INSERT_POSTINGS_SQL, params={
+            "job_ids": job_ids, "user_ids": user_ids, "terms": terms, "weights": weights,
+        })
+    await _mark_indexed(session, [row["id"] for row in rows])
+
+
+async def index_missing(session: AsyncSession, user_id: str) -> int:
+    """Index a user's jobs that were never indexed (clipped before the index existed)."""
+    result = await session.exec(text("""
+        SELECT id, title, description, stack FROM jobs j
+        WHERE j.user_id = :user_id
+          AND NOT EXISTS (SELECT 1 FROM job_terms_indexed i WHERE i.job_id = j.id)
+    """), params={"user_id": user_id})
+    rows = result.mappings().all()
+    await _insert_postings(session, user_id, {
+        row["id"]: job_terms(row["title"], row["description"], row["stack"] or []) for row in rows
+    })
+    await _mark_indexed(session, [row["id"] for row in rows])
+    return len(rows)
+
+
+_SIMILAR_SQL = text("""
+    WITH n AS (
+        SELECT count(*)::float8 AS docs FROM jobs WHERE user_id = :user_id
+    ),
+    q AS (
+        SELECT t.term, t.weight, t.weight * power(ln(1 + n.docs / d.df), 2) AS w
+        FROM job_terms t
+        JOIN job_term_df d ON d.user_id = t.user_id AND d.term = t.term
+        CROSS JOIN n
+        WHERE t.job_id = :job_id AND d.df > 0
+    ),
+    scores AS (
+        SELECT p.job_id, sum(q.w * p.weight) AS score
+        FROM q
+        JOIN job_terms p ON p.user_id = :user_id AND p.term = q.term
+        WHERE p.job_id <> :job_id
+        GROUP BY p.job_id
+        ORDER BY score DESC
+        LIMIT :k
+    )
+    -- Relative to the job's similarity with itself, so 1.0 means "as close as it gets".
+    SELECT j.id, j.title, j.company, j.status, j.stack,
+           s.score / NULLIF((SELECT sum(q.w * q.weight) FROM q), 0) AS score
+    FROM scores s JOIN jobs j ON j.id = s.job_id
+    ORDER BY s.score DESC, j.id DESC
+""")
+
+
+async def similar_jobs(session: AsyncSession, user_id: str, job_id: int, k: int) -> list[dict]:
+    result = await session.exec(_SIMILAR_SQL, params={"user_id": user_id, "job_id": job_id, "k": k})
+    return [dict(row) for row in result.mappings().all()]
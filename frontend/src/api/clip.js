@@ -10,15 +10,62 @@ async function handleResponse(res) {
   return res.json()
 }
 
-export async function clipJob({ url, raw_text }) {
+// Pass the same key when retrying one user action (e.g. crypto.randomUUID() per click);
+// the server then returns the first result instead of calling the AI provider again.
+const idempotency = key => (key ? { 'Idempotency-Key': key } : {})
+
+export async function clipJob({ url, raw_text }, idempotencyKey) {
   return handleResponse(await fetch(`${API_URL}/api/clip`, {
-    method: 'POST', ...JSON_CREDS,
+    method: 'POST', ...CREDS,
+    headers: { ...JSON_CREDS.headers, ...idempotency(idempotencyKey) },
     body: JSON.stringify({ url, raw_text }),
   }))
 }
 
-export async function fetchJobs() {
-  return handleResponse(await fetch(`${API_URL}/api/jobs`, CREDS))
+// filters: { status, seniority, mode, contract, stack } — each a string or an array
+function filterParams(filters = {}) {
+  const params = new URLSearchParams()
+  for (const [key, value] of Object.entries(filters)) {
+    for (const v of [].concat(value ?? [])) params.append(key, v)
+  }
+  return params.toString()
+}
+
+export async function fetchJobs(filters) {
+  const qs = filterParams(filters)
+  return handleResponse(await fetch(`${API_URL}/api/jobs${qs ? `?${qs}` : ''}`, CREDS))
+}
+
+// Jobs ordered by weighted fit against the active resume: { total, items }.
+export async function fetchRankedJobs(filters, { limit = 50, offset = 0 } = {}) {
+  const qs = filterParams({ ...filters, limit, offset })
+  return handleResponse(await fetch(`${API_URL}/api/jobs/ranked?${qs}`, CREDS))
+}
+
+// Fit of every job against every resume: { resumes: [{ id, wins }], jobs: [{ id, scores, best_resume_id }] }.
+export async function fetchResumeMatrix() {
+  return handleResponse(await fetch(`${API_URL}/api/jobs/resume-matrix`, CREDS))
+}
+
+export async function fetchSimilarJobs(jobId, k = 10) {
+  return handleResponse(await fetch(`${API_URL}/api/jobs/${jobId}/similar?k=${k}`, CREDS))
+}
+
+// Delta sync: pass the cursor from the previous response; when reset is true,
+// `changed` is the full list and the local cache should be replaced.
+export async function fetchJobChanges(since) {
+  const qs = since ? `?${new URLSearchParams({ since })}` : ''
+  return handleResponse(await fetch(`${API_URL}/api/jobs/changes${qs}`, CREDS))
+}
+
+export async function fetchJobFacets(filters) {
+  const qs = filterParams(filters)
+  return handleResponse(await fetch(`${API_URL}/api/jobs/facets${qs ? `?${qs}` : ''}`, CREDS))
+}
+
+export async function searchJobs(q, { limit = 20, offset = 0 } = {}) {
+  const params = new URLSearchParams({ q, limit, offset })
+  return handleResponse(await fetch(`${API_URL}/api/jobs/search?${params}`, CREDS))
 }
 
 export async function fetchJob(id) {
@@ -39,9 +86,28 @@ export async function patchJob(id, patch) {
   }))
 }
 
-export async function reparseJob(id) {
-  return handleResponse(await fetch(`${API_URL}/api/jobs/${id}/reparse`, {
+// One round trip for many cards: { status } / { apply_url } changes, or { delete: true }
+export async function bulkUpdateJobs(ids, change) {
+  return handleResponse(await fetch(`${API_URL}/api/jobs/bulk`, {
     method: 'POST', ...JSON_CREDS,
+    body: JSON.stringify({ ids, ...change }),
+  }))
+}
+
+// Per-user change stream: job.created / job.parsed ({ id }), job.updated ({ ids, ...fields }),
+// job.deleted ({ ids }) and resync ({}). Returns the EventSource — call .close() to stop.
+export function subscribeJobEvents(handlers) {
+  const source = new EventSource(`${API_URL}/api/events`, { withCredentials: true })
+  for (const [type, handler] of Object.entries(handlers)) {
+    source.addEventListener(type, e => handler(JSON.parse(e.data)))
+  }
+  return source
+}
+
+export async function reparseJob(id, idempotencyKey) {
+  return handleResponse(await fetch(`${API_URL}/api/jobs/${id}/reparse`, {
+    method: 'POST', ...CREDS,
+    headers: { ...JSON_CREDS.headers, ...idempotency(idempotencyKey) },
   }))
 }
 
@@ -85,11 +151,13 @@ export async function fetchResumes() {
   return handleResponse(await fetch(`${API_URL}/api/resumes`, CREDS))
 }
 
-export async function createResumeFromCV(file, name) {
+export async function createResumeFromCV(file, name, idempotencyKey) {
   const formData = new FormData()
   formData.append('file', file)
   formData.append('name', name)
-  return handleResponse(await fetch(`${API_URL}/api/resumes`, { method: 'POST', ...CREDS, body: formData }))
+  return handleResponse(await fetch(`${API_URL}/api/resumes`, {
+    method: 'POST', ...CREDS, headers: idempotency(idempotencyKey), body: formData,
+  }))
 }
 
 export async function createResumeManual(name, entries) {
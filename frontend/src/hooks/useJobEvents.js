@@ -0,0 +1,35 @@
+import { useEffect } from 'react'
+import { fetchJob, fetchJobs, subscribeJobEvents } from '../api/clip'
+
+// Keeps a job list in sync with the backend event stream: applies status changes
+// and deletes in place and fetches only the affected job on create/reparse.
+// Falls back to a full refetch on 'resync', and on the extension's
+// 'hiretree:job-clipped' event while the stream is not connected (e.g. mock API).
+export function useJobEvents(setJobs) {
+  useEffect(() => {
+    const refetch = () => fetchJobs().then(setJobs).catch(() => {})
+    const upsert = ({ id }) => fetchJob(id)
+      .then(job => setJobs(prev => (
+        prev.some(j => j.id === job.id)
+          ? prev.map(j => j.id === job.id ? job : j)
+          : [...prev, job]
+      )))
+      .catch(() => {})
+
+    const source = subscribeJobEvents({
+      'job.created': upsert,
+      'job.parsed': upsert,
+      'job.updated': ({ ids, ...fields }) =>
+        setJobs(prev => prev.map(j => ids.includes(j.id) ? { ...j, ...fields } : j)),
+      'job.deleted': ({ ids }) => setJobs(prev => prev.filter(j => !ids.includes(j.id))),
+      resync: refetch,
+    })
+
+    const onClip = () => { if (source.readyState !== EventSource.OPEN) refetch() }
+    window.addEventListener('hiretree:job-clipped', onClip)
+    return () => {
+      source.close()
+      window.removeEventListener('hiretree:job-clipped', onClip)
+    }
+  }, [setJobs])
+}
@@ -3,7 +3,7 @@ import { useTranslation } from 'react-i18next'
 import { useNavigate } from 'react-router-dom'
 import AddJobModal from '../components/AddJobModal'
 import { fetchJobs } from '../api/clip'
-import { useJobClipListener } from '../hooks/useJobClipListener'
+import { useJobEvents } from '../hooks/useJobEvents'
 
 const STAGE_DOT = {
   saved:     'bg-paper border-ink',
@@ -59,7 +59,7 @@ export default function Jobs() {
   }
 
   useEffect(() => { load() }, [])
-  useJobClipListener(setJobs)
+  useJobEvents(setJobs)
 
   const handleModalClose = (refetch = false) => {
     setShowModal(false)